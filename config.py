@@ -3,3 +3,38 @@ path_img = 'res/preview_img.jpg'
 path_img_new = 'res/preview_img_resized.png'
 TIME_PREVIEW = 3  # [s]
 IMG_SIZES = (900, 506)
+
+# параметры расчета
+BOUNDARY_TOL = 1e-3  # точность уточнения контура (доля шага r)
+OUT_OF_CORE_SAMPLES = 20_000_000  # размер сетки, с которого расчет идет блоками с записью в файл
+MAX_P = 100_000  # наибольшее число точек на луче (поле P вкладок)
+PRECISION = 'auto'  # точность расчета: 'auto', 'float32' или 'float64'
+PRECISION_TOL = 1e-4  # допустимая доля точек, меняющих "подходящесть" во float32 (для 'auto')
+ZONE_WORKSPACES = True  # рабочие массивы расчета вкладок сохраняются между построениями
+PREFETCH = False  # упреждающий расчет на шаг вверх/вниз последнего измененного параметра
+PREFETCH_CACHE_SIZE = 6  # количество хранимых результатов построений (для упреждающего расчета)
+DRAG_PREVIEW_RAYS = 180  # число лучей предварительного расчета при перетаскивании маяков
+DRAG_PREVIEW_P = 50  # наибольшее число точек на луче предварительного расчета
+MONTE_CARLO_RAYS = 180  # число лучей сетки проверки Монте-Карло
+MONTE_CARLO_P = 40  # наибольшее число точек на луче сетки проверки Монте-Карло
+MONTE_CARLO_SAMPLES = 400  # число розыгрышей в ячейке
+MONTE_CARLO_SEED = 0  # начальное значение генератора (результат воспроизводим)
+MONTE_CARLO_WORKERS = None  # число процессов (None - по числу ядер)
+SCENARIO_FPS = 10  # частота кадров сценария движения маяков [1/с]
+SCENARIO_RAYS = 360  # наибольшее число лучей сетки кадров сценария
+SCENARIO_P = 100  # наибольшее число точек на луче сетки кадров сценария
+SCENARIO_LOOKAHEAD = 50  # наибольшее опережение расчета кадров сценария [кадров]
+SCENARIO_CACHE_MB = 256  # наибольший объем кэша кадров сценария [МБ]
+SCENARIO_THREADS = None  # число потоков расчета кадров (None - по числу ядер)
+TERRAIN_PATH = None  # растр высот, открываемый при запуске (None - без рельефа)
+TERRAIN_BEACON_HEIGHT = 10.0  # высота антенн маяков над рельефом
+TERRAIN_TARGET_HEIGHT = 2.0  # высота приемника над рельефом
+
+# параметры экспорта графиков
+EXPORT_SIZE = (6000, 6000)  # размер изображения по умолчанию [пикс.]
+
+# параметры отладки
+MEMORY_TELEMETRY = False  # учет памяти при построении (tracemalloc + RSS), панель "Память"
+PRECISION_CHECK = False  # сравнение построений во float32 с float64 (меню "Отладка")
+LOG_LEVEL = 'INFO'  # уровень сообщений журнала (logging)
+STALL_THRESHOLD_MS = 200  # порог зависания главного потока для журнала [мс] (None - не следить)
@@ -8,6 +8,7 @@
 Функции:
     start_main_window() -> None
 """
+import logging
 import sys, os.path
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtCore import QTimer, Qt
@@ -17,6 +18,7 @@ from PIL import Image
 from config import *
 from modules.GUI_logic import Ui_Main_Upgraded
 from modules.GUI_preview import Ui_PreviewWin
+from modules.stall_watchdog import StallWatchdog
 
 
 class PreviewWindow(QtWidgets.QFrame):
@@ -113,9 +115,15 @@ def start_main_window():
     window.show()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s %(name)s %(levelname)s: %(message)s')
     app = QtWidgets.QApplication(sys.argv)
     app.setAttribute(QtCore.Qt.AA_Use96Dpi)
 
+    # журнал зависаний главного потока со стеком
+    if STALL_THRESHOLD_MS:
+        watchdog = StallWatchdog(STALL_THRESHOLD_MS)
+        watchdog.start()
+
     prewin = PreviewWindow()
     prewin.setWindowFlag(Qt.FramelessWindowHint)
     prewin.show()
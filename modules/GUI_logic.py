@@ -3,15 +3,80 @@
 Дорабатывает автоматически созданный ГПИ (Qt Designer + pyuic5) и задает
 логику отработки элементов.
 
+Расчеты выполняются в фоне планировщиком modules.scheduler.ZoneJobScheduler,
+на время расчета отключаются только элементы соответствующей вкладки.
+
+Маяки на графиках можно перетаскивать мышью: поля ввода координат
+обновляются, во время перетаскивания область рассчитывается на грубой
+сетке (DRAG_PREVIEW_RAYS x DRAG_PREVIEW_P), после отпускания - полностью.
+
+Щелчок левой кнопкой мыши по графику показывает расстояние от точки
+щелчка до ближайшей точки контура и направление на нее (по
+пространственному индексу контура modules.outline_index.OutlineIndex).
+
+Аналитическая зона вкладки может быть проверена моделированием (меню
+"Расчет" - "Проверка Монте-Карло", modules.monte_carlo): на грубой сетке
+поверх графика отмечаются ячейки, подходящие по моделированию, и ячейки,
+где моделирование расходится с аналитическим критерием.
+
+При включенном учете памяти (меню "Отладка") для каждого построения
+выводятся пик и удержанный объем памяти по этапам и объемы результатов,
+данных графиков и кэшей (modules.mem_telemetry) - на панель "Память" и
+в журнал. При включенной проверке точности (меню "Отладка") построение во
+float32 сравнивается с float64 на той же сетке: точки, у которых меняется
+"подходящесть", отмечаются на графике, их количество выводится в строке
+состояния и в журнал.
+
+Точность 'auto' (PRECISION) определяется при первом построении в фоновом
+потоке, а не при запуске (zone_calc.resolve_precision).
+
+"Расчет" - "Сценарий движения..." загружает траекторию маяков (CSV или
+JSON, modules.trajectory): кадры зоны текущей вкладки рассчитываются в фоне
+с опережением и воспроизводятся на ее графике (modules.scenario_player);
+панель "Сценарий" - пуск/пауза, перемотка и экспорт кадров в PNG.
+
+Из меню "Расчет" - "Рельеф..." открывается растр высот (modules.terrain):
+из областей исключаются точки, из которых не видны все маяки.
+
+При включенном упреждающем расчете (меню "Расчет", modules.prefetch) после
+построения на вкладке в фоне рассчитываются результаты для значений
+последнего измененного параметра на шаг больше и меньше; построение с
+таким значением берет результат из кэша построений без расчета.
+
 Классы:
     Ui_Main_Upgraded
 """
-import math
-import pyqtgraph as pg
-from PyQt5 import QtCore
-from PyQt5.QtCore import QThread
+import logging
+import os.path
+from functools import partial
 
+import pyqtgraph as pg
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from config import (BOUNDARY_TOL, DRAG_PREVIEW_P, DRAG_PREVIEW_RAYS, EXPORT_SIZE, MAX_P,
+                    MEMORY_TELEMETRY, MONTE_CARLO_P, MONTE_CARLO_RAYS, MONTE_CARLO_SAMPLES,
+                    MONTE_CARLO_SEED, MONTE_CARLO_WORKERS, OUT_OF_CORE_SAMPLES, PREFETCH, PREFETCH_CACHE_SIZE,
+                    PRECISION, PRECISION_CHECK, PRECISION_TOL,
+                    SCENARIO_CACHE_MB, SCENARIO_FPS, SCENARIO_LOOKAHEAD, SCENARIO_P, SCENARIO_RAYS,
+                    SCENARIO_THREADS,
+                    TERRAIN_BEACON_HEIGHT, TERRAIN_PATH, TERRAIN_TARGET_HEIGHT, ZONE_WORKSPACES)
+from modules import mem_telemetry
 from modules.GUI_main import Ui_MainWindow
+from modules.monte_carlo import simulate_zone
+from modules.outline_index import OutlineIndex
+from modules.plot_export import OUTLINE_STYLE, STATIONS_STYLE, ZONE_STYLE, export_graph
+from modules.prefetch import Prefetcher, step_values
+from modules.scenario_player import ScenarioPlayer
+from modules.scheduler import ZoneJobScheduler
+from modules.terrain import load_terrain, mask_zone, visibility_mask
+from modules.trajectory import load_trajectory
+from modules.zone_calc import (RAYS_COUNT, MAX_RAYS_COUNT, auto_rays_count, calc_zone,
+                               calc_zone_all_methods, calc_zone_chunked, compare_precision,
+                               get_method, grid_cache_nbytes, resolve_precision, ZoneResult,
+                               ZoneWorkspace)
+
+
+logger = logging.getLogger(__name__)
 
 
 class Ui_Main_Upgraded(Ui_MainWindow):
@@ -70,6 +135,7 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         None
         """
         super().setupUi(MainWindow)
+        self.main_window = MainWindow
         self.btn_plot_m_1.clicked.connect(self._calculate_method_1)
         self.btn_plot_m_2.clicked.connect(self._calculate_method_2)
         self.btn_plot_m_3.clicked.connect(self._calculate_method_3)
@@ -77,6 +143,77 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         self.checkBox_legend_m_2.stateChanged.connect(lambda: self._upd_legend(1))
         self.checkBox_legend_m_3.stateChanged.connect(lambda: self._upd_legend(2))
 
+        # меню с настройками расчета, общими для всех вкладок
+        self.menu_calc = self.menubar.addMenu('Расчет')
+        self.action_refine_boundary = self.menu_calc.addAction('Уточнять контур')
+        self.action_refine_boundary.setCheckable(True)
+        self.action_prefetch = self.menu_calc.addAction('Упреждающий расчет')
+        self.action_prefetch.setCheckable(True)
+        self.action_calc_all = self.menu_calc.addAction('Построить все методы')
+        self.action_calc_all.triggered.connect(self._calculate_all_methods)
+        self.action_monte_carlo = self.menu_calc.addAction('Проверка Монте-Карло')
+        self.action_monte_carlo.triggered.connect(self._start_monte_carlo)
+        self.menu_calc.addSeparator()
+        self.action_load_terrain = self.menu_calc.addAction('Рельеф...')
+        self.action_load_terrain.triggered.connect(self._load_terrain)
+        self.action_clear_terrain = self.menu_calc.addAction('Без рельефа')
+        self.action_clear_terrain.triggered.connect(lambda: self._set_terrain(None))
+        self.menu_calc.addSeparator()
+        self.action_load_scenario = self.menu_calc.addAction('Сценарий движения...')
+        self.action_load_scenario.triggered.connect(self._load_scenario)
+        self.menu_export = self.menubar.addMenu('Экспорт')
+        self.action_export_graph = self.menu_export.addAction('Экспорт графика...')
+        self.action_export_graph.triggered.connect(self._export_graph)
+        self.menu_debug = self.menubar.addMenu('Отладка')
+        self.action_memory_telemetry = self.menu_debug.addAction('Учет памяти')
+        self.action_memory_telemetry.setCheckable(True)
+        self.action_precision_check = self.menu_debug.addAction('Проверка точности float32')
+        self.action_precision_check.setCheckable(True)
+        self.action_precision_check.setChecked(PRECISION_CHECK)
+
+        # панель отчетов об использовании памяти
+        self.dock_memory = QtWidgets.QDockWidget('Память', MainWindow)
+        self.text_memory = QtWidgets.QPlainTextEdit(self.dock_memory)
+        self.text_memory.setReadOnly(True)
+        self.text_memory.setMaximumBlockCount(1000)
+        self.text_memory.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self.dock_memory.setWidget(self.text_memory)
+        MainWindow.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.dock_memory)
+        self.dock_memory.hide()
+        self._memory_reports = {}
+        self._tracing_started = False
+        self.action_memory_telemetry.toggled.connect(self._set_memory_telemetry)
+        self.action_memory_telemetry.setChecked(MEMORY_TELEMETRY)
+
+        # панель воспроизведения сценария движения маяков
+        self.dock_scenario = QtWidgets.QDockWidget('Сценарий', MainWindow)
+        scenario_widget = QtWidgets.QWidget(self.dock_scenario)
+        scenario_layout = QtWidgets.QHBoxLayout(scenario_widget)
+        self.btn_scenario_play = QtWidgets.QPushButton('Пуск', scenario_widget)
+        self.slider_scenario = QtWidgets.QSlider(QtCore.Qt.Horizontal, scenario_widget)
+        self.lbl_scenario_time = QtWidgets.QLabel(scenario_widget)
+        self.btn_scenario_export = QtWidgets.QPushButton('Экспорт кадров...', scenario_widget)
+        self.btn_scenario_close = QtWidgets.QPushButton('Закрыть', scenario_widget)
+        for widget in (self.btn_scenario_play, self.slider_scenario, self.lbl_scenario_time,
+                       self.btn_scenario_export, self.btn_scenario_close):
+            scenario_layout.addWidget(widget)
+        scenario_layout.setStretchFactor(self.slider_scenario, 1)
+        self.dock_scenario.setWidget(scenario_widget)
+        MainWindow.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.dock_scenario)
+        self.dock_scenario.hide()
+        self._scenario_tab = None
+        self._scenario_coords = None    # координаты маяков вкладки до загрузки сценария
+        self.scenario_player = ScenarioPlayer(MainWindow, SCENARIO_FPS, SCENARIO_CACHE_MB * 2**20,
+                                              SCENARIO_LOOKAHEAD, SCENARIO_THREADS)
+        self.scenario_player.frame_changed.connect(self._on_scenario_frame)
+        self.scenario_player.playing_changed.connect(
+            lambda playing: self.btn_scenario_play.setText('Пауза' if playing else 'Пуск'))
+        self.scenario_player.failed.connect(self._on_scenario_failed)
+        self.btn_scenario_play.clicked.connect(self._toggle_scenario)
+        self.slider_scenario.valueChanged.connect(self._seek_scenario)
+        self.btn_scenario_export.clicked.connect(self._export_scenario)
+        self.btn_scenario_close.clicked.connect(self._close_scenario)
+
         # подготавливаем кортежи и списки для расположения графиков в ГПИ
         # и настройки их элементов и параметров в дальнейшем
         self.frame_graph = (self.frame_graph_m_1, self.frame_graph_m_2,
@@ -87,53 +224,213 @@ class Ui_Main_Upgraded(Ui_MainWindow):
                           self.horizontalLayout_14)
         self.checkboxes_leg = (self.checkBox_legend_m_1, self.checkBox_legend_m_2,
                                self.checkBox_legend_m_3)
+        self.frames_parameters = (self.frame_parameters_m_1, self.frame_parameters_m_2,
+                                  self.frame_parameters_m_3)
+        self.frames_buttons = (self.frame_buttons_m_1, self.frame_buttons_m_2,
+                               self.frame_buttons_m_3)
+        self.spinboxes_coords = ((self.doubleSpinBox_x1_m_1, self.doubleSpinBox_y1_m_1,
+                                  self.doubleSpinBox_x2_m_1, self.doubleSpinBox_y2_m_1),
+                                 (self.doubleSpinBox_x1_m_2, self.doubleSpinBox_y1_m_2,
+                                  self.doubleSpinBox_x2_m_2, self.doubleSpinBox_y2_m_2),
+                                 (self.doubleSpinBox_x1_m_3, self.doubleSpinBox_y1_m_3,
+                                  self.doubleSpinBox_x2_m_3, self.doubleSpinBox_y2_m_3))
+        self.spinboxes_sigma = ((self.doubleSpinBox_sigma_d_m_1, self.doubleSpinBox_sigma_r_m_1),
+                                (self.doubleSpinBox_sigma_d_m_2, self.doubleSpinBox_sigma_r_m_2),
+                                (self.doubleSpinBox_sigma_d_m_3, self.doubleSpinBox_sigma_r_m_3))
+        self.spinboxes_p = (self.spinBox_p_m_1, self.spinBox_p_m_2, self.spinBox_p_m_3)
+        self.spinboxes_r = (self.doubleSpinBox_r_m_1, self.doubleSpinBox_r_m_2,
+                            self.doubleSpinBox_r_m_3)
+        self.calc_methods = (self._calculate_method_1, self._calculate_method_2,
+                             self._calculate_method_3)
+
+        # поля ввода числа лучей; 0 ("авто") - подбор под размер пикселя графика
+        self.spinboxes_rays = []
+        for group, layout in ((self.groupBox_partition_parameters_m_1, self.gridLayout_params_m_1),
+                              (self.groupBox_partition_parameters_m_2, self.gridLayout_params_m_2),
+                              (self.groupBox_partition_parameters_m_3, self.gridLayout_params_m_3)):
+            label = QtWidgets.QLabel('Число лучей', group)
+            font = QtGui.QFont()
+            font.setPointSize(12)
+            label.setFont(font)
+            label.setAlignment(QtCore.Qt.AlignCenter)
+            layout.addWidget(label, 4, 0, 1, 1)
+
+            spinbox = QtWidgets.QSpinBox(group)
+            spinbox.setStyleSheet("QSpinBox{font-size: 14px; text-align: right}")
+            spinbox.setAlignment(QtCore.Qt.AlignCenter)
+            spinbox.setRange(0, MAX_RAYS_COUNT)
+            spinbox.setSingleStep(360)
+            spinbox.setSpecialValueText('авто')
+            spinbox.setValue(RAYS_COUNT)
+            layout.addWidget(spinbox, 4, 1, 1, 1)
+            self.spinboxes_rays.append(spinbox)
+
+        # сетки больше OUT_OF_CORE_SAMPLES точек считаются блоками с записью в файл,
+        # поэтому число точек на луче ограничено не памятью, а MAX_P
+        for spinbox in self.spinboxes_p:
+            spinbox.setMaximum(MAX_P)
         
-        # разворачиваем графики
+        # графики создаются лениво - при первом показе вкладки, до этого
+        # в рамке остается метка-заглушка lbl_to_morph
         pg.setConfigOption('background', 'w')
         pg.setConfigOption('foreground', 'k')
 
-        self.graph = []
-        self.plot_data = []
-        self.plot_outline = []
-        self.plot_stations = []
-        self.plot_legends = []
-        for i in range(3):
-            self.h_layouts[i].removeWidget(self.lbl_to_morph[i])
-            self.lbl_to_morph[i].deleteLater()
-            self.lbl_to_morph[i] = None
-
-            self.graph.append(pg.PlotWidget(self.frame_graph[i]))
-            self.h_layouts[i].addWidget(self.graph[i])
-            self.graph[i].setLabel('left', 'Ось Y')
-            self.graph[i].setLabel('bottom', 'Ось X')
-            self.graph[i].showGrid(x=True, y=True)
-
-            self.plot_data.append(self.graph[i].plot([], [], pen=None, symbol='o', symbolSize=5,
-                                  symbolPen='b', symbolBrush='b', name='Подходящая область'))
-            self.plot_outline.append(self.graph[i].plot([], [], pen=None, symbol='o', symbolSize=5,
-                                  symbolPen='k', symbolBrush='k', name='Контур подходящей области'))
-            self.plot_stations.append(self.graph[i].plot([], [], pen=None, symbol='t1', symbolSize=20,
-                                      symbolPen='r', symbolBrush='r', name='Маяки'))
-            
-            self.plot_legends.append(None)
-            self._set_legend_on_graph(i, True)
-            
-    
-    def _active_elems_enabled(self, enabled):
+        self.graph = [None, None, None]
+        self.plot_data = [None, None, None]
+        self.plot_outline = [None, None, None]
+        self.plot_stations = [None, None, None]
+        self.plot_legends = [None, None, None]
+        self.beacon_targets = [None, None, None]
+        self.hover_labels = [None, None, None]
+        self.measure_lines = [None, None, None]
+        self.measure_labels = [None, None, None]
+        self.plot_mc_good = [None, None, None]
+        self.plot_mc_diff = [None, None, None]
+        self.plot_flipped = [None, None, None]
+        self.outline_indexes = [None, None, None]
+        self._previewing = [False, False, False]
+        self._drag_pending = [False, False, False]
+        for n, spinboxes in enumerate(self.spinboxes_coords):
+            for spinbox in spinboxes:
+                spinbox.valueChanged.connect(lambda _, n=n: self._sync_beacon_targets(n))
+        self.tabWidget.currentChanged.connect(self._ensure_graph)
+        self._ensure_graph(self.tabWidget.currentIndex())
+
+        # фоновые расчеты: у каждой вкладки свой расчет, видимая - в приоритете
+        self.zones = [None, None, None]
+        # 'auto' определяется при первом построении (в фоновом потоке), не при запуске
+        self.precision = PRECISION
+        self.scheduler = ZoneJobScheduler(MainWindow)
+        self.scheduler.finished.connect(self._on_build_finished)
+        self.scheduler.failed.connect(self._on_build_failed)
+        self.scheduler.set_visible(self.tabWidget.currentIndex())
+        self.tabWidget.currentChanged.connect(self.scheduler.set_visible)
+        self._generations = [0, 0, 0]   # номера последних запущенных расчетов вкладок
+        self._job_generations = {}      # ключ расчета -> {вкладка: номер расчета}
+
+        # рабочие массивы расчета вкладок, сохраняемые между построениями
+        # (расчет всех методов - в рабочих массивах первой вкладки)
+        self.workspaces = [ZoneWorkspace() if ZONE_WORKSPACES else None for _ in range(3)]
+
+        # упреждающий расчет соседних значений последнего измененного параметра
+        self.prefetcher = Prefetcher(MainWindow, PREFETCH_CACHE_SIZE)
+        self.prefetcher.finished.connect(self._on_prefetch_finished)
+        self.prefetcher.failed.connect(self._on_prefetch_failed)
+        self._build_keys = {}       # параметры выполняющихся построений вкладок
+        self._awaiting = {}         # вкладки, ждущие результата упреждающего расчета
+        self._last_edited = [None, None, None]
+        for n in range(3):
+            for spinbox in self._param_spinboxes(n):
+                spinbox.valueChanged.connect(
+                    lambda _, n=n, spinbox=spinbox: self._on_param_edited(n, spinbox))
+        self.action_prefetch.toggled.connect(self._set_prefetch)
+        self.action_prefetch.setChecked(PREFETCH)
+
+        # проверки Монте-Карло - отдельной очередью (внутри - процессы)
+        self.mc_scheduler = ZoneJobScheduler(MainWindow, max_threads=1)
+        self.mc_scheduler.finished.connect(self._on_monte_carlo_finished)
+        self.mc_scheduler.failed.connect(self._on_monte_carlo_failed)
+
+        # растр высот для учета прямой видимости маяков (None - без рельефа)
+        self.terrain = None
+        self._set_terrain(None)
+        if TERRAIN_PATH:
+            try:
+                self._set_terrain(load_terrain(TERRAIN_PATH, TERRAIN_BEACON_HEIGHT,
+                                               TERRAIN_TARGET_HEIGHT))
+            except (OSError, ValueError) as e:
+                self.main_window.statusBar().showMessage(f'Рельеф не загружен: {e}')
+
+    def _ensure_graph(self, n):
+        """
+        Создание графика вкладки и его элементов, если они еще не созданы.
+        Заменяет метку-заглушку на виджет графика.
+
+        Параметры:
+        ----------
+        n : int
+            Номер графика (т.е. номер его вкладки) от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if n < 0 or self.graph[n] is not None:
+            return
+
+        self.h_layouts[n].removeWidget(self.lbl_to_morph[n])
+        self.lbl_to_morph[n].deleteLater()
+        self.lbl_to_morph[n] = None
+
+        self.graph[n] = pg.PlotWidget(self.frame_graph[n])
+        self.h_layouts[n].addWidget(self.graph[n])
+        self.graph[n].setLabel('left', 'Ось Y')
+        self.graph[n].setLabel('bottom', 'Ось X')
+        self.graph[n].showGrid(x=True, y=True)
+
+        self.plot_data[n] = self.graph[n].plot([], [], pen=None, **ZONE_STYLE)
+        self.plot_outline[n] = self.graph[n].plot([], [], pen=None, **OUTLINE_STYLE)
+        self.plot_stations[n] = self.graph[n].plot([], [], pen=None, **STATIONS_STYLE)
+
+        # перетаскиваемые маяки: прозрачные маркеры поверх треугольников plot_stations
+        self.beacon_targets[n] = []
+        for _ in range(2):
+            target = pg.TargetItem(size=STATIONS_STYLE['symbolSize'], symbol=STATIONS_STYLE['symbol'],
+                                   pen=pg.mkPen(None), brush=(0, 0, 0, 0),
+                                   hoverPen='b', hoverBrush=(0, 0, 255, 60))
+            target.sigPositionChanged.connect(lambda _, n=n: self._on_beacon_moved(n))
+            target.sigPositionChangeFinished.connect(lambda _, n=n: self._on_beacon_released(n))
+            self.graph[n].addItem(target)
+            self.beacon_targets[n].append(target)
+        self._sync_beacon_targets(n)
+
+        # значение критерия под курсором
+        self.hover_labels[n] = pg.TextItem(color='k', fill=(255, 255, 255, 200), anchor=(0, 1))
+        self.hover_labels[n].setZValue(2)
+        self.hover_labels[n].hide()
+        self.graph[n].addItem(self.hover_labels[n], ignoreBounds=True)
+        self.graph[n].scene().sigMouseMoved.connect(lambda pos, n=n: self._on_mouse_moved(n, pos))
+
+        # проверка Монте-Карло: подходящие по моделированию ячейки и расхождения
+        self.plot_mc_good[n] = self.graph[n].plot([], [], pen=None, symbol='o', symbolSize=9,
+                                                  symbolPen='g', symbolBrush=None)
+        self.plot_mc_diff[n] = self.graph[n].plot([], [], pen=None, symbol='x', symbolSize=10,
+                                                  symbolPen='r', symbolBrush='r')
+
+        # проверка точности: точки, меняющие "подходящесть" во float32
+        self.plot_flipped[n] = self.graph[n].plot([], [], pen=None, symbol='s', symbolSize=6,
+                                                  symbolPen=(255, 140, 0), symbolBrush=None)
+
+        # замер расстояния до контура по щелчку
+        self.measure_lines[n] = self.graph[n].plot([], [], pen=pg.mkPen('m', width=2,
+                                                                         style=QtCore.Qt.DashLine))
+        self.measure_labels[n] = pg.TextItem(color='m', fill=(255, 255, 255, 200), anchor=(0, 0))
+        self.measure_labels[n].setZValue(2)
+        self.measure_labels[n].hide()
+        self.graph[n].addItem(self.measure_labels[n], ignoreBounds=True)
+        self.graph[n].scene().sigMouseClicked.connect(lambda ev, n=n: self._on_mouse_clicked(n, ev))
+
+        self._set_legend_on_graph(n, self.checkboxes_leg[n].isChecked())
+
+    def _active_elems_enabled(self, n, enabled):
         """
-        Включение/выключение активных (интерактивных) элементов ГПИ.
+        Включение/выключение активных (интерактивных) элементов вкладки:
+        параметров расчета и кнопки построения.
 
         Параметры:
         ----------
+        n : int
+            Номер вкладки от 0 до 2.
         enabled : bool
             Флаг, по значению которого определяется, включить или выключить
-            активные элементы ГПИ.
+            активные элементы вкладки.
 
         Возвращаемое значение:
         ----------------------
         None
         """
-        self.tabWidget.setEnabled(enabled)
+        self.frames_parameters[n].setEnabled(enabled)
+        self.frames_buttons[n].setEnabled(enabled)
     
     def _set_legend_on_graph(self, n, enabled):
         """
@@ -150,6 +447,8 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         ----------------------
         None
         """
+        if self.graph[n] is None:
+            return
         if enabled:
             if self.plot_legends[n] == None:
                 self.plot_legends[n] = pg.LegendItem((80,60), offset=(70,20), frame=True, brush='w')
@@ -158,7 +457,7 @@ class Ui_Main_Upgraded(Ui_MainWindow):
                 self.plot_legends[n].addItem(self.plot_outline[n], 'Контур подходящей области')
                 self.plot_legends[n].addItem(self.plot_stations[n], 'Маяки')
                 self.plot_legends[n].setZValue(1)
-        else:
+        elif self.plot_legends[n] is not None:
             self.graph[n].scene().removeItem(self.plot_legends[n])
             self.plot_legends[n] = None
 
@@ -202,47 +501,1081 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         ----------------------
         None
         """
+        self._ensure_graph(n)
         self.plot_data[n].setData(X, Y)
         self.plot_outline[n].setData(Xout, Yout)
         self.plot_stations[n].setData(Xm, Ym)
+        self.plot_flipped[n].setData([], [])
+
+        # контур изменился - индекс строится заново при следующем замере
+        self.outline_indexes[n] = None
+        self._hide_measure(n)
     
-    def _calc_vector_magnitude(self, v):
+    def _on_mouse_moved(self, n, pos):
         """
-        Расчет модуля двумерного вектора.
+        Вывод значения критерия, порога и запаса до порога в точке под
+        курсором. Значение берется из рассчитанной сетки по пеленгу и
+        дальности точки (ZoneResult.metric_at), критерий не пересчитывается.
+        Запас положителен для подходящих точек.
 
         Параметры:
         ----------
-        v : float[2]
-            Двумерный вектор.
+        n : int
+            Номер графика (т.е. номер его вкладки) от 0 до 2.
+        pos : PyQt5.QtCore.QPointF
+            Положение курсора на сцене графика.
 
         Возвращаемое значение:
         ----------------------
-        _ : float
-            Модуль вектора.
+        None
         """
-        return math.sqrt(v[0]**2 + v[1]**2)
-    
-    def _calc_dot_product(self, v1, v2):
+        label = self.hover_labels[n]
+        view_box = self.graph[n].getPlotItem().getViewBox()
+        zone = self.zones[n]
+        sample = None
+        if zone is not None and view_box.sceneBoundingRect().contains(pos):
+            point = view_box.mapSceneToView(pos)
+            try:
+                sample = zone.metric_at(point.x(), point.y())
+            except (ArithmeticError, OSError, ValueError):
+                # исключение в обработчике движения мыши завершило бы приложение
+                sample = None
+        if sample is None:
+            label.hide()
+            return
+
+        value, good = sample
+        margin = abs(value - zone.threshold) * (1 if good else -1)
+        relative = f' ({margin / zone.threshold:+.1%})' if zone.threshold else ''
+        label.setText(f'{get_method(n + 1).metric_name} = {value:.4g}\n'
+                      f'порог = {zone.threshold:.4g}\n'
+                      f'запас = {margin:+.4g}{relative}')
+        label.setPos(point)
+        label.show()
+
+    def _on_mouse_clicked(self, n, ev):
         """
-        Расчет произведения двумерных векторов.
+        Замер по щелчку левой кнопкой: расстояние от точки щелчка до
+        ближайшей точки контура, направление на нее и положение точки
+        относительно подходящей области. Щелчок вне области графика убирает
+        замер.
 
         Параметры:
         ----------
-        v1, v2 : float[2]
-            Двумерные вектора.
+        n : int
+            Номер графика (т.е. номер его вкладки) от 0 до 2.
+        ev : pyqtgraph.GraphicsScene.mouseEvents.MouseClickEvent
+            Событие щелчка.
 
         Возвращаемое значение:
         ----------------------
-        _ : float
-            Результат умножения векторов.
+        None
         """
-        return v1[0] * v2[0] + v1[1] * v2[1]
-    
+        if ev.button() != QtCore.Qt.LeftButton:
+            return
+        view_box = self.graph[n].getPlotItem().getViewBox()
+        if not view_box.sceneBoundingRect().contains(ev.scenePos()):
+            self._hide_measure(n)
+            return
+
+        # индекс строится по отображаемому контуру при первом замере
+        if self.outline_indexes[n] is None:
+            self.outline_indexes[n] = OutlineIndex(*self.plot_outline[n].getData())
+        index = self.outline_indexes[n]
+        point = view_box.mapSceneToView(ev.scenePos())
+        distance, bearing, i = index.nearest(point.x(), point.y())
+        if i < 0:
+            self._hide_measure(n)
+            return
+
+        zone = self.zones[n]
+        sample = zone.metric_at(point.x(), point.y()) if zone is not None else None
+        if sample is None:
+            place = 'вне сетки расчета'
+        else:
+            place = 'внутри области' if sample[1] else 'вне области'
+        self.measure_lines[n].setData([point.x(), index.X[i]], [point.y(), index.Y[i]])
+        self.measure_labels[n].setText(f'до контура = {distance:.4g}\n'
+                                       f'направление = {bearing:.1f}°\n'
+                                       f'{place}')
+        self.measure_labels[n].setPos(point)
+        self.measure_labels[n].show()
+
+    def _hide_measure(self, n):
+        """
+        Скрытие замера расстояния до контура.
+
+        Параметры:
+        ----------
+        n : int
+            Номер графика (т.е. номер его вкладки) от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self.measure_lines[n] is not None:
+            self.measure_lines[n].setData([], [])
+            self.measure_labels[n].hide()
+
+    def _sync_beacon_targets(self, n):
+        """
+        Перенос координат маяков из полей ввода на график: перемещение
+        перетаскиваемых маркеров и треугольников маяков.
+
+        Параметры:
+        ----------
+        n : int
+            Номер графика (т.е. номер его вкладки) от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self.beacon_targets[n] is None:
+            return
+        X1, Y1, X2, Y2 = [spinbox.value() for spinbox in self.spinboxes_coords[n]]
+        for target, pos in zip(self.beacon_targets[n], ((X1, Y1), (X2, Y2))):
+            target.blockSignals(True)
+            target.setPos(pos)
+            target.blockSignals(False)
+        self.plot_stations[n].setData(*_tab_stations(n, [X1, Y1], [X2, Y2]))
+
+    def _on_beacon_moved(self, n):
+        """
+        Обработка перетаскивания маяка: перенос координат в поля ввода и
+        запуск предварительного расчета на грубой сетке. Пока идет
+        предварительный расчет, новый не запускается, а откладывается до
+        его завершения (промежуточные положения пропускаются).
+
+        Параметры:
+        ----------
+        n : int
+            Номер графика (т.е. номер его вкладки) от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        (X1, Y1), (X2, Y2) = [(target.pos().x(), target.pos().y()) for target in self.beacon_targets[n]]
+        for spinbox, value in zip(self.spinboxes_coords[n], (X1, Y1, X2, Y2)):
+            spinbox.setValue(value)
+
+        if self._previewing[n] and self.scheduler.is_busy(n):
+            self._drag_pending[n] = True
+        else:
+            self._start_preview(n)
+
+    def _on_beacon_released(self, n):
+        """
+        Обработка окончания перетаскивания маяка: полный расчет вкладки.
+
+        Параметры:
+        ----------
+        n : int
+            Номер графика (т.е. номер его вкладки) от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._drag_pending[n] = False
+        self._previewing[n] = False
+        self.calc_methods[n]()
+
+    def _start_preview(self, n):
+        """
+        Запуск предварительного расчета вкладки на грубой сетке того же
+        радиуса (DRAG_PREVIEW_RAYS лучей, не более DRAG_PREVIEW_P точек на
+        луче, одинарная точность, без уточнения контура). Активные элементы
+        вкладки не отключаются.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки (метода) от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        X1, Y1, X2, Y2 = [spinbox.value() for spinbox in self.spinboxes_coords[n]]
+        sigma_1, sigma_2 = [spinbox.value() for spinbox in self.spinboxes_sigma[n]]
+        P = self.spinboxes_p[n].value()
+        r = self.spinboxes_r[n].value()
+        P_preview = min(P, DRAG_PREVIEW_P)
+        self._previewing[n] = True
+        self._claim_tabs(n, [n])
+        self._cancel_prefetch(n)
+        self._clear_monte_carlo(n)
+        self._memory_reports.pop(n, None)
+        self.scheduler.submit(n, _build_tab, n, [X1, Y1], [X2, Y2], sigma_1, sigma_2,
+                              P_preview, r * P / P_preview, DRAG_PREVIEW_RAYS, None, 'float32',
+                              cancellable=True)
+
+    def _ask_export_size(self):
+        """
+        Запрос размера изображения для экспорта графика.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : (int, int) | None
+            Ширина и высота изображения [пикс.] или None, если запрос отменен.
+        """
+        dialog = QtWidgets.QDialog(self.main_window)
+        dialog.setWindowTitle('Размер изображения')
+        layout = QtWidgets.QFormLayout(dialog)
+        spinboxes = []
+        for label, value in zip(('Ширина, пикс.', 'Высота, пикс.'), EXPORT_SIZE):
+            spinbox = QtWidgets.QSpinBox(dialog)
+            spinbox.setRange(100, 20000)
+            spinbox.setSingleStep(100)
+            spinbox.setValue(value)
+            layout.addRow(label, spinbox)
+            spinboxes.append(spinbox)
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok
+                                             | QtWidgets.QDialogButtonBox.Cancel, parent=dialog)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addRow(buttons)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return None
+        return spinboxes[0].value(), spinboxes[1].value()
+
+    def _export_graph(self):
+        """
+        Экспорт графика текущей вкладки в файл PNG или SVG выбранного размера.
+        Легенда выводится, если она включена на вкладке.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        n = self.tabWidget.currentIndex()
+        if self.graph[n] is None:
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self.main_window, 'Экспорт графика',
+                                                        f'zone_m_{n + 1}.png',
+                                                        'PNG (*.png);;SVG (*.svg)')
+        if not path:
+            return
+        size = self._ask_export_size()
+        if size is None:
+            return
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            export_graph(self.graph[n], path, *size, show_legend=self.checkboxes_leg[n].isChecked())
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self.main_window, 'Ошибка экспорта',
+                                          f'{type(e).__name__}: {e}')
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+
+    def _load_terrain(self):
+        """
+        Выбор и открытие файла растра высот (.npy или двоичный файл с
+        описанием в <путь>.json).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self.main_window, 'Растр высот', '',
+                                                        'Растр высот (*.npy *.bin *.raw *.dem);;'
+                                                        'Все файлы (*)')
+        if not path:
+            return
+        try:
+            terrain = load_terrain(path, TERRAIN_BEACON_HEIGHT, TERRAIN_TARGET_HEIGHT)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.warning(self.main_window, 'Ошибка загрузки рельефа',
+                                          f'{type(e).__name__}: {e}')
+            return
+        self._set_terrain(terrain)
+
+    def _set_terrain(self, terrain):
+        """
+        Установка растра высот для следующих расчетов и вывод его описания
+        в строку состояния.
+
+        Параметры:
+        ----------
+        terrain : modules.terrain.TerrainRaster | None
+            Растр высот (None - без учета рельефа).
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.terrain = terrain
+        self.action_clear_terrain.setEnabled(terrain is not None)
+        if terrain is not None:
+            rows, cols = terrain.heights.shape
+            self.main_window.statusBar().showMessage(
+                f'Рельеф: {rows}x{cols} ячеек по {terrain.cell:g} '
+                f'(учитывается при следующем расчете)')
+
+    def _boundary_tol(self, r):
+        """
+        Точность уточнения контура для текущих настроек расчета.
+
+        Параметры:
+        ----------
+        r : float
+            Шаг между точками на луче.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : float | None
+            Точность уточнения границы или None, если уточнение выключено.
+        """
+        if self.action_refine_boundary.isChecked():
+            return abs(r) * BOUNDARY_TOL
+        return None
+
+    def _rays_count(self, n, P, r):
+        """
+        Число лучей для расчета на вкладке. В режиме "авто" подбирается так,
+        чтобы расстояние между лучами на внешнем кольце сетки было равно
+        размеру пикселя графика: по текущему масштабу графика, если на нем
+        уже есть данные, иначе - по масштабу, в котором сетка целиком
+        помещается в график.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+        P : int
+            Количество точек на луче.
+        r : float
+            Шаг между точками на луче.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Количество лучей.
+        """
+        rays_count = self.spinboxes_rays[n].value()
+        if rays_count:
+            return rays_count
+
+        self._ensure_graph(n)
+        view_box = self.graph[n].getViewBox()
+        if self.plot_data[n].xData is not None and len(self.plot_data[n].xData):
+            pixel_size = max(view_box.viewPixelSize())
+        else:
+            pixel_size = 2 * P * abs(r) / max(1, min(view_box.width(), view_box.height()))
+        return auto_rays_count(P, r, pixel_size)
+
+    def _start_build(self, n, A, B, sigma_1, sigma_2, P, r):
+        """
+        Запуск фонового расчета подходящей области по методу вкладки.
+        На время расчета отключает активные элементы вкладки.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки (метода) от 0 до 2.
+        A, B : float[2]
+            Координаты маяков.
+        sigma_1, sigma_2 : float
+            СКО метода.
+        P : int
+            Количество точек на луче.
+        r : float
+            Шаг между точками на луче.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        args, key = self._build_params(n, A, B, sigma_1, sigma_2, P, r)
+        if n == self._scenario_tab:
+            self.scenario_player.pause()
+        self._claim_tabs(n, [n])
+        self._active_elems_enabled(n, False)
+        self._clear_monte_carlo(n)
+        self._cancel_prefetch(n, keep=key)
+        self._build_keys[n] = key
+        if self.action_prefetch.isChecked():
+            builds = self.prefetcher.cache.get(key)
+            if builds is not None or self.prefetcher.is_busy(key):
+                self.scheduler.cancel(n)
+                self._memory_reports.pop(n, None)
+                if builds is not None:
+                    self._on_build_finished(n, builds)
+                else:
+                    # те же параметры уже рассчитываются упреждающе - ждем результата
+                    self._awaiting[n] = key
+                return
+
+        rays_count = args[7]
+        report = self._new_memory_report(n, f'Метод {n + 1} (P={P}, лучей {rays_count})')
+        self.scheduler.submit(n, _build_tab, *args, report, self.terrain, self.workspaces[n],
+                              cancellable=True)
+
+    def _claim_tabs(self, key, tabs):
+        """
+        Отметка вкладок как выводящих результат расчета с ключом: номер
+        расчета каждой вкладки увеличивается, так что результаты ранее
+        запущенных расчетов (например, всех методов) в них не выводятся.
+
+        Параметры:
+        ----------
+        key : int | str
+            Ключ расчета: номер вкладки или 'all' для расчета всех методов.
+        tabs : iterable[int]
+            Номера вкладок, в которые выводится результат.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        for n in tabs:
+            self._generations[n] += 1
+        self._job_generations[key] = {n: self._generations[n] for n in tabs}
+
+    def _owned_tabs(self, key):
+        """
+        Вкладки, в которые выводится завершенный расчет с ключом: после
+        него в этих вкладках не запускались другие расчеты.
+
+        Параметры:
+        ----------
+        key : int | str
+            Ключ расчета: номер вкладки или 'all' для расчета всех методов.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : list[int]
+            Номера вкладок.
+        """
+        generations = self._job_generations.pop(key, {})
+        return [n for n, generation in generations.items() if self._generations[n] == generation]
+
+    def _build_params(self, n, A, B, sigma_1, sigma_2, P, r):
+        """
+        Аргументы расчета вкладки (_build_tab) и ключ его результата в
+        кэше построений.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки (метода) от 0 до 2.
+        A, B : float[2]
+            Координаты маяков.
+        sigma_1, sigma_2 : float
+            СКО метода.
+        P : int
+            Количество точек на луче.
+        r : float
+            Шаг между точками на луче.
+
+        Возвращаемое значение:
+        ----------------------
+        args : tuple
+            Аргументы _build_tab (без отчета о памяти, рельефа, рабочих
+            массивов и флага отмены).
+        key : tuple
+            Ключ результата: аргументы и растр высот.
+        """
+        args = (n, list(A), list(B), sigma_1, sigma_2, P, r, self._rays_count(n, P, r),
+                self._boundary_tol(r), self.precision, self.action_precision_check.isChecked())
+        return args, (n, tuple(A), tuple(B), *args[3:], self.terrain)
+
+    def _param_spinboxes(self, n):
+        """
+        Поля ввода параметров построения вкладки в порядке аргументов
+        расчета: координаты маяков, СКО, P, r.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : tuple
+            Поля ввода.
+        """
+        return (*self.spinboxes_coords[n], *self.spinboxes_sigma[n], self.spinboxes_p[n],
+                self.spinboxes_r[n])
+
+    def _on_param_edited(self, n, spinbox):
+        """
+        Запоминание последнего измененного параметра вкладки.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+        spinbox : PyQt5.QtWidgets.QAbstractSpinBox
+            Поле ввода параметра.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._last_edited[n] = spinbox
+
+    def _set_prefetch(self, enabled):
+        """
+        Включение/выключение упреждающего расчета. При выключении
+        упреждающие расчеты отменяются, кэш построений очищается, а
+        вкладки, ждавшие упреждающего расчета, строятся заново.
+
+        Параметры:
+        ----------
+        enabled : bool
+            Флаг упреждающего расчета.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if enabled:
+            return
+        awaiting = list(self._awaiting)
+        self._awaiting.clear()
+        self.prefetcher.cancel()
+        self.prefetcher.cache.clear()
+        for n in awaiting:
+            self.calc_methods[n]()
+
+    def _cancel_prefetch(self, n, keep=None):
+        """
+        Отмена упреждающих расчетов при начале настоящего расчета на
+        вкладке (и ожидания вкладкой упреждающего расчета).
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+        keep : tuple | None
+            Ключ упреждающего расчета, который не отменяется (его результат
+            нужен настоящему расчету).
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._awaiting.pop(n, None)
+        self._build_keys.pop(n, None)
+        self.prefetcher.cancel(keep=keep)
+
+    def _start_prefetch(self, n):
+        """
+        Запуск упреждающих расчетов вкладки для значений последнего
+        измененного параметра на шаг больше и меньше текущего (кроме
+        расчетов с записью в файл).
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        edited = self._last_edited[n]
+        if edited is None:
+            return
+        for value in step_values(edited):
+            X1, Y1, X2, Y2, sigma_1, sigma_2, P, r = [
+                value if spinbox is edited else spinbox.value()
+                for spinbox in self._param_spinboxes(n)]
+            args, key = self._build_params(n, [X1, Y1], [X2, Y2], sigma_1, sigma_2, P, r)
+            # расчеты с записью в файл не упреждаются: они долгие и занимают диск
+            if args[7] * P > OUT_OF_CORE_SAMPLES:
+                continue
+            self.prefetcher.submit(key, _build_tab, *args, None, self.terrain)
+
+    def _on_prefetch_finished(self, key, builds):
+        """
+        Вывод результата упреждающего расчета, если его ждет вкладка.
+
+        Параметры:
+        ----------
+        key : tuple
+            Ключ результата (первый элемент - номер вкладки).
+        builds : list[tuple]
+            Результат для вкладки.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        n = key[0]
+        if self._awaiting.get(n) == key:
+            del self._awaiting[n]
+            self._on_build_finished(n, builds)
+
+    def _on_prefetch_failed(self, key, error):
+        """
+        Обработка ошибки упреждающего расчета: если его ждет вкладка -
+        как ошибки расчета вкладки, иначе ошибка не выводится.
+
+        Параметры:
+        ----------
+        key : tuple
+            Ключ результата (первый элемент - номер вкладки).
+        error : Exception
+            Возникшее исключение.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        n = key[0]
+        if self._awaiting.get(n) == key:
+            del self._awaiting[n]
+            self._on_build_failed(n, error)
+
+    def _on_build_finished(self, key, builds):
+        """
+        Вывод результатов фонового расчета на графики и включение активных
+        элементов вкладок.
+
+        Параметры:
+        ----------
+        key : int | str
+            Ключ расчета: номер вкладки или 'all' для расчета всех методов.
+        builds : list[tuple]
+            Результаты по вкладкам: (номер вкладки, результат расчета,
+            точки области, точки контура, маяки, проверка точности).
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        tabs = self._owned_tabs(key)
+        report = self._memory_reports.pop(key, None)
+        with mem_telemetry.measure_stage(report, 'график'):
+            for n, zone, zone_points, outline_points, stations, flipped in builds:
+                # у вкладки есть более поздний расчет - старый результат не выводится
+                if n not in tabs:
+                    continue
+                self.zones[n] = zone
+                self._upd_graph(n, *zone_points, *outline_points, *stations)
+                if flipped is not None:
+                    self._show_precision_check(n, flipped)
+        if report is not None:
+            self._show_memory_report(report)
+        for n in tabs:
+            self._active_elems_enabled(n, True)
+            self._previewing[n] = False
+            if self._drag_pending[n]:
+                self._drag_pending[n] = False
+                self._start_preview(n)
+
+        # сохранение результата и упреждающий расчет соседних значений
+        build_key = self._build_keys.pop(key, None) if key != 'all' else None
+        if (build_key is not None and key in tabs and self.action_prefetch.isChecked()
+                and not self._previewing[key]):
+            self.prefetcher.cache.put(build_key, builds)
+            self._start_prefetch(key)
+
+    def _show_precision_check(self, n, flipped):
+        """
+        Вывод проверки точности построения: точки, у которых во float32
+        меняется "подходящесть", - на график, их количество - в строку
+        состояния и в журнал.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+        flipped : dict
+            Результат zone_calc.compare_precision (float32 с float64).
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.plot_flipped[n].setData(flipped['X'], flipped['Y'])
+        message = (f'Метод {n + 1}: во float32 "подходящесть" меняют {flipped["flipped"]} '
+                   f'точек (доля {flipped["fraction"]:.2e})')
+        self.main_window.statusBar().showMessage(message)
+        logger.info(message)
+
+    def _start_monte_carlo(self):
+        """
+        Запуск проверки зоны текущей вкладки методом Монте-Карло на грубой
+        сетке того же радиуса (MONTE_CARLO_RAYS лучей, не более
+        MONTE_CARLO_P точек на луче).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        n = self.tabWidget.currentIndex()
+        X1, Y1, X2, Y2 = [spinbox.value() for spinbox in self.spinboxes_coords[n]]
+        sigma_1, sigma_2 = [spinbox.value() for spinbox in self.spinboxes_sigma[n]]
+        P = self.spinboxes_p[n].value()
+        r = self.spinboxes_r[n].value()
+        P_mc = min(P, MONTE_CARLO_P)
+        self._clear_monte_carlo(n)
+        self.main_window.statusBar().showMessage(f'Проверка Монте-Карло (метод {n + 1})...')
+        self.mc_scheduler.submit(n, simulate_zone, n + 1, [X1, Y1], [X2, Y2], sigma_1, sigma_2,
+                                 P_mc, r * P / P_mc, MONTE_CARLO_RAYS, MONTE_CARLO_SAMPLES,
+                                 MONTE_CARLO_SEED, MONTE_CARLO_WORKERS)
+
+    def _on_monte_carlo_finished(self, n, result):
+        """
+        Вывод результата проверки Монте-Карло поверх графика вкладки и
+        сводки сравнения с аналитической зоной в строку состояния.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+        result : modules.monte_carlo.MonteCarloResult
+            Результат проверки.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._ensure_graph(n)
+        diff = result.good != result.analytic_good
+        self.plot_mc_good[n].setData(result.X[result.good], result.Y[result.good])
+        self.plot_mc_diff[n].setData(result.X[diff], result.Y[diff])
+        agreement = result.agreement()
+        rays_count, P = result.X.shape
+        self.main_window.statusBar().showMessage(
+            f'Монте-Карло (метод {n + 1}, {rays_count}x{P}, {result.samples} розыгрышей): '
+            f'совпадение {agreement["fraction"]:.1%}, только по моделированию '
+            f'{agreement["mc_only"]}, только аналитически {agreement["analytic_only"]} '
+            f'(кружки - подходящие по моделированию, крестики - расхождения)')
+
+    def _on_monte_carlo_failed(self, n, error):
+        """
+        Обработка ошибки проверки Монте-Карло: вывод сообщения.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+        error : Exception
+            Возникшее исключение.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.main_window.statusBar().clearMessage()
+        QtWidgets.QMessageBox.warning(self.main_window, 'Ошибка проверки Монте-Карло',
+                                      f'{type(error).__name__}: {error}')
+
+    def _load_scenario(self):
+        """
+        Выбор файла траектории маяков (CSV или JSON) и загрузка сценария
+        движения для текущей вкладки с ее параметрами расчета. Кадры
+        рассчитываются без уточнения контура на сетке того же радиуса не
+        более SCENARIO_RAYS лучей и SCENARIO_P точек на луче (вывод
+        больших наборов точек не укладывается в период кадра).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self.main_window, 'Траектория маяков', '',
+                                                        'Траектория (*.csv *.json);;Все файлы (*)')
+        if not path:
+            return
+        try:
+            trajectory = load_trajectory(path)
+        except (OSError, ValueError, KeyError) as e:
+            QtWidgets.QMessageBox.warning(self.main_window, 'Ошибка загрузки сценария',
+                                          f'{type(e).__name__}: {e}')
+            return
+
+        n = self.tabWidget.currentIndex()
+        sigma_1, sigma_2 = [spinbox.value() for spinbox in self.spinboxes_sigma[n]]
+        P = self.spinboxes_p[n].value()
+        r = self.spinboxes_r[n].value()
+        P_frame = min(P, SCENARIO_P)
+        rays_count = min(self._rays_count(n, P, r), SCENARIO_RAYS)
+        if self._scenario_tab is not None:
+            self._close_scenario()
+        self._scenario_tab = n
+        self._scenario_coords = [spinbox.value() for spinbox in self.spinboxes_coords[n]]
+        self.scenario_player.load(trajectory, _build_frame, n, sigma_1, sigma_2, P_frame,
+                                  r * P / P_frame, rays_count, self.precision, self.terrain)
+        self.slider_scenario.blockSignals(True)
+        self.slider_scenario.setRange(0, self.scenario_player.frames_count() - 1)
+        self.slider_scenario.setValue(0)
+        self.slider_scenario.blockSignals(False)
+        self.lbl_scenario_time.setText('расчет...')
+        self.dock_scenario.setWindowTitle(f'Сценарий (метод {n + 1}): {os.path.basename(path)}')
+        self.dock_scenario.show()
+
+    def _toggle_scenario(self):
+        """
+        Запуск/остановка воспроизведения сценария.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self.scenario_player.is_playing():
+            self.scenario_player.pause()
+        else:
+            self.scenario_player.play()
+
+    def _seek_scenario(self, index):
+        """
+        Перемотка сценария ползунком. Если кадр еще не рассчитан, он
+        выводится после расчета.
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        player = self.scenario_player
+        if index not in player.cache:
+            self.lbl_scenario_time.setText(f't = {player.times[index]:.2f} с '
+                                           f'({index + 1}/{player.frames_count()}, расчет...)')
+        player.seek(index)
+
+    def _show_scenario_frame(self, index, t, frame):
+        """
+        Вывод кадра сценария на график его вкладки: область, контур,
+        маяки и их координаты в полях ввода (без сигналов полей, т.е. без
+        расчетов и отметки измененного параметра; исходные координаты
+        возвращаются при закрытии сценария).
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+        t : float
+            Момент времени кадра [с].
+        frame : tuple
+            Кадр: (точки области, точки контура, маяки).
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        n = self._scenario_tab
+        zone_points, outline_points, stations = frame
+        # расчетной сетки у кадра нет - значения под курсором не выводятся
+        self.zones[n] = None
+        self._clear_monte_carlo(n)
+        self._upd_graph(n, *zone_points, *outline_points, *stations)
+        A, B = self.scenario_player.trajectory.position(t)
+        self._set_coords(n, (*A, *B))
+        self.lbl_scenario_time.setText(f't = {t:.2f} с ({index + 1}/{self.scenario_player.frames_count()})')
+
+    def _on_scenario_frame(self, index, t, frame):
+        """
+        Обработка вывода кадра проигрывателем: кадр на график, положение
+        ползунка.
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+        t : float
+            Момент времени кадра [с].
+        frame : tuple
+            Кадр.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._show_scenario_frame(index, t, frame)
+        self.slider_scenario.blockSignals(True)
+        self.slider_scenario.setValue(index)
+        self.slider_scenario.blockSignals(False)
+
+    def _on_scenario_failed(self, error):
+        """
+        Обработка ошибки расчета кадра сценария: вывод сообщения.
+
+        Параметры:
+        ----------
+        error : Exception
+            Возникшее исключение.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        QtWidgets.QMessageBox.warning(self.main_window, 'Ошибка расчета сценария',
+                                      f'{type(error).__name__}: {error}')
+
+    def _export_scenario(self):
+        """
+        Экспорт всех кадров сценария в файлы PNG (frame_0000.png, ...) в
+        выбранном каталоге. Недостающие кадры рассчитываются в главном
+        потоке; экспорт можно прервать.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        player = self.scenario_player
+        if not player.frames_count():
+            return
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self.main_window, 'Каталог кадров')
+        if not directory:
+            return
+        size = self._ask_export_size()
+        if size is None:
+            return
+        player.pause()
+        n = self._scenario_tab
+        count = player.frames_count()
+        progress = QtWidgets.QProgressDialog('Экспорт кадров...', 'Отмена', 0, count, self.main_window)
+        progress.setWindowModality(QtCore.Qt.WindowModal)
+        try:
+            for index in range(count):
+                progress.setValue(index)
+                if progress.wasCanceled():
+                    break
+                self._show_scenario_frame(index, float(player.times[index]), player.frame(index))
+                export_graph(self.graph[n], os.path.join(directory, f'frame_{index:04d}.png'), *size,
+                             show_legend=self.checkboxes_leg[n].isChecked())
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self.main_window, 'Ошибка экспорта',
+                                          f'{type(e).__name__}: {e}')
+        finally:
+            progress.setValue(count)
+        player.seek(player.index)
+
+    def _close_scenario(self):
+        """
+        Выгрузка сценария и скрытие панели воспроизведения. В поля ввода
+        вкладки возвращаются координаты маяков до загрузки сценария, и
+        вкладка рассчитывается заново.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.scenario_player.unload()
+        n, self._scenario_tab = self._scenario_tab, None
+        self.dock_scenario.hide()
+        if n is not None and self._scenario_coords is not None:
+            self._set_coords(n, self._scenario_coords)
+            self._scenario_coords = None
+            self.calc_methods[n]()
+
+    def _set_coords(self, n, coords):
+        """
+        Запись координат маяков в поля ввода вкладки без их сигналов и
+        перенос перетаскиваемых маяков.
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+        coords : float[4]
+            Координаты X1, Y1, X2, Y2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        for spinbox, value in zip(self.spinboxes_coords[n], coords):
+            spinbox.blockSignals(True)
+            spinbox.setValue(value)
+            spinbox.blockSignals(False)
+        self._sync_beacon_targets(n)
+
+    def _clear_monte_carlo(self, n):
+        """
+        Удаление результата проверки Монте-Карло с графика вкладки (при
+        смене параметров он перестает соответствовать зоне).
+
+        Параметры:
+        ----------
+        n : int
+            Номер вкладки от 0 до 2.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.mc_scheduler.cancel(n)
+        if self.plot_mc_good[n] is not None:
+            self.plot_mc_good[n].setData([], [])
+            self.plot_mc_diff[n].setData([], [])
+
+    def _on_build_failed(self, key, error):
+        """
+        Обработка ошибки фонового расчета: включение активных элементов
+        вкладок и вывод сообщения.
+
+        Параметры:
+        ----------
+        key : int | str
+            Ключ расчета: номер вкладки или 'all' для расчета всех методов.
+        error : Exception
+            Возникшее исключение.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        tabs = self._owned_tabs(key)
+        self._memory_reports.pop(key, None)
+        self._build_keys.pop(key, None)
+        if not tabs:
+            return
+        for n in tabs:
+            self._active_elems_enabled(n, True)
+            self._previewing[n] = self._drag_pending[n] = False
+        QtWidgets.QMessageBox.warning(self.main_window, 'Ошибка расчета',
+                                      f'{type(error).__name__}: {error}')
+
     def _calculate_method_1(self):
         """
         Произведение расчета подходящей области и ее контура по методу 1
         (разностно-дальномерный) и вывод полученного результата на график.
-        На время расчета отключает активные элементы ГПИ.
+        Расчет выполняется в фоне, на это время отключаются активные
+        элементы вкладки.
 
         Параметры:
         ----------
@@ -252,9 +1585,6 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         ----------------------
         None
         """
-        # отключение активных элементов
-        self._active_elems_enabled(False)
-
         # координаты
         X1, Y1 = self.doubleSpinBox_x1_m_1.value(), self.doubleSpinBox_y1_m_1.value()
         X2, Y2 = self.doubleSpinBox_x2_m_1.value(), self.doubleSpinBox_y2_m_1.value()
@@ -265,68 +1595,15 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         P = self.spinBox_p_m_1.value()
         r = self.doubleSpinBox_r_m_1.value()
 
-        # сам расчет
-        coord_x = []
-        coord_y = []
-        coord_outline_x = []
-        coord_outline_y = []
-
-        for j in range(1, 3601):
-            flag_not_first_iter = False
-            flag_in_good_area = False
-            angle = j * 0.1 * math.pi / 180
-            for i in range(1, int(P) + 1):
-                mx = math.sin(angle) * (i * r)
-                my = math.cos(angle) * (i * r)
-                
-                # получение векторов
-                m0 = [0 - mx, 0 - my]
-                v1 = [X1 - mx, Y1 - my]
-                v2 = [X2 - mx, Y2 - my]
-                
-                dot_m0_v1 = self._calc_dot_product(m0, v1) / (self._calc_vector_magnitude(m0) * self._calc_vector_magnitude(v1))
-                dot_m0_v2 = self._calc_dot_product(m0, v2) / (self._calc_vector_magnitude(m0) * self._calc_vector_magnitude(v2))
-                
-                psi1 = math.acos(max(-1, min(1, dot_m0_v1)))
-                psi2 = math.acos(max(-1, min(1, dot_m0_v2)))
-                
-                try:
-                    Kr = math.sqrt(math.sin(psi1 / 2)**2 + math.sin(psi2 / 2)**2) / (2 * math.sin((psi1 + psi2) / 2) * math.sin(psi1/2) * math.sin(psi2/2))
-                except ZeroDivisionError:
-                    Kr = sigma_r_allow / sigma_t + 1
-                
-                # условие "подходящести" точки и проверка на краевые точки
-                if Kr < sigma_r_allow / sigma_t:
-                    if flag_not_first_iter and not flag_in_good_area:
-                        coord_outline_x.append(mx)
-                        coord_outline_y.append(my)
-                    else:
-                        coord_x.append(mx)
-                        coord_y.append(my)
-                    flag_in_good_area = True
-
-                else:
-                    if flag_not_first_iter and flag_in_good_area:
-                        coord_outline_x.append(coord_x[-1])
-                        coord_outline_y.append(coord_y[-1])
-                        coord_x.pop(-1)
-                        coord_y.pop(-1)
-                    flag_in_good_area = False
-
-                flag_not_first_iter = True
-        
-        # обновление графика и включение активных элементов
-        self._upd_graph(0, 
-                        coord_x, coord_y,
-                        coord_outline_x, coord_outline_y,
-                        [0, X1, X2], [0, Y1, Y2])
-        self._active_elems_enabled(True)
+        # сам расчет (в фоне)
+        self._start_build(0, [X1, Y1], [X2, Y2], sigma_r_allow, sigma_t, P, r)
 
     def _calculate_method_2(self):
         """
         Произведение расчета подходящей области и ее контура по методу 2
         (дальномерный) и вывод полученного результата на график.
-        На время расчета отключает активные элементы ГПИ.
+        Расчет выполняется в фоне, на это время отключаются активные
+        элементы вкладки.
 
         Параметры:
         ----------
@@ -336,14 +1613,9 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         ----------------------
         None
         """
-        # отключение активных элементов
-        self._active_elems_enabled(False)
-
         # координаты
         A1, A2 = self.doubleSpinBox_x1_m_2.value(), self.doubleSpinBox_y1_m_2.value()
         B1, B2 = self.doubleSpinBox_x2_m_2.value(), self.doubleSpinBox_y2_m_2.value()
-        A = [A1, A2]
-        B = [B1, B2]
         # параметры погрешностей
         sigma_d = self.doubleSpinBox_sigma_d_m_2.value()
         sigma_r = self.doubleSpinBox_sigma_r_m_2.value()
@@ -351,58 +1623,15 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         P = self.spinBox_p_m_2.value()
         r = self.doubleSpinBox_r_m_2.value()
 
-        sina = math.sqrt(2) * sigma_r/sigma_d       # sin(alpha) = 2^1/2 * sigma/sigma
-
-        # сам расчет
-        coord_x = []
-        coord_y = []
-        coord_outline_x = []
-        coord_outline_y = []
-
-        for j in range(1, 3601):
-            flag_not_first_iter = False
-            flag_in_good_area = False
-            angle = j * 0.1 * math.pi / 180             # alpha = j * 0.1 pi/180
-            for i in range(1, int(P) + 1):
-                M = [math.cos(angle) * (i * r), math.sin(angle) * (i * r)]
-                MB = [B[0] - M[0], B[1] - M[1]]
-                MA = [A[0] - M[0], A[1] - M[1]]
-                
-                COS_alpha = self._calc_dot_product(MA, MB) / (self._calc_vector_magnitude(MA) * self._calc_vector_magnitude(MB))
-                SIN_alpha = math.sqrt(1 - COS_alpha**2)
-
-                # условие "подходящести" точки и проверка на краевые точки
-                if SIN_alpha >= sina:
-                    if flag_not_first_iter and not flag_in_good_area:
-                        coord_outline_x.append(M[0])
-                        coord_outline_y.append(M[1])
-                    else:
-                        coord_x.append(M[0])
-                        coord_y.append(M[1])
-                    flag_in_good_area = True
-
-                else:
-                    if flag_not_first_iter and flag_in_good_area:
-                        coord_outline_x.append(coord_x[-1])
-                        coord_outline_y.append(coord_y[-1])
-                        coord_x.pop(-1)
-                        coord_y.pop(-1)
-                    flag_in_good_area = False
-
-                flag_not_first_iter = True
-
-        # обновление графика и включение активных элементов
-        self._upd_graph(1,
-                        coord_x, coord_y,
-                        coord_outline_x, coord_outline_y,
-                        [A1, B1], [A2, B2])
-        self._active_elems_enabled(True)
+        # сам расчет (в фоне)
+        self._start_build(1, [A1, A2], [B1, B2], sigma_d, sigma_r, P, r)
 
     def _calculate_method_3(self):
         """
         Произведение расчета подходящей области и ее контура по методу 3
         (угломерный) и вывод полученного результата на график.
-        На время расчета отключает активные элементы ГПИ.
+        Расчет выполняется в фоне, на это время отключаются активные
+        элементы вкладки.
 
         Параметры:
         ----------
@@ -412,14 +1641,9 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         ----------------------
         None
         """
-        # отключение активных элементов
-        self._active_elems_enabled(False)
-
         # координаты
         A1, A2 = self.doubleSpinBox_x1_m_3.value(), self.doubleSpinBox_y1_m_3.value()
         B1, B2 = self.doubleSpinBox_x2_m_3.value(), self.doubleSpinBox_y2_m_3.value()
-        A = [A1, A2]
-        B = [B1, B2]
         # параметры погрешностей
         sigma_d = self.doubleSpinBox_sigma_d_m_3.value()
         sigma_theta = self.doubleSpinBox_sigma_r_m_3.value()
@@ -427,60 +1651,364 @@ class Ui_Main_Upgraded(Ui_MainWindow):
         P = self.spinBox_p_m_3.value()
         r = self.doubleSpinBox_r_m_3.value()
 
-        d_AB = math.sqrt((A1-B1)**2 + (A2-B2)**2) # расстояние между A и B
-
-        # сам расчет
-        coord_x = []
-        coord_y = []
-        coord_outline_x = []
-        coord_outline_y = []
-
-        for j in range(1, 3601):
-            flag_not_first_iter = False
-            flag_in_good_area = False
-            angle = j * 0.1 * math.pi / 180             # alpha = j * 0.1 pi/180
-            for i in range(1, int(P) + 1):
-                M = [math.cos(angle) * (i * r), math.sin(angle) * (i * r)]
-                MB = [B[0] - M[0], B[1] - M[1]]
-                MA = [A[0] - M[0], A[1] - M[1]]
-                
-                COS_alpha = self._calc_dot_product(MA, MB) / (self._calc_vector_magnitude(MA) * self._calc_vector_magnitude(MB))
-                SIN_alpha = math.sqrt(1 - COS_alpha**2)
-                
-                if SIN_alpha != 0:
-                    rA = self._calc_vector_magnitude(MA)
-                    rB = self._calc_vector_magnitude(MB)
-                    Kr = 0.017/SIN_alpha * math.sqrt((rA/d_AB)**2 + (rB/d_AB)**2)
-
-                    # условие "подходящести" точки и проверка на краевые точки
-                    if Kr <= sigma_d/(d_AB*sigma_theta):
-                        if flag_not_first_iter and not flag_in_good_area:
-                            coord_outline_x.append(M[0])
-                            coord_outline_y.append(M[1])
-                        else:
-                            coord_x.append(M[0])
-                            coord_y.append(M[1])
-                        flag_in_good_area = True
-
-                    else:
-                        try:
-                            if flag_not_first_iter and flag_in_good_area:
-                                coord_outline_x.append(coord_x[-1])
-                                coord_outline_y.append(coord_y[-1])
-                                coord_x.pop(-1)
-                                coord_y.pop(-1)
-                        except IndexError:
-                            pass
-                        flag_in_good_area = False
-
-                    flag_not_first_iter = True
-
-        # обновление графика и включение активных элементов
-        self._upd_graph(2,
-                        coord_x, coord_y,
-                        coord_outline_x, coord_outline_y,
-                        [A1, B1], [A2, B2])
-        self._active_elems_enabled(True)
+        # сам расчет (в фоне)
+        self._start_build(2, [A1, A2], [B1, B2], sigma_d, sigma_theta, P, r)
+
+    def _calculate_all_methods(self):
+        """
+        Произведение расчета подходящих областей и их контуров сразу по трем
+        методам за один проход и вывод результатов на графики всех вкладок.
+        Расположение маяков и параметры разбиения берутся из текущей вкладки
+        и переносятся в остальные, СКО - из каждой вкладки.
+        Расчет выполняется в фоне, на это время отключаются активные
+        элементы всех вкладок.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        # координаты и параметры разбиения текущей вкладки
+        n = self.tabWidget.currentIndex()
+        X1, Y1, X2, Y2 = [spinbox.value() for spinbox in self.spinboxes_coords[n]]
+        P = self.spinboxes_p[n].value()
+        r = self.spinboxes_r[n].value()
+        rays = self.spinboxes_rays[n].value()
+        rays_count = self._rays_count(n, P, r)
+        for i in range(3):
+            for spinbox, value in zip(self.spinboxes_coords[i], (X1, Y1, X2, Y2)):
+                spinbox.setValue(value)
+            self.spinboxes_p[i].setValue(P)
+            self.spinboxes_r[i].setValue(r)
+            self.spinboxes_rays[i].setValue(rays)
+        # параметры погрешностей
+        sigmas = [(sigma_d.value(), sigma_r.value()) for sigma_d, sigma_r in self.spinboxes_sigma]
+
+        # сам расчет (в фоне); расчеты отдельных вкладок отменяются
+        self._claim_tabs('all', range(3))
+        for i in range(3):
+            self.scheduler.cancel(i)
+            self._cancel_prefetch(i)
+            self._active_elems_enabled(i, False)
+            self._clear_monte_carlo(i)
+        report = self._new_memory_report('all', f'Все методы (P={P}, лучей {rays_count})')
+        self.scheduler.submit('all', _build_all_tabs, [X1, Y1], [X2, Y2], sigmas, P, r,
+                              rays_count, self._boundary_tol(r), self.precision,
+                              self.action_precision_check.isChecked(), report,
+                              self.terrain, self.workspaces[0], cancellable=True)
+
+    def _set_memory_telemetry(self, enabled):
+        """
+        Включение/выключение учета памяти: tracemalloc и панель "Память".
+
+        Параметры:
+        ----------
+        enabled : bool
+            Флаг учета памяти.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if enabled:
+            self._tracing_started = mem_telemetry.start_tracing()
+        else:
+            self._memory_reports.clear()
+            if self._tracing_started:
+                mem_telemetry.stop_tracing()
+                self._tracing_started = False
+        self.dock_memory.setVisible(enabled)
+
+    def _new_memory_report(self, key, title):
+        """
+        Создание отчета о памяти для запускаемого построения (если учет
+        памяти включен).
+
+        Параметры:
+        ----------
+        key : int | str
+            Ключ расчета: номер вкладки или 'all'.
+        title : str
+            Название построения.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : modules.mem_telemetry.BuildMemoryReport | None
+            Отчет или None, если учет выключен.
+        """
+        if not self.action_memory_telemetry.isChecked():
+            return None
+        report = mem_telemetry.BuildMemoryReport(title)
+        self._memory_reports[key] = report
+        return report
+
+    def _show_memory_report(self, report):
+        """
+        Подсчет объемов памяти по группам (результаты расчета, данные
+        графиков, кэши) и вывод отчета на панель "Память" и в журнал.
+
+        Параметры:
+        ----------
+        report : modules.mem_telemetry.BuildMemoryReport
+            Отчет завершенного построения.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        plot_items = [item for items in (self.plot_data, self.plot_outline, self.plot_stations,
+                                         self.measure_lines, self.plot_mc_good, self.plot_mc_diff,
+                                         self.plot_flipped)
+                      for item in items if item is not None]
+        report.breakdown = {
+            'результаты': mem_telemetry.arrays_nbytes(*[zone for zone in self.zones
+                                                        if zone is not None]),
+            'графики': sum(mem_telemetry.arrays_nbytes(item.xData, item.yData, item.scatter.data)
+                           for item in plot_items),
+            'кэши': grid_cache_nbytes() + mem_telemetry.arrays_nbytes(
+                *[index for index in self.outline_indexes if index is not None])
+                + (self.terrain.cache_nbytes() if self.terrain is not None else 0)
+                + self.scenario_player.cache.nbytes
+                + sum(work.nbytes() for work in self.workspaces if work is not None)
+                + self.prefetcher.cache.nbytes(),
+        }
+        self.text_memory.appendPlainText(report.format())
+        mem_telemetry.log_report(report)
+
+
+def _tab_stations(n, A, B):
+    """
+    Координаты маяков для отображения на графике вкладки (для метода 1 -
+    вместе с ведущей станцией в начале координат).
+
+    Параметры:
+    ----------
+    n : int
+        Номер вкладки (метода) от 0 до 2.
+    A, B : float[2]
+        Координаты маяков.
+
+    Возвращаемое значение:
+    ----------------------
+    Xm, Ym : float[]
+        Координаты маяков.
+    """
+    Xm, Ym = zip(*get_method(n + 1).stations([A, B]))
+    return list(Xm), list(Ym)
+
+
+def _terrain_mask(terrain, n, A, B):
+    """
+    Условие видимости всех маяков вкладки по рельефу для расчета блоками.
+
+    Параметры:
+    ----------
+    terrain : modules.terrain.TerrainRaster | None
+        Растр высот.
+    n : int
+        Номер вкладки (метода) от 0 до 2.
+    A, B : float[2]
+        Координаты маяков.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : callable(X, Y) -> numpy.ndarray of bool | None
+        Маска точек, из которых видны все маяки; None без растра высот.
+    """
+    if terrain is None:
+        return None
+    return partial(visibility_mask, terrain, list(zip(*_tab_stations(n, A, B))))
+
+
+def _build_tab(n, A, B, sigma_1, sigma_2, P, r, rays_count, boundary_tol, precision,
+               check_precision=False, report=None, terrain=None, workspace=None, cancel=None):
+    """
+    Расчет подходящей области по методу вкладки и подготовка данных для
+    графика. Выполняется в фоновом потоке, к элементам ГПИ не обращается.
+    Для больших сеток (более OUT_OF_CORE_SAMPLES точек) расчет ведется
+    блоками с записью результата во временный файл. С растром высот из
+    области исключаются точки, из которых не видны все маяки (контур не
+    уточняется; при расчете блоками видимость учитывается по блокам).
+    Точность 'auto' определяется здесь (при первом расчете).
+
+    Параметры:
+    ----------
+    n : int
+        Номер вкладки (метода) от 0 до 2.
+    A, B : float[2]
+        Координаты маяков.
+    sigma_1, sigma_2 : float
+        СКО метода.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    rays_count : int
+        Количество лучей.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    precision : str
+        Точность расчета: 'auto', 'float32' или 'float64'.
+    check_precision : bool
+        Флаг проверки точности: расчет во float32 сравнивается с float64
+        (кроме расчета блоками).
+    report : modules.mem_telemetry.BuildMemoryReport | None
+        Отчет о памяти (None - учет выключен).
+    terrain : modules.terrain.TerrainRaster | None
+        Растр высот (None - без учета рельефа).
+    workspace : modules.zone_calc.ZoneWorkspace | None
+        Рабочие массивы вкладки (None - временные).
+    cancel : threading.Event | None
+        Флаг отмены расчета (None - без отмены).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : list[tuple]
+        Результат для вкладки: (номер вкладки, результат расчета, точки
+        области, точки контура, маяки, проверка точности -
+        zone_calc.compare_precision или None).
+    """
+    precision = resolve_precision(precision, PRECISION_TOL)
+    params = get_method(n + 1).make_params(sigma_1, sigma_2)
+    if terrain is not None:
+        boundary_tol = None
+    with mem_telemetry.measure_stage(report, 'расчет'):
+        if rays_count * P > OUT_OF_CORE_SAMPLES:
+            # у каждого расчета свой временный файл; удаляется вместе с результатом
+            zone = calc_zone_chunked(n + 1, [A, B], params, P, r,
+                                     rays_count=rays_count, precision=precision, cancel=cancel,
+                                     point_mask=_terrain_mask(terrain, n, A, B))
+        else:
+            zone = calc_zone(n + 1, [A, B], params, P, r, boundary_tol=boundary_tol,
+                             rays_count=rays_count, precision=precision, workspace=workspace,
+                             cancel=cancel)
+    flipped = None
+    if check_precision and precision == 'float32' and isinstance(zone, ZoneResult):
+        with mem_telemetry.measure_stage(report, 'проверка точности'):
+            reference = calc_zone(n + 1, [A, B], params, P, r, rays_count=rays_count,
+                                  cancel=cancel)
+            flipped = compare_precision(zone, reference)
+    # для расчета с записью в файл видимость уже учтена по блокам
+    if terrain is not None and isinstance(zone, ZoneResult):
+        with mem_telemetry.measure_stage(report, 'рельеф'):
+            zone = mask_zone(zone, terrain, list(zip(*_tab_stations(n, A, B))))
+    with mem_telemetry.measure_stage(report, 'точки графика'):
+        return [(n, zone, zone.zone_points(), zone.outline_points(), _tab_stations(n, A, B),
+                 flipped)]
+
+
+def _build_frame(A, B, n, sigma_1, sigma_2, P, r, rays_count, precision, terrain=None):
+    """
+    Расчет кадра сценария движения маяков (без уточнения контура).
+    Выполняется в фоновом потоке; в кадре хранятся только данные графика.
+
+    Параметры:
+    ----------
+    A, B : float[2]
+        Координаты маяков в момент кадра.
+    n : int
+        Номер вкладки (метода) от 0 до 2.
+    sigma_1, sigma_2 : float
+        СКО метода.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'auto', 'float32' или 'float64'.
+    terrain : modules.terrain.TerrainRaster | None
+        Растр высот (None - без учета рельефа).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : tuple
+        Кадр: (точки области, точки контура, маяки).
+    """
+    _, _, zone_points, outline_points, stations, _ = _build_tab(
+        n, A, B, sigma_1, sigma_2, P, r, rays_count, None, precision, terrain=terrain)[0]
+    return zone_points, outline_points, stations
+
+
+def _build_all_tabs(A, B, sigmas, P, r, rays_count, boundary_tol, precision,
+                    check_precision=False, report=None, terrain=None, workspace=None, cancel=None):
+    """
+    Расчет подходящих областей сразу по трем методам за один проход и
+    подготовка данных для графиков. Выполняется в фоновом потоке. Сетки
+    больше OUT_OF_CORE_SAMPLES точек рассчитываются по методам блоками с
+    записью в файлы (calc_zone_chunked).
+    С растром высот из областей исключаются точки, из которых не видны все
+    маяки вкладки (контур не уточняется).
+
+    Параметры:
+    ----------
+    A, B : float[2]
+        Координаты маяков.
+    sigmas : list[float[2]]
+        Пары СКО для методов 1-3.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    rays_count : int
+        Количество лучей.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    precision : str
+        Точность расчета: 'auto', 'float32' или 'float64'.
+    check_precision : bool
+        Флаг проверки точности: расчет во float32 сравнивается с float64
+        (кроме расчета блоками).
+    report : modules.mem_telemetry.BuildMemoryReport | None
+        Отчет о памяти (None - учет выключен).
+    terrain : modules.terrain.TerrainRaster | None
+        Растр высот (None - без учета рельефа).
+    workspace : modules.zone_calc.ZoneWorkspace | None
+        Рабочие массивы (None - временные).
+    cancel : threading.Event | None
+        Флаг отмены расчета (None - без отмены).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : list[tuple]
+        Результаты по вкладкам: (номер вкладки, результат расчета, точки
+        области, точки контура, маяки, проверка точности -
+        zone_calc.compare_precision или None).
+    """
+    precision = resolve_precision(precision, PRECISION_TOL)
+    params = [get_method(n + 1).make_params(*sigmas[n]) for n in range(3)]
+    if terrain is not None:
+        boundary_tol = None
+    with mem_telemetry.measure_stage(report, 'расчет'):
+        if rays_count * P > OUT_OF_CORE_SAMPLES:
+            # три сетки не поместятся в память - методы по очереди, блоками с записью в файлы
+            zones = [calc_zone_chunked(n + 1, [A, B], params[n], P, r, rays_count=rays_count,
+                                       precision=precision, cancel=cancel,
+                                       point_mask=_terrain_mask(terrain, n, A, B))
+                     for n in range(3)]
+        else:
+            zones = calc_zone_all_methods([A, B], params, P, r, boundary_tol=boundary_tol,
+                                          rays_count=rays_count, precision=precision,
+                                          workspace=workspace, cancel=cancel)
+    flipped = [None] * len(zones)
+    if check_precision and precision == 'float32' and isinstance(zones[0], ZoneResult):
+        with mem_telemetry.measure_stage(report, 'проверка точности'):
+            references = calc_zone_all_methods([A, B], params, P, r, rays_count=rays_count,
+                                               cancel=cancel)
+            flipped = [compare_precision(zone, reference)
+                       for zone, reference in zip(zones, references)]
+    if terrain is not None:
+        with mem_telemetry.measure_stage(report, 'рельеф'):
+            zones = [mask_zone(zone, terrain, list(zip(*_tab_stations(n, A, B))))
+                     if isinstance(zone, ZoneResult) else zone
+                     for n, zone in enumerate(zones)]
+    with mem_telemetry.measure_stage(report, 'точки графика'):
+        return [(n, zone, zone.zone_points(), zone.outline_points(), _tab_stations(n, A, B),
+                 flipped[n]) for n, zone in enumerate(zones)]
 
 
 if __name__ == "__main__":
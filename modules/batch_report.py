@@ -0,0 +1,358 @@
+"""
+Модуль пакетного построения отчета по списку сценариев.
+Для каждого сценария (расположение маяков, параметры разбиения, СКО
+методов) рассчитываются подходящие области по заданным методам, строятся
+графики и формируется один HTML-отчет с изображениями, статистикой
+областей и временем расчета.
+
+Расчеты и построение графиков выполняются параллельно в отдельных
+процессах (графики - на платформе Qt offscreen). Результат каждой пары
+(сценарий, метод) хранится в каталоге кэша под ключом - хэшем его
+параметров, поэтому при повторном построении пересчитываются только
+измененные сценарии.
+
+Формат файла сценариев (JSON):
+    {"defaults": {"P": 400, "r": 0.1, "rays_count": 3600, "precision": "float64",
+                  "boundary_tol": null},
+     "scenarios": [{"name": "...", "A": [x, y], "B": [x, y],
+                    "methods": {"1": [sigma_r_allow, sigma_t],
+                                "2": [sigma_d, sigma_r],
+                                "3": {"sigma_d": ..., "sigma_theta": ...}},
+                    ... (параметры defaults можно переопределить)}]}
+Вместо "A" и "B" можно задать "stations": [[x, y], ...] (для методов с
+произвольным числом станций). Параметры метода - списком в порядке схемы
+ZoneMethod.params или объектом по именам; они и станции проверяются по
+схеме метода при чтении файла.
+Точность "precision" - "float32", "float64" или "auto" (как PRECISION в
+config.py; "auto" определяется один раз при чтении файла).
+
+Пример файла сценариев - res/scenarios_example.json. Запуск из корня проекта:
+    python -m modules.batch_report res/scenarios_example.json [каталог_отчета] [--workers N]
+
+Функции:
+    load_scenarios(path) -> list[dict]
+    build_report(tasks, out_dir, workers=None, size=REPORT_FIGURE_SIZE) -> str
+"""
+import argparse
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import os.path
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.zone_calc import METHODS, calc_zone, get_method, resolve_precision
+
+
+REPORT_VERSION = 1                  # версия формата результатов (смена сбрасывает кэш)
+REPORT_FIGURE_SIZE = (1200, 900)    # размер графиков отчета [пикс.]
+REPORT_CACHE_DIR = 'cache'          # подкаталог отчета с результатами расчетов
+REPORT_DEFAULTS = {'P': 400, 'r': 0.1, 'rays_count': 3600, 'precision': 'float64',
+                   'boundary_tol': None}
+
+_app = None     # приложение Qt процесса-исполнителя
+
+
+def load_scenarios(path):
+    """
+    Чтение файла сценариев и разбиение сценариев на задачи (сценарий, метод).
+
+    Параметры:
+    ----------
+    path : str
+        Путь к файлу сценариев (JSON).
+
+    Возвращаемое значение:
+    ----------------------
+    tasks : list[dict]
+        Задачи с ключами 'scenario', 'method', 'stations', 'params' (параметры
+        метода по именам) и параметрами REPORT_DEFAULTS.
+    """
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    defaults = dict(REPORT_DEFAULTS, **data.get('defaults', {}))
+
+    tasks = []
+    for i, scenario in enumerate(data['scenarios']):
+        name = scenario.get('name', f'Сценарий {i + 1}')
+        params = {key: scenario.get(key, value) for key, value in defaults.items()}
+        # 'auto' выбирается здесь (один раз), чтобы в ключ кэша и в процессы
+        # попадала фактическая точность
+        params['precision'] = resolve_precision(params['precision'])
+        stations = scenario['stations'] if 'stations' in scenario else [scenario['A'], scenario['B']]
+        for method, values in sorted(scenario['methods'].items(), key=lambda item: int(item[0])):
+            method = int(method)
+            if method not in METHODS:
+                raise ValueError(f'{name}: неизвестный метод {method}')
+            zone_method = get_method(method)
+            # ошибки схемы - с именем сценария, до запуска расчетов
+            try:
+                method_stations = zone_method.check_stations(stations)
+                if isinstance(values, dict):
+                    method_params = zone_method.make_params(**values)
+                else:
+                    method_params = zone_method.make_params(*values)
+            except (ValueError, TypeError) as error:
+                raise ValueError(f'{name}, метод {method}: {error}') from None
+            tasks.append(dict(params, scenario=name, method=method, stations=method_stations,
+                              params=dict(method_params)))
+    return tasks
+
+
+def _task_key(task, size):
+    """
+    Ключ кэша задачи - хэш всех параметров, влияющих на результат.
+
+    Параметры:
+    ----------
+    task : dict
+        Задача.
+    size : int[2]
+        Размер графика [пикс.].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : str
+        Ключ кэша.
+    """
+    params = {key: value for key, value in task.items() if key != 'scenario'}
+    params.update(version=REPORT_VERSION, size=list(size))
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _init_worker():
+    """
+    Инициализация процесса-исполнителя: приложение Qt без вывода на экран.
+
+    Параметры:
+    ----------
+    None
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    import pyqtgraph as pg
+    from PyQt5 import QtWidgets
+    _app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    pg.setConfigOption('background', 'w')
+    pg.setConfigOption('foreground', 'k')
+
+
+def _render_zone(path, zone_points, outline_points, stations, size):
+    """
+    Построение графика подходящей области и сохранение его в файл PNG.
+
+    Параметры:
+    ----------
+    path : str
+        Путь к файлу изображения.
+    zone_points, outline_points, stations : (numpy.ndarray, numpy.ndarray)
+        Координаты точек области, контура и маяков.
+    size : int[2]
+        Размер изображения [пикс.].
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    import numpy as np
+    from modules.plot_export import OUTLINE_STYLE, STATIONS_STYLE, ZONE_STYLE, export_items
+
+    # область просмотра - по всем точкам с запасом
+    point_sets = (zone_points, outline_points, stations)
+    X = np.concatenate([np.asarray(points[0], dtype=float).ravel() for points in point_sets])
+    Y = np.concatenate([np.asarray(points[1], dtype=float).ravel() for points in point_sets])
+    pad = 0.05 * max(np.ptp(X), np.ptp(Y), 1)
+    view_range = ((X.min() - pad, X.max() + pad), (Y.min() - pad, Y.max() + pad))
+
+    items = [(*points, style) for points, style in
+             zip(point_sets, (ZONE_STYLE, OUTLINE_STYLE, STATIONS_STYLE))]
+    export_items(items, view_range, path, *size)
+
+
+def _run_task(task, key, cache_dir, size):
+    """
+    Расчет подходящей области задачи и построение ее графика (в
+    процессе-исполнителе). Результат записывается в кэш.
+
+    Параметры:
+    ----------
+    task : dict
+        Задача.
+    key : str
+        Ключ кэша задачи.
+    cache_dir : str
+        Каталог кэша.
+    size : int[2]
+        Размер графика [пикс.].
+
+    Возвращаемое значение:
+    ----------------------
+    result : dict
+        Статистика области ('stats'), порог ('threshold'), имя файла
+        графика ('image') и время расчета и построения графика [с]
+        ('calc_time', 'render_time').
+    """
+    start = time.perf_counter()
+    zone = calc_zone(task['method'], task['stations'], task['params'], task['P'], task['r'],
+                     boundary_tol=task['boundary_tol'], rays_count=task['rays_count'],
+                     precision=task['precision'])
+    stations = tuple(map(list, zip(*get_method(task['method']).stations(task['stations']))))
+    zone_points, outline_points = zone.zone_points(), zone.outline_points()
+    calc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    image = f'{key}.png'
+    _render_zone(os.path.join(cache_dir, image), zone_points, outline_points, stations, size)
+    render_time = time.perf_counter() - start
+
+    result = {'stats': zone.stats(), 'threshold': float(zone.threshold), 'image': image,
+              'calc_time': calc_time, 'render_time': render_time}
+    with open(os.path.join(cache_dir, f'{key}.json'), 'w', encoding='utf-8') as file:
+        json.dump(result, file, ensure_ascii=False)
+    return result
+
+
+def _load_cached(cache_dir, key):
+    """
+    Чтение результата задачи из кэша.
+
+    Параметры:
+    ----------
+    cache_dir : str
+        Каталог кэша.
+    key : str
+        Ключ кэша задачи.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict | None
+        Результат задачи или None, если его нет в кэше.
+    """
+    path = os.path.join(cache_dir, f'{key}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as file:
+        result = json.load(file)
+    return result if os.path.exists(os.path.join(cache_dir, result['image'])) else None
+
+
+def _format_task_row(task, result):
+    """
+    Строка таблицы HTML-отчета для задачи.
+
+    Параметры:
+    ----------
+    task : dict
+        Задача.
+    result : dict
+        Результат задачи.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : str
+        Фрагмент HTML.
+    """
+    stats = result['stats']
+    params = '<br>'.join(html.escape(line) for line in (
+        f"станции = {task['stations']}, "
+        + ', '.join(f'{name} = {value}' for name, value in task['params'].items()),
+        f"P = {task['P']}, r = {task['r']}, лучей = {task['rays_count']}, "
+        f"точность = {task['precision']}"))
+    timing = ('из кэша' if result['cached'] else
+              f"расчет {result['calc_time']:.2f} с, график {result['render_time']:.2f} с")
+    image = f"{REPORT_CACHE_DIR}/{result['image']}"
+    return (f"<tr><td>{html.escape(task['scenario'])}</td>"
+            f"<td>{html.escape(get_method(task['method']).name)}</td>"
+            f"<td>{params}</td>"
+            f"<td>площадь = {stats['area']:.3f}<br>наибольшая дальность = {stats['max_range']:.3f}"
+            f"<br>точек = {stats['points']}<br>порог = {result['threshold']:.4g}</td>"
+            f"<td>{timing}</td>"
+            f"<td><a href=\"{image}\"><img src=\"{image}\" width=\"400\"></a></td></tr>")
+
+
+def build_report(tasks, out_dir, workers=None, size=REPORT_FIGURE_SIZE):
+    """
+    Построение HTML-отчета по задачам. Задачи, результаты которых уже есть
+    в кэше отчета, не пересчитываются; остальные рассчитываются
+    параллельно в процессах.
+
+    Параметры:
+    ----------
+    tasks : list[dict]
+        Задачи (см. load_scenarios).
+    out_dir : str
+        Каталог отчета.
+    workers : int | None
+        Количество процессов. None - по числу ядер процессора.
+    size : int[2]
+        Размер графиков [пикс.].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : str
+        Путь к файлу отчета (report.html).
+    """
+    cache_dir = os.path.join(out_dir, REPORT_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    keys = [_task_key(task, size) for task in tasks]
+    results = [_load_cached(cache_dir, key) for key in keys]
+    for result in results:
+        if result is not None:
+            result['cached'] = True
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {i: executor.submit(_run_task, tasks[i], keys[i], cache_dir, size)
+                       for i in pending}
+            for i, future in futures.items():
+                results[i] = dict(future.result(), cached=False)
+    total_time = time.perf_counter() - start
+
+    work_time = sum(result['calc_time'] + result['render_time']
+                    for result in results if not result['cached'])
+    rows = '\n'.join(_format_task_row(task, result) for task, result in zip(tasks, results))
+    page = f"""<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>Рабочие зоны: отчет</title>
+<style>
+body {{font-family: sans-serif; margin: 20px;}}
+table {{border-collapse: collapse;}}
+td, th {{border: 1px solid #999; padding: 6px; vertical-align: top;}}
+</style>
+</head>
+<body>
+<h1>Рабочие зоны: отчет</h1>
+<p>Задач: {len(tasks)}, рассчитано: {len(pending)}, из кэша: {len(tasks) - len(pending)}.<br>
+Общее время: {total_time:.2f} с, суммарное время расчетов и графиков: {work_time:.2f} с.</p>
+<table>
+<tr><th>Сценарий</th><th>Метод</th><th>Параметры</th><th>Статистика</th><th>Время</th><th>График</th></tr>
+{rows}
+</table>
+</body>
+</html>
+"""
+    path = os.path.join(out_dir, 'report.html')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(page)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Пакетное построение отчета по сценариям.')
+    parser.add_argument('scenarios', help='файл сценариев (JSON)')
+    parser.add_argument('out_dir', nargs='?', default='report', help='каталог отчета')
+    parser.add_argument('--workers', type=int, default=None, help='количество процессов')
+    args = parser.parse_args()
+    print(build_report(load_scenarios(args.scenarios), args.out_dir, args.workers))
@@ -0,0 +1,264 @@
+"""
+Модуль замера скорости вывода больших наборов точек на графики ГПИ.
+
+Главное окно (Ui_Main_Upgraded) создается на платформе Qt offscreen, на
+график вкладки через _upd_graph выводятся синтетические области на
+полярной сетке из BENCH_RAYS_COUNT лучей и P точек на луче (область -
+"трилистник" около 55% сетки). Для каждого размера и режима отображения
+замеряются (медиана по повторам, мс):
+- set_data - передача точек на график (_upd_graph);
+- paint - отрисовка графика (QWidget.grab);
+- pan, zoom - перерисовка после сдвига и масштабирования области просмотра.
+
+Режимы отображения (BENCH_MODES): маркеры без легенды, маркеры с легендой
+(флажок легенды вкладки) и маркеры со сглаживанием (antialias).
+
+Результаты записываются в JSON и могут сравниваться с базовым файлом:
+замеры, ставшие медленнее более чем в BENCH_TOLERANCE раз, выводятся как
+ухудшения (код завершения 1). Запуск из корня проекта:
+    python -m modules.gui_benchmark [--sizes 10 50 200 800] [--repeats 5]
+        [--out bench_results.json] [--baseline base.json]
+
+Функции:
+    synthetic_zone(P, rays_count=BENCH_RAYS_COUNT) -> tuple
+    run_benchmark(sizes=BENCH_SIZES, repeats=BENCH_REPEATS, modes=BENCH_MODES) -> dict
+    compare_results(results, baseline, tolerance=BENCH_TOLERANCE) -> list[dict]
+    format_results(results, comparison=None) -> str
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+
+BENCH_RAYS_COUNT = 3600         # количество лучей синтетической сетки
+BENCH_SIZES = (10, 50, 200, 800)    # количества точек на луче
+BENCH_REPEATS = 5               # количество повторов каждого замера
+BENCH_TOLERANCE = 1.5           # допустимое замедление относительно базы [раз]
+BENCH_WINDOW = (1200, 800)      # размер окна [пикс.]
+BENCH_TAB = 1                   # вкладка, на которой выполняются замеры
+BENCH_MODES = {'маркеры': dict(legend=False, antialias=False),
+               'маркеры + легенда': dict(legend=True, antialias=False),
+               'сглаживание': dict(legend=False, antialias=True)}
+BENCH_METRICS = ('set_data', 'paint', 'pan', 'zoom')
+
+
+def synthetic_zone(P, rays_count=BENCH_RAYS_COUNT):
+    """
+    Синтетическая область на полярной сетке с шагом 0.1: точки области,
+    контура и маяки.
+
+    Параметры:
+    ----------
+    P : int
+        Количество точек на луче.
+    rays_count : int
+        Количество лучей.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : tuple
+        Координаты (X, Y, Xout, Yout, Xm, Ym) - как аргументы _upd_graph.
+    """
+    from modules.zone_calc import ZoneResult, get_polar_grid
+
+    grid = get_polar_grid(rays_count, P, 0.1)
+    angles = np.arctan2(grid.sin, grid.cos)[:, None]
+    good = grid.radii < P * 0.1 * (0.6 + 0.15 * np.cos(3 * angles))
+    zone = ZoneResult(grid, good.astype(float), good, 0.5, None)
+    return (*zone.zone_points(), *zone.outline_points(), [-0.2 * P, 0.2 * P], [0.0, 0.0])
+
+
+def _median_ms(fn, repeats):
+    """
+    Медиана времени выполнения функции по повторам.
+
+    Параметры:
+    ----------
+    fn : callable() -> None
+        Замеряемая функция.
+    repeats : int
+        Количество повторов.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : float
+        Медиана [мс].
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def run_benchmark(sizes=BENCH_SIZES, repeats=BENCH_REPEATS, modes=BENCH_MODES):
+    """
+    Замеры вывода синтетических областей на график главного окна.
+
+    Параметры:
+    ----------
+    sizes : list[int]
+        Количества точек на луче синтетических областей.
+    repeats : int
+        Количество повторов каждого замера.
+    modes : dict[str, dict]
+        Режимы отображения: название -> {'legend': bool, 'antialias': bool}.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict
+        Результаты: 'meta' - описание окружения, 'results' - список замеров
+        с ключами 'mode', 'P', 'points' и BENCH_METRICS.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    import pyqtgraph as pg
+    from PyQt5 import QtCore, QtWidgets
+    from modules.GUI_logic import Ui_Main_Upgraded
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    window = QtWidgets.QMainWindow()
+    ui = Ui_Main_Upgraded()
+    ui.setupUi(window)
+    window.resize(*BENCH_WINDOW)
+    window.show()
+    n = BENCH_TAB
+    ui.tabWidget.setCurrentIndex(n)
+    app.processEvents()
+    graph = ui.graph[n]
+    view_box = graph.getPlotItem().getViewBox()
+
+    results = []
+    print(format_results({'results': []}), flush=True)
+    try:
+        for P in sizes:
+            data = synthetic_zone(P)
+            for mode, options in modes.items():
+                ui.checkboxes_leg[n].setChecked(options['legend'])
+                for item in (ui.plot_data[n], ui.plot_outline[n], ui.plot_stations[n]):
+                    item.opts['antialias'] = options['antialias']
+                ui._upd_graph(n, [], [], [], [], [], [])
+                graph.grab()
+
+                def set_data():
+                    ui._upd_graph(n, *data)
+
+                def pan():
+                    view_box.translateBy(x=0.1 * P * 0.1)
+                    graph.grab()
+
+                def zoom():
+                    view_box.scaleBy((0.8, 0.8))
+                    graph.grab()
+
+                row = {'mode': mode, 'P': P, 'points': len(data[0]) + len(data[2])}
+                row['set_data'] = _median_ms(set_data, repeats)
+                view_box.autoRange()
+                row['paint'] = _median_ms(graph.grab, repeats)
+                row['pan'] = _median_ms(pan, repeats)
+                view_box.autoRange()
+                row['zoom'] = _median_ms(zoom, repeats)
+                results.append(row)
+                print(format_results({'results': [row]}).splitlines()[-1], flush=True)
+    finally:
+        window.close()
+
+    meta = {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'platform': platform.platform(), 'python': platform.python_version(),
+            'qt': QtCore.QT_VERSION_STR, 'pyqtgraph': pg.__version__,
+            'qpa': app.platformName(), 'rays_count': BENCH_RAYS_COUNT, 'repeats': repeats}
+    return {'meta': meta, 'results': results}
+
+
+def compare_results(results, baseline, tolerance=BENCH_TOLERANCE):
+    """
+    Сравнение замеров с базовыми (по режиму и P).
+
+    Параметры:
+    ----------
+    results, baseline : dict
+        Результаты run_benchmark.
+    tolerance : float
+        Допустимое замедление [раз].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : list[dict]
+        Для каждого замера, найденного в базе: 'mode', 'P', 'metric',
+        'ratio' (текущее время / базовое) и 'regression' (bool).
+    """
+    base = {(row['mode'], row['P']): row for row in baseline['results']}
+    comparison = []
+    for row in results['results']:
+        base_row = base.get((row['mode'], row['P']))
+        if base_row is None:
+            continue
+        for metric in BENCH_METRICS:
+            ratio = row[metric] / max(base_row[metric], 1e-6)
+            comparison.append({'mode': row['mode'], 'P': row['P'], 'metric': metric,
+                               'ratio': ratio, 'regression': ratio > tolerance})
+    return comparison
+
+
+def format_results(results, comparison=None):
+    """
+    Текстовая таблица замеров (и сравнения с базой).
+
+    Параметры:
+    ----------
+    results : dict
+        Результаты run_benchmark.
+    comparison : list[dict] | None
+        Результат compare_results.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : str
+        Таблица.
+    """
+    ratios = {(row['mode'], row['P'], row['metric']): row for row in comparison or ()}
+    lines = [f'{"режим":<20}{"P":>6}{"точек":>10}' + ''.join(f'{metric + ", мс":>16}'
+                                                             for metric in BENCH_METRICS)]
+    for row in results['results']:
+        cells = []
+        for metric in BENCH_METRICS:
+            cell = f'{row[metric]:.1f}'
+            ratio = ratios.get((row['mode'], row['P'], metric))
+            if ratio is not None:
+                cell += f' x{ratio["ratio"]:.2f}' + ('!' if ratio['regression'] else '')
+            cells.append(f'{cell:>16}')
+        lines.append(f'{row["mode"]:<20}{row["P"]:>6}{row["points"]:>10}' + ''.join(cells))
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Замер скорости вывода точек на графики ГПИ.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(BENCH_SIZES),
+                        help='количества точек на луче')
+    parser.add_argument('--repeats', type=int, default=BENCH_REPEATS, help='количество повторов')
+    parser.add_argument('--out', default='bench_results.json', help='файл результатов (JSON)')
+    parser.add_argument('--baseline', default=None, help='файл базовых результатов (JSON)')
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE,
+                        help='допустимое замедление относительно базы [раз]')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.repeats)
+    with open(args.out, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=1)
+    print(f'Результаты: {args.out}')
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            comparison = compare_results(results, json.load(file), args.tolerance)
+        print(f'Сравнение с {args.baseline}:')
+        print(format_results(results, comparison))
+    if comparison and any(row['regression'] for row in comparison):
+        print('Есть ухудшения относительно базы (отмечены "!")')
+        sys.exit(1)
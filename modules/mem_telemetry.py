@@ -0,0 +1,319 @@
+"""
+Модуль учета памяти при построении рабочих зон (включается флагом
+MEMORY_TELEMETRY в config.py или из меню "Отладка").
+
+Для каждого построения ведется отчет по этапам (расчет, подготовка точек,
+вывод на график): пик и удержанный объем памяти по данным tracemalloc
+(отсчитываются от начала построения) и размер резидентной памяти процесса
+(RSS). RSS берется из psutil, если он установлен, иначе из /proc/self/statm.
+Отдельно подсчитывается объем массивов по группам: результаты расчета,
+данные графиков и кэши.
+
+tracemalloc учитывает выделения памяти всех потоков, поэтому при
+одновременных построениях на разных вкладках их значения смешиваются.
+
+Классы:
+    BuildMemoryReport
+
+Функции:
+    start_tracing() -> bool
+    stop_tracing() -> None
+    rss_bytes() -> int | None
+    arrays_nbytes(*objs) -> int
+    measure_stage(report, name) -> contextmanager
+    log_report(report) -> None
+"""
+import contextlib
+import logging
+import os
+import tracemalloc
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+logger = logging.getLogger(__name__)
+
+MB = 2**20     # байт в мегабайте
+
+
+def start_tracing():
+    """
+    Включение tracemalloc, если он еще не включен.
+
+    Параметры:
+    ----------
+    None
+
+    Возвращаемое значение:
+    ----------------------
+    _ : bool
+        True, если tracemalloc включен этим вызовом.
+    """
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start()
+    return True
+
+
+def stop_tracing():
+    """
+    Выключение tracemalloc.
+
+    Параметры:
+    ----------
+    None
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    tracemalloc.stop()
+
+
+def rss_bytes():
+    """
+    Размер резидентной памяти процесса.
+
+    Параметры:
+    ----------
+    None
+
+    Возвращаемое значение:
+    ----------------------
+    _ : int | None
+        RSS [байт] или None, если его не удалось определить.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def arrays_nbytes(*objs):
+    """
+    Объем массивов numpy: самих массивов, массивов в списках и кортежах и
+    массивов-атрибутов объектов (без обхода вложенных объектов). Массивы,
+    ссылающиеся на одни и те же данные, учитываются один раз; массивы,
+    отображаемые из файлов (numpy.memmap), не учитываются.
+
+    Параметры:
+    ----------
+    *objs : numpy.ndarray | list | tuple | object
+        Массивы, их наборы или объекты с массивами-атрибутами.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : int
+        Объем данных массивов [байт].
+    """
+    roots = {}
+
+    def collect(obj, attributes):
+        if isinstance(obj, np.ndarray):
+            while isinstance(obj.base, np.ndarray):
+                obj = obj.base
+            if not isinstance(obj, np.memmap):
+                roots[id(obj)] = obj.nbytes
+        elif isinstance(obj, (list, tuple)):
+            for item in obj:
+                collect(item, False)
+        elif attributes and hasattr(obj, '__dict__'):
+            for value in vars(obj).values():
+                collect(value, False)
+
+    for obj in objs:
+        collect(obj, True)
+    return sum(roots.values())
+
+
+def _format_bytes(value):
+    """
+    Объем памяти в мегабайтах для вывода.
+
+    Параметры:
+    ----------
+    value : int | None
+        Объем [байт].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : str
+        Строка вида '12.3 МБ' ('?' для None).
+    """
+    return '?' if value is None else f'{value / MB:.1f} МБ'
+
+
+class BuildMemoryReport:
+    """
+    Отчет об использовании памяти одним построением.
+
+    Атрибуты:
+    ---------
+    title : str
+        Название построения.
+    stages : list[dict]
+        Этапы: название ('name'), пик и удержанный объем от начала
+        построения ('peak', 'retained') и RSS после этапа ('rss') [байт].
+    breakdown : dict[str, int]
+        Объем массивов по группам [байт].
+
+    Методы:
+    -------
+    stage(name) -> contextmanager
+        Учет памяти на этапе построения.
+    peak() -> int
+        Пик памяти построения.
+    retained() -> int
+        Удержанный объем памяти после построения.
+    format() -> str
+        Текст отчета.
+    """
+
+    def __init__(self, title):
+        """
+        Инициализация экземляра класса.
+        Запоминает начальные объем памяти tracemalloc и RSS.
+
+        Параметры:
+        ----------
+        title : str
+            Название построения.
+        """
+        self.title = title
+        self.stages = []
+        self.breakdown = {}
+        self._start = tracemalloc.get_traced_memory()[0]
+        self._rss_start = rss_bytes()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Учет памяти на этапе построения: пик отсчитывается от сброса пика
+        tracemalloc в начале этапа.
+
+        Параметры:
+        ----------
+        name : str
+            Название этапа.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : contextmanager
+            Контекст этапа.
+        """
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append({'name': name, 'peak': peak - self._start,
+                                'retained': current - self._start, 'rss': rss_bytes()})
+
+    def peak(self):
+        """
+        Пик памяти построения (от начала построения).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Пик [байт].
+        """
+        return max((stage['peak'] for stage in self.stages), default=0)
+
+    def retained(self):
+        """
+        Объем памяти, удержанный после построения (от начала построения).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Объем [байт].
+        """
+        return self.stages[-1]['retained'] if self.stages else 0
+
+    def format(self):
+        """
+        Текст отчета: итог построения, этапы и объемы по группам.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : str
+            Текст отчета.
+        """
+        rss = self.stages[-1]['rss'] if self.stages else None
+        rss_delta = ''
+        if rss is not None and self._rss_start is not None:
+            rss_delta = f' ({(rss - self._rss_start) / MB:+.1f})'
+        lines = [f'{self.title}: пик {_format_bytes(self.peak())}, '
+                 f'удержано {_format_bytes(self.retained())}, '
+                 f'RSS {_format_bytes(rss)}{rss_delta}']
+        for stage in self.stages:
+            lines.append(f'  {stage["name"]}: пик {_format_bytes(stage["peak"])}, '
+                         f'удержано {_format_bytes(stage["retained"])}')
+        if self.breakdown:
+            lines.append('  ' + ', '.join(f'{name} {_format_bytes(value)}'
+                                          for name, value in self.breakdown.items()))
+        return '\n'.join(lines)
+
+
+def measure_stage(report, name):
+    """
+    Контекст учета памяти на этапе построения; без отчета (учет выключен)
+    ничего не делает.
+
+    Параметры:
+    ----------
+    report : BuildMemoryReport | None
+        Отчет построения.
+    name : str
+        Название этапа.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : contextmanager
+        Контекст этапа.
+    """
+    if report is None:
+        return contextlib.nullcontext()
+    return report.stage(name)
+
+
+def log_report(report):
+    """
+    Запись отчета в журнал (logging, уровень INFO).
+
+    Параметры:
+    ----------
+    report : BuildMemoryReport
+        Отчет построения.
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    logger.info('Память: %s', report.format())
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
@@ -0,0 +1,300 @@
+"""
+Модуль проверки аналитических рабочих зон методом Монте-Карло.
+
+В каждой ячейке полярной сетки (обычно более грубой, чем сетка расчета
+зоны) разыгрываются зашумленные измерения метода с СКО вкладки:
+- метод 1 - разности дальностей до маяков A, B и ведущей станции в начале
+  координат (СКО sigma_t);
+- метод 2 - дальности до маяков A и B (СКО sigma_r);
+- метод 3 - пеленги с маяков A и B (СКО sigma_theta, в градусах).
+По каждой паре измерений местоположение находится методом Гаусса-Ньютона
+(MC_ITERATIONS итераций от истинной точки), и по всем розыгрышам ячейки
+оценивается среднеквадратическая радиальная ошибка. Ячейка подходящая, если
+ошибка не больше допустимой (sigma_r_allow или sigma_d).
+
+Расчет векторизован по ячейкам и розыгрышам и разбит на блоки лучей,
+которые выполняются параллельно в процессах. Генератор каждого блока
+порождается из SeedSequence(seed) по номеру блока, поэтому результат
+воспроизводим и не зависит от числа процессов.
+
+Классы:
+    MonteCarloResult
+
+Функции:
+    simulate_zone(method, A, B, sigma_1, sigma_2, P, r, rays_count=MC_RAYS_COUNT, samples=MC_SAMPLES, seed=0, workers=None) -> MonteCarloResult
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from modules.zone_calc import get_method
+
+
+MC_RAYS_COUNT = 180     # количество лучей сетки по умолчанию
+MC_SAMPLES = 400        # количество розыгрышей в ячейке по умолчанию
+MC_ITERATIONS = 4       # количество итераций Гаусса-Ньютона
+MC_BLOCK_RAYS = 8       # количество лучей в блоке (задаче процесса)
+
+
+class MonteCarloResult:
+    """
+    Результат проверки зоны методом Монте-Карло.
+
+    Атрибуты:
+    ---------
+    X, Y : numpy.ndarray[rays_count, P]
+        Координаты ячеек сетки.
+    error : numpy.ndarray[rays_count, P]
+        Среднеквадратическая радиальная ошибка местоопределения (inf, если
+        местоположение не определяется).
+    sigma_allow : float
+        Допустимая радиальная ошибка.
+    good : numpy.ndarray[rays_count, P] of bool
+        Маска подходящих ячеек по моделированию.
+    analytic_good : numpy.ndarray[rays_count, P] of bool
+        Маска подходящих ячеек по аналитическому критерию метода.
+    samples : int
+        Количество розыгрышей в ячейке.
+    seed : int
+        Начальное значение генератора.
+
+    Методы:
+    -------
+    agreement() -> dict
+        Сравнение с аналитической зоной.
+    """
+
+    def __init__(self, X, Y, error, sigma_allow, analytic_good, samples, seed):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        X, Y : numpy.ndarray[rays_count, P]
+            Координаты ячеек сетки.
+        error : numpy.ndarray[rays_count, P]
+            Среднеквадратическая радиальная ошибка.
+        sigma_allow : float
+            Допустимая радиальная ошибка.
+        analytic_good : numpy.ndarray[rays_count, P] of bool
+            Маска подходящих ячеек по аналитическому критерию.
+        samples : int
+            Количество розыгрышей в ячейке.
+        seed : int
+            Начальное значение генератора.
+        """
+        self.X = X
+        self.Y = Y
+        self.error = error
+        self.sigma_allow = sigma_allow
+        self.good = error <= sigma_allow
+        self.analytic_good = analytic_good
+        self.samples = samples
+        self.seed = seed
+
+    def agreement(self):
+        """
+        Сравнение с аналитической зоной по ячейкам.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : dict
+            'fraction' - доля ячеек с одинаковой оценкой, 'mc_only' и
+            'analytic_only' - число ячеек, подходящих только по
+            моделированию или только по аналитическому критерию.
+        """
+        return {'fraction': float(np.mean(self.good == self.analytic_good)),
+                'mc_only': int(np.count_nonzero(self.good & ~self.analytic_good)),
+                'analytic_only': int(np.count_nonzero(~self.good & self.analytic_good))}
+
+
+def _method_sigmas(method, sigma_1, sigma_2):
+    """
+    СКО измерений и допустимая радиальная ошибка метода.
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (1-3).
+    sigma_1, sigma_2 : float
+        СКО метода (как в calc_zone_method_N).
+
+    Возвращаемое значение:
+    ----------------------
+    sigma_meas : float
+        СКО измерений (для метода 3 - в радианах).
+    sigma_allow : float
+        Допустимая радиальная ошибка.
+    """
+    if method not in (1, 2, 3):
+        raise ValueError(f'Неизвестный метод: {method}')
+    sigma_meas = math.radians(sigma_2) if method == 3 else sigma_2
+    return sigma_meas, sigma_1
+
+
+def _measure(method, X, Y, A, B):
+    """
+    Измерения метода и их производные по координатам.
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (1-3).
+    X, Y : numpy.ndarray
+        Координаты точек.
+    A, B : float[2]
+        Координаты маяков.
+
+    Возвращаемое значение:
+    ----------------------
+    z : (numpy.ndarray, numpy.ndarray)
+        Два измерения в точках.
+    J : ((numpy.ndarray, numpy.ndarray), (numpy.ndarray, numpy.ndarray))
+        Матрица производных: J[i][0] - по X, J[i][1] - по Y.
+    """
+    z, J = [], []
+    for S in (A, B):
+        dx, dy = X - S[0], Y - S[1]
+        rho = np.hypot(dx, dy)
+        if method == 3:
+            z.append(np.arctan2(dy, dx))
+            J.append((-dy / rho**2, dx / rho**2))
+        elif method == 2:
+            z.append(rho)
+            J.append((dx / rho, dy / rho))
+        else:
+            # разность дальностей до маяка и до ведущей станции (начало координат)
+            rho_0 = np.hypot(X, Y)
+            z.append(rho - rho_0)
+            J.append((dx / rho - X / rho_0, dy / rho - Y / rho_0))
+    return z, J
+
+
+def _simulate_block(method, A, B, sigma_1, sigma_2, P, r, rays_count, rays, samples, seed_seq):
+    """
+    Моделирование для блока лучей сетки.
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (1-3).
+    A, B : float[2]
+        Координаты маяков.
+    sigma_1, sigma_2 : float
+        СКО метода.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    rays_count : int
+        Количество лучей сетки.
+    rays : (int, int)
+        Номера первого и следующего за последним лучей блока.
+    samples : int
+        Количество розыгрышей в ячейке.
+    seed_seq : numpy.random.SeedSequence
+        Начальное состояние генератора блока.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : numpy.ndarray[rays[1] - rays[0], P]
+        Среднеквадратическая радиальная ошибка в ячейках блока.
+    """
+    sigma_meas, _ = _method_sigmas(method, sigma_1, sigma_2)
+    angles = np.arange(*rays) * (2 * math.pi / rays_count)
+    radii = np.arange(1, P + 1) * r
+    X0 = np.multiply.outer(np.cos(angles), radii)[..., None]
+    Y0 = np.multiply.outer(np.sin(angles), radii)[..., None]
+
+    rng = np.random.default_rng(seed_seq)
+    shape = X0.shape[:2] + (samples,)
+    X, Y = np.broadcast_to(X0, shape).copy(), np.broadcast_to(Y0, shape).copy()
+    # в точках на маяках и на линиях неопределенности деление на ноль дает
+    # inf/nan, такие ячейки считаются неподходящими
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_true, _ = _measure(method, X0, Y0, A, B)
+        z = [value + sigma_meas * rng.standard_normal(shape) for value in z_true]
+        for _ in range(MC_ITERATIONS):
+            z_est, ((J00, J01), (J10, J11)) = _measure(method, X, Y, A, B)
+            res_0, res_1 = z[0] - z_est[0], z[1] - z_est[1]
+            if method == 3:
+                res_0 = (res_0 + math.pi) % (2 * math.pi) - math.pi
+                res_1 = (res_1 + math.pi) % (2 * math.pi) - math.pi
+            det = J00 * J11 - J01 * J10
+            X += (J11 * res_0 - J01 * res_1) / det
+            Y += (J00 * res_1 - J10 * res_0) / det
+        error = np.sqrt(np.mean((X - X0)**2 + (Y - Y0)**2, axis=-1))
+    return np.where(np.isfinite(error), error, np.inf)
+
+
+def simulate_zone(method, A, B, sigma_1, sigma_2, P, r, rays_count=MC_RAYS_COUNT,
+                  samples=MC_SAMPLES, seed=0, workers=None):
+    """
+    Проверка зоны метода моделированием местоопределения на полярной
+    сетке (rays_count лучей, P точек с шагом r).
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (1-3).
+    A, B : float[2]
+        Координаты маяков.
+    sigma_1, sigma_2 : float
+        СКО метода (как в calc_zone_method_N).
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    rays_count : int
+        Количество лучей.
+    samples : int
+        Количество розыгрышей в ячейке.
+    seed : int
+        Начальное значение генератора.
+    workers : int | None
+        Количество процессов. None - по числу ядер процессора; 1 - расчет
+        в текущем процессе.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : MonteCarloResult
+        Результат моделирования.
+    """
+    _, sigma_allow = _method_sigmas(method, sigma_1, sigma_2)
+    blocks = [(start, min(start + MC_BLOCK_RAYS, rays_count))
+              for start in range(0, rays_count, MC_BLOCK_RAYS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    args = [(method, A, B, sigma_1, sigma_2, P, r, rays_count, rays, samples, seed_seq)
+            for rays, seed_seq in zip(blocks, seeds)]
+
+    workers = min(workers or os.cpu_count() or 1, len(blocks))
+    if workers == 1:
+        errors = [_simulate_block(*block_args) for block_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            errors = list(executor.map(_simulate_block, *zip(*args)))
+    error = np.concatenate(errors)
+
+    # аналитическая оценка в тех же ячейках
+    angles = np.arange(rays_count) * (2 * math.pi / rays_count)
+    radii = np.arange(1, P + 1) * r
+    X = np.multiply.outer(np.cos(angles), radii)
+    Y = np.multiply.outer(np.sin(angles), radii)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zone_method = get_method(method)
+        calc_metric = zone_method.make_metric([A, B], **zone_method.make_params(sigma_1, sigma_2))
+        _, analytic_good, _ = calc_metric(X, Y, radii)
+    return MonteCarloResult(X, Y, error, sigma_allow, analytic_good, samples, seed)
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
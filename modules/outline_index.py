@@ -0,0 +1,363 @@
+"""
+Модуль пространственного индекса точек контура подходящей области.
+Отвечает на вопрос "как далеко точка от границы рабочей зоны": для
+одиночных точек и массивов точек находит ближайшую точку контура,
+расстояние до нее и направление на нее.
+
+Точки контура раскладываются по ячейкам квадратной сетки (корзинам) и
+сортируются по номеру ячейки, поэтому точки одной ячейки лежат подряд.
+Поиск ведется по кольцам ячеек вокруг ячейки запроса сразу для всех
+запросов: заранее просчитанная карта расстояний до непустых ячеек
+позволяет пропустить пустые кольца, а запрос завершается, как только
+найденное расстояние не больше расстояния до непросмотренных ячеек.
+
+Классы:
+    OutlineIndex
+"""
+import math
+
+import numpy as np
+
+
+OUTLINE_POINTS_PER_CELL = 4     # среднее число точек контура в ячейке индекса
+OUTLINE_QUERY_BLOCK = 2**16     # число запросов, обрабатываемых за один проход
+OUTLINE_RING_TABLE = 32         # начальный наибольший радиус в таблице колец
+
+
+def _expand_segments(starts, counts):
+    """
+    Индексы всех элементов отрезков [start, start + count) подряд.
+
+    Параметры:
+    ----------
+    starts, counts : numpy.ndarray of int
+        Начала и длины отрезков.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : numpy.ndarray of int
+        Индексы элементов отрезков.
+    """
+    shifts = starts - (np.cumsum(counts) - counts)
+    return np.arange(counts.sum()) + np.repeat(shifts, counts)
+
+
+def _chessboard_distance(occupied):
+    """
+    Чебышевское расстояние от каждой ячейки до ближайшей занятой ячейки
+    (два прохода по строкам с масками 3x3; внутри строки распространение
+    идет накопленным минимумом).
+
+    Параметры:
+    ----------
+    occupied : numpy.ndarray[nx, ny] of bool
+        Занятые ячейки (есть хотя бы одна занятая).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : numpy.ndarray[nx, ny] of int
+        Расстояния в ячейках.
+    """
+    nx, ny = occupied.shape
+    dist = np.where(occupied, 0, nx + ny).astype(np.intp)
+    j = np.arange(ny)
+    for rows, flip in ((range(nx), False), (range(nx - 1, -1, -1), True)):
+        previous = None
+        for i in rows:
+            row = dist[i]
+            if previous is not None:
+                near = previous + 1
+                np.minimum(row, near, out=row)
+                np.minimum(row[1:], near[:-1], out=row[1:])
+                np.minimum(row[:-1], near[1:], out=row[:-1])
+            if flip:
+                row[::-1] = np.minimum.accumulate(row[::-1] - j) + j
+            else:
+                row[:] = np.minimum.accumulate(row - j) + j
+            previous = row
+    return dist
+
+
+def _ring_offsets(k_max):
+    """
+    Смещения ячеек колец радиусов 0..k_max подряд: кольцо радиуса k (8k
+    ячеек) обходится по сторонам квадрата, кольцо нулевого радиуса - одна
+    ячейка.
+
+    Параметры:
+    ----------
+    k_max : int
+        Наибольший радиус кольца.
+
+    Возвращаемое значение:
+    ----------------------
+    starts : numpy.ndarray[k_max + 1] of int
+        Начала колец в таблице смещений.
+    offsets : numpy.ndarray[N, 2] of int
+        Смещения ячеек по осям X и Y.
+    """
+    radii = np.arange(k_max + 1)
+    sizes = np.maximum(8 * radii, 1)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    k = np.repeat(radii, sizes)
+    side, t = np.divmod(np.arange(sizes.sum()) - np.repeat(starts, sizes), np.maximum(2 * k, 1))
+    offsets = np.stack((np.choose(side, (t - k, k, k - t, -k)),
+                        np.choose(side, (-k, t - k, k, k - t))), axis=1)
+    return starts, offsets
+
+
+class OutlineIndex:
+    """
+    Пространственный индекс точек контура на сетке корзин.
+
+    Атрибуты:
+    ---------
+    X, Y : numpy.ndarray
+        Координаты точек контура.
+    cell : float
+        Размер ячейки индекса.
+
+    Методы:
+    -------
+    nearest(x, y) -> (float, float, int)
+        Ближайшая точка контура для одной точки.
+    nearest_many(X, Y) -> (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        Ближайшие точки контура для массива точек.
+    """
+
+    def __init__(self, X, Y, points_per_cell=OUTLINE_POINTS_PER_CELL):
+        """
+        Инициализация экземляра класса.
+        Раскладывает точки контура по ячейкам.
+
+        Параметры:
+        ----------
+        X, Y : numpy.ndarray
+            Координаты точек контура.
+        points_per_cell : float
+            Среднее число точек в ячейке (определяет размер ячейки).
+        """
+        self.X = np.asarray(X, dtype=float).ravel()
+        self.Y = np.asarray(Y, dtype=float).ravel()
+        n = len(self.X)
+        if n == 0:
+            self.cell = 1.0
+            self._x0 = self._y0 = 0.0
+            self._nx = self._ny = 1
+            self._order = np.empty(0, dtype=np.intp)
+            self._starts = np.zeros(2, dtype=np.intp)
+            self._empty_rings = np.zeros((1, 1), dtype=np.intp)
+            self._ring_starts, self._ring_offsets = _ring_offsets(0)
+            return
+
+        # размер ячейки - по площади охватывающего прямоугольника: точки
+        # контура лежат на линиях, и более мелкие ячейки не окупаются - время
+        # поиска растет с квадратом отношения расстояния до контура к ячейке
+        self._x0, self._y0 = self.X.min(), self.Y.min()
+        width, height = self.X.max() - self._x0, self.Y.max() - self._y0
+        self.cell = max(math.sqrt(width * height * points_per_cell / n),
+                        max(width, height) * points_per_cell / n, 1e-12)
+        self._nx = int(width // self.cell) + 1
+        self._ny = int(height // self.cell) + 1
+
+        cells = self._cell_of(self.X, self.Y)
+        self._order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=self._nx * self._ny)
+        self._starts = np.concatenate(([0], np.cumsum(counts)))
+
+        # число пустых колец вокруг каждой ячейки (чебышевское расстояние до
+        # ближайшей непустой ячейки): с этого кольца начинается поиск
+        self._empty_rings = _chessboard_distance((counts > 0).reshape(self._nx, self._ny))
+        self._ring_starts, self._ring_offsets = _ring_offsets(OUTLINE_RING_TABLE)
+
+    def _cell_of(self, X, Y):
+        """
+        Номера ячеек для точек (точки вне индекса относятся к ближайшей
+        крайней ячейке).
+
+        Параметры:
+        ----------
+        X, Y : numpy.ndarray
+            Координаты точек.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.ndarray of int
+            Номера ячеек (cx * ny + cy).
+        """
+        cx, cy = self._cell_xy(X, Y)
+        return cx * self._ny + cy
+
+    def _cell_xy(self, X, Y):
+        """
+        Номера столбца и строки ячеек для точек (с ограничением границами
+        индекса).
+
+        Параметры:
+        ----------
+        X, Y : numpy.ndarray
+            Координаты точек.
+
+        Возвращаемое значение:
+        ----------------------
+        cx, cy : numpy.ndarray of int
+            Номера столбцов и строк ячеек.
+        """
+        cx = np.clip(np.floor((X - self._x0) / self.cell), 0, self._nx - 1).astype(np.intp)
+        cy = np.clip(np.floor((Y - self._y0) / self.cell), 0, self._ny - 1).astype(np.intp)
+        return cx, cy
+
+    def nearest(self, x, y):
+        """
+        Ближайшая точка контура для одной точки.
+
+        Параметры:
+        ----------
+        x, y : float
+            Координаты точки.
+
+        Возвращаемое значение:
+        ----------------------
+        distance : float
+            Расстояние до ближайшей точки контура (inf, если контур пуст).
+        bearing : float
+            Направление на ближайшую точку контура [град], отсчитывается от
+            оси X против часовой стрелки, в диапазоне (-180, 180].
+        index : int
+            Номер ближайшей точки контура (-1, если контур пуст).
+        """
+        distances, bearings, indices = self.nearest_many([x], [y])
+        return float(distances[0]), float(bearings[0]), int(indices[0])
+
+    def nearest_many(self, X, Y):
+        """
+        Ближайшие точки контура для массива точек.
+
+        Параметры:
+        ----------
+        X, Y : numpy.ndarray
+            Координаты точек (произвольной формы).
+
+        Возвращаемое значение:
+        ----------------------
+        distances, bearings, indices : numpy.ndarray
+            Расстояния до ближайших точек контура, направления на них [град]
+            и их номера (форма как у X). Для пустого контура - inf, nan, -1.
+        """
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        x, y = X.ravel(), Y.ravel()
+        if not len(self.X):
+            return (np.full(X.shape, np.inf), np.full(X.shape, np.nan),
+                    np.full(X.shape, -1, dtype=np.intp))
+
+        indices = np.empty(x.size, dtype=np.intp)
+        for start in range(0, x.size, OUTLINE_QUERY_BLOCK):
+            block = slice(start, start + OUTLINE_QUERY_BLOCK)
+            indices[block] = self._nearest_block(x[block], y[block])
+
+        dx, dy = self.X[indices] - x, self.Y[indices] - y
+        distances = np.hypot(dx, dy)
+        bearings = np.degrees(np.arctan2(dy, dx))
+        return distances.reshape(X.shape), bearings.reshape(X.shape), indices.reshape(X.shape)
+
+    def _nearest_block(self, x, y):
+        """
+        Поиск ближайших точек контура для блока запросов по кольцам ячеек.
+        Поиск запроса начинается с первого непустого кольца вокруг его
+        ячейки (по карте _empty_rings) и завершается, когда найденное
+        расстояние не больше нижней границы расстояния до непросмотренных
+        ячеек.
+
+        Параметры:
+        ----------
+        x, y : numpy.ndarray
+            Координаты точек запроса.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.ndarray of int
+            Номера ближайших точек контура.
+        """
+        m = len(x)
+        best_d2 = np.full(m, np.inf)
+        best = np.full(m, -1, dtype=np.intp)
+        qx, qy = self._cell_xy(x, y)
+        ring = self._empty_rings[qx, qy]
+        active = np.arange(m)
+
+        while len(active):
+            # ячейки колец (смещения берутся из таблицы колец)
+            k = ring[active]
+            if k.max() >= len(self._ring_starts):
+                self._ring_starts, self._ring_offsets = _ring_offsets(2 * k.max())
+            sizes = np.maximum(8 * k, 1)
+            query = np.repeat(active, sizes)
+            offsets = self._ring_offsets[_expand_segments(self._ring_starts[k], sizes)]
+            cx, cy = qx[query] + offsets[:, 0], qy[query] + offsets[:, 1]
+            valid = (cx >= 0) & (cx < self._nx) & (cy >= 0) & (cy < self._ny)
+            query = query[valid]
+            cells = cx[valid] * self._ny + cy[valid]
+            starts = self._starts[cells]
+            counts = self._starts[cells + 1] - starts
+
+            # все точки ячеек колец
+            total = counts.sum()
+            if total:
+                query = np.repeat(query, counts)
+                points = self._order[_expand_segments(starts, counts)]
+                d2 = (self.X[points] - x[query])**2 + (self.Y[points] - y[query])**2
+
+                # минимум по каждому запросу (пары упорядочены по запросам)
+                head = np.flatnonzero(np.r_[True, query[1:] != query[:-1]])
+                group_min = np.minimum.reduceat(d2, head)
+                owner = query[head]
+                better = group_min < best_d2[owner]
+                hit = np.flatnonzero(d2 == np.repeat(group_min, np.diff(np.r_[head, total])))
+                hit_first = hit[np.r_[True, query[hit[1:]] != query[hit[:-1]]]]
+                best_d2[owner[better]] = group_min[better]
+                best[owner[better]] = points[hit_first][better]
+
+            bound = self._ring_bound(x[active], y[active], qx[active], qy[active], k)
+            active = active[best_d2[active] > bound**2]
+            ring[active] += 1
+        return best
+
+    def _ring_bound(self, x, y, qx, qy, k):
+        """
+        Нижняя граница расстояния от точек запроса до ячеек индекса, не
+        вошедших в кольца 0..k: расстояние до ближайшего из четырех
+        прямоугольников (справа, слева, сверху и снизу от квадрата колец),
+        в которых лежат такие ячейки.
+
+        Параметры:
+        ----------
+        x, y : numpy.ndarray
+            Координаты точек запроса.
+        qx, qy : numpy.ndarray of int
+            Номера столбцов и строк ячеек запросов.
+        k : int
+            Номер последнего просмотренного кольца.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.ndarray
+            Нижние границы расстояний (inf, если просмотрены все ячейки).
+        """
+        fx = (x - self._x0) / self.cell
+        fy = (y - self._y0) / self.cell
+        full_x, full_y = (0, self._nx), (0, self._ny)
+        boxes = (((qx + k + 1, self._nx), full_y), ((0, qx - k), full_y),
+                 (full_x, (qy + k + 1, self._ny)), (full_x, (0, qy - k)))
+        bound = np.full(len(x), np.inf)
+        for (x_lo, x_hi), (y_lo, y_hi) in boxes:
+            gap_x = np.maximum.reduce([x_lo - fx, fx - x_hi, np.zeros_like(fx)])
+            gap_y = np.maximum.reduce([y_lo - fy, fy - y_hi, np.zeros_like(fy)])
+            empty = (np.asarray(x_lo) >= x_hi) | (np.asarray(y_lo) >= y_hi)
+            bound = np.minimum(bound, np.where(empty, np.inf, np.hypot(gap_x, gap_y)))
+        return bound * self.cell
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
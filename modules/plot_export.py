@@ -0,0 +1,203 @@
+"""
+Модуль экспорта графиков в файлы PNG и SVG заданного размера.
+Экспортируемая фигура строится заново по данным графика вкладки в
+отдельном виджете, который не выводится на экран, поэтому экспорт не
+меняет график на вкладке и работает на платформе Qt offscreen.
+
+Большие наборы точек (подходящая область) не рисуются поточечно, а
+растеризуются в изображение с ячейкой порядка размера маркера на экспорте:
+объем памяти и размер SVG не зависят от количества точек.
+
+Функции:
+    export_items(items, view_range, path, width, height, labels=('Ось Y', 'Ось X'), show_legend=True) -> None
+    export_graph(graph, path, width, height, show_legend=True) -> None
+"""
+import math
+import os.path
+
+import numpy as np
+import pyqtgraph as pg
+import pyqtgraph.exporters
+from PyQt5 import QtCore
+
+
+EXPORT_FORMATS = ('png', 'svg')     # поддерживаемые форматы
+EXPORT_MAX_SCATTER = 50_000         # наибольшее число точек, рисуемых маркерами
+EXPORT_BASE_WIDTH = 800             # ширина фигуры до масштабирования на экспорт [пикс.]
+
+# параметры отображения наборов точек графика
+ZONE_STYLE = dict(symbol='o', symbolSize=5, symbolPen='b', symbolBrush='b',
+                  name='Подходящая область')
+OUTLINE_STYLE = dict(symbol='o', symbolSize=5, symbolPen='k', symbolBrush='k',
+                     name='Контур подходящей области')
+STATIONS_STYLE = dict(symbol='t1', symbolSize=20, symbolPen='r', symbolBrush='r', name='Маяки')
+
+
+def _rasterize_points(X, Y, x_range, y_range, shape):
+    """
+    Растеризация точек: ячейка изображения заполняется, если в нее попала
+    хотя бы одна точка.
+
+    Параметры:
+    ----------
+    X, Y : numpy.ndarray
+        Координаты точек.
+    x_range, y_range : float[2]
+        Границы области изображения по осям.
+    shape : int[2]
+        Количество ячеек изображения по осям X и Y.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : numpy.ndarray[shape] of uint8
+        Изображение (1 - ячейка заполнена), индексы - [x, y].
+    """
+    nx, ny = shape
+    ix = np.floor((X - x_range[0]) * (nx / (x_range[1] - x_range[0]))).astype(np.intp)
+    iy = np.floor((Y - y_range[0]) * (ny / (y_range[1] - y_range[0]))).astype(np.intp)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    image = np.zeros((nx, ny), dtype=np.uint8)
+    image[ix[inside], iy[inside]] = 1
+    return image
+
+
+def _add_raster_item(plot, X, Y, opts, scale):
+    """
+    Добавление на фигуру растеризованного набора точек и пустого набора
+    с теми же маркерами для легенды.
+
+    Параметры:
+    ----------
+    plot : pyqtgraph.PlotItem
+        Фигура.
+    X, Y : numpy.ndarray
+        Координаты точек.
+    opts : dict
+        Параметры отображения исходного набора точек (PlotDataItem.opts).
+    scale : float
+        Масштаб экспорта (пикселей файла на пиксель фигуры).
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    view_box = plot.getViewBox()
+    x_range, y_range = view_box.viewRange()
+    rect = view_box.sceneBoundingRect()
+    cell = max(1.0, opts['symbolSize'] * scale / 2)
+    shape = (max(1, math.ceil(rect.width() * scale / cell)),
+             max(1, math.ceil(rect.height() * scale / cell)))
+
+    color = pg.mkBrush(opts['symbolBrush']).color()
+    image = pg.ImageItem(_rasterize_points(X, Y, x_range, y_range, shape), axisOrder='col-major')
+    image.setLookupTable(np.array([[0, 0, 0, 0], [color.red(), color.green(), color.blue(), 255]],
+                                  dtype=np.uint8))
+    image.setLevels([0, 1])
+    image.setRect(QtCore.QRectF(x_range[0], y_range[0],
+                                x_range[1] - x_range[0], y_range[1] - y_range[0]))
+    plot.addItem(image)
+    plot.plot([], [], pen=None, symbol=opts['symbol'], symbolSize=opts['symbolSize'],
+              symbolPen=opts['symbolPen'], symbolBrush=opts['symbolBrush'], name=opts.get('name'))
+
+
+def export_items(items, view_range, path, width, height, labels=('Ось Y', 'Ось X'),
+                 show_legend=True):
+    """
+    Экспорт наборов точек в файл PNG или SVG заданного размера. Формат
+    определяется по расширению файла.
+
+    Параметры:
+    ----------
+    items : list[(numpy.ndarray, numpy.ndarray, dict)]
+        Наборы точек: координаты и параметры отображения (ключи 'symbol',
+        'symbolSize', 'symbolPen', 'symbolBrush', 'name' - как у
+        ZONE_STYLE; без 'name' набор не выводится в легенде).
+    view_range : (float[2], float[2])
+        Область просмотра: границы по осям X и Y.
+    path : str
+        Путь к файлу (.png или .svg).
+    width, height : int
+        Размер изображения [пикс.].
+    labels : str[2]
+        Подписи осей Y и X.
+    show_legend : bool
+        Флаг отображения легенды.
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    fmt = os.path.splitext(path)[1].lower().lstrip('.')
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Неподдерживаемый формат файла: {fmt}')
+    if width <= 0 or height <= 0:
+        raise ValueError('Размер изображения должен быть положительным')
+
+    # фигура с пропорциями изображения; на экран не выводится
+    figure = pg.PlotWidget()
+    figure.setAttribute(QtCore.Qt.WA_DontShowOnScreen)
+    figure.resize(EXPORT_BASE_WIDTH, max(1, round(EXPORT_BASE_WIDTH * height / width)))
+    figure.show()
+    try:
+        plot = figure.getPlotItem()
+        for axis, label in zip(('left', 'bottom'), labels):
+            figure.setLabel(axis, label)
+        figure.showGrid(x=True, y=True)
+        plot.setRange(xRange=view_range[0], yRange=view_range[1], padding=0)
+        if show_legend:
+            plot.addLegend(offset=(70, 20), frame=True, brush='w')
+        QtCore.QCoreApplication.processEvents()
+
+        scale = width / figure.width()
+        for X, Y, opts in items:
+            if X is None:
+                X = Y = np.empty(0)
+            if len(X) > EXPORT_MAX_SCATTER:
+                _add_raster_item(plot, X, Y, opts, scale)
+            else:
+                plot.plot(X, Y, pen=None, symbol=opts['symbol'], symbolSize=opts['symbolSize'],
+                          symbolPen=opts['symbolPen'], symbolBrush=opts['symbolBrush'],
+                          name=opts.get('name'))
+
+        # ширина и высота задаются независимо (без подгонки пропорций экспортером)
+        exporter_cls = pg.exporters.ImageExporter if fmt == 'png' else pg.exporters.SVGExporter
+        exporter = exporter_cls(plot)
+        exporter.parameters()['width'] = width
+        exporter.parameters().param('height').setValue(height, blockSignal=exporter.heightChanged)
+        exporter.export(path)
+    finally:
+        figure.close()
+        figure.deleteLater()
+
+
+def export_graph(graph, path, width, height, show_legend=True):
+    """
+    Экспорт графика в файл PNG или SVG заданного размера. Наборы точек,
+    область просмотра и подписи осей берутся с исходного графика.
+
+    Параметры:
+    ----------
+    graph : pyqtgraph.PlotWidget
+        Исходный график.
+    path : str
+        Путь к файлу (.png или .svg).
+    width, height : int
+        Размер изображения [пикс.].
+    show_legend : bool
+        Флаг отображения легенды.
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    source = graph.getPlotItem()
+    # экспортируются наборы точек (линии без маркеров, например замер, - нет)
+    items = [(*item.getData(), item.opts) for item in source.listDataItems()
+             if item.opts.get('symbol') is not None]
+    labels = [source.getAxis(axis).labelText for axis in ('left', 'bottom')]
+    export_items(items, source.viewRange(), path, width, height, labels, show_legend)
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
@@ -0,0 +1,321 @@
+"""
+Модуль упреждающего расчета соседних значений параметров.
+
+Обычно значение параметра (поля ввода) меняется на один шаг (singleStep)
+вверх или вниз, после чего построение повторяется. После построения на
+вкладке для значений последнего измененного параметра на шаг больше и
+меньше текущего результаты рассчитываются заранее - по одному в отдельном
+потоке - и сохраняются в кэше результатов BuildCache. Следующее построение
+с таким значением берет результат из кэша без расчета. Настоящий расчет
+отменяет упреждающие (кроме расчета тех же параметров, результат которого
+используется): ожидающие снимаются с очереди, а выполняющемуся
+устанавливается флаг отмены (threading.Event), который расчет проверяет
+между блоками лучей, так что поток и память быстро освобождаются.
+
+Классы:
+    BuildCache
+    Prefetcher
+
+Функции:
+    step_values(spinbox) -> list[float]
+"""
+import logging
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QDoubleSpinBox
+
+from modules import mem_telemetry
+from modules.scheduler import ZoneJobScheduler
+
+
+logger = logging.getLogger(__name__)
+
+
+def step_values(spinbox):
+    """
+    Значения поля ввода на один шаг больше и меньше текущего (в пределах
+    допустимого диапазона, с округлением как у поля ввода).
+
+    Параметры:
+    ----------
+    spinbox : PyQt5.QtWidgets.QAbstractSpinBox
+        Поле ввода (QSpinBox или QDoubleSpinBox).
+
+    Возвращаемое значение:
+    ----------------------
+    values : list[float]
+        Значения: сначала на шаг больше, затем на шаг меньше.
+    """
+    value, step = spinbox.value(), spinbox.singleStep()
+    values = []
+    for new_value in (value + step, value - step):
+        if isinstance(spinbox, QDoubleSpinBox):
+            new_value = round(new_value, spinbox.decimals())
+        if spinbox.minimum() <= new_value <= spinbox.maximum() and new_value != value:
+            values.append(new_value)
+    return values
+
+
+class BuildCache:
+    """
+    Кэш результатов построений с ограничением по количеству (вытесняются
+    давно использованные результаты).
+
+    Атрибуты:
+    ---------
+    max_items : int
+        Наибольшее количество результатов.
+
+    Методы:
+    -------
+    get(key) -> object | None
+        Результат по ключу.
+    put(key, result) -> None
+        Добавление результата.
+    clear() -> None
+        Очистка кэша.
+    nbytes() -> int
+        Объем массивов результатов.
+    """
+
+    def __init__(self, max_items):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        max_items : int
+            Наибольшее количество результатов.
+        """
+        self.max_items = max_items
+        self._results = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._results
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key):
+        """
+        Результат по ключу (отмечается как использованный).
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ - параметры построения.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : object | None
+            Результат или None, если его нет в кэше.
+        """
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        """
+        Добавление результата с вытеснением давно использованных.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ - параметры построения.
+        result : object
+            Результат.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_items:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """
+        Очистка кэша.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._results.clear()
+
+    def nbytes(self):
+        """
+        Объем массивов результатов (и объектов в них).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Объем [байт].
+        """
+        results = list(self._results.values())
+        objects = [item for result in results if isinstance(result, (list, tuple))
+                   for build in result if isinstance(build, (list, tuple)) for item in build]
+        return mem_telemetry.arrays_nbytes(*results, *objects)
+
+
+class Prefetcher(QObject):
+    """
+    Упреждающие расчеты: выполняются по одному в отдельном потоке,
+    результаты сохраняются в кэш. Отмена выполняющегося расчета -
+    кооперативная: через флаг cancel, который планировщик
+    (ZoneJobScheduler) передает функции расчета.
+
+    Атрибуты:
+    ---------
+    finished : pyqtSignal(object, object)
+        Упреждающий расчет завершен: ключ, результат.
+    failed : pyqtSignal(object, object)
+        Упреждающий расчет завершен с ошибкой: ключ, исключение.
+    cache : BuildCache
+        Кэш результатов построений.
+
+    Методы:
+    -------
+    submit(key, fn, *args) -> None
+        Постановка упреждающего расчета в очередь.
+    cancel(keep=None) -> None
+        Отмена упреждающих расчетов.
+    is_busy(key) -> bool
+        Выполняется ли упреждающий расчет с ключом.
+    """
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, object)
+
+    def __init__(self, parent=None, cache_size=6):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        parent : PyQt5.QtCore.QObject | None
+            Родительский объект.
+        cache_size : int
+            Наибольшее количество результатов в кэше.
+        """
+        super().__init__(parent)
+        self.cache = BuildCache(cache_size)
+        self._keys = set()      # ключи ожидающих и выполняющихся расчетов
+        self._scheduler = ZoneJobScheduler(self, max_threads=1)
+        self._scheduler.finished.connect(self._on_finished)
+        self._scheduler.failed.connect(self._on_failed)
+
+    def submit(self, key, fn, *args):
+        """
+        Постановка упреждающего расчета в очередь, если его результата нет
+        в кэше и он еще не рассчитывается.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ - параметры построения.
+        fn : callable(*args, cancel)
+            Функция расчета. Выполняется в другом потоке и не должна
+            обращаться к элементам ГПИ. Именованный аргумент cancel
+            (threading.Event) - флаг отмены, который функция проверяет по
+            ходу расчета.
+        *args
+            Аргументы функции расчета.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if key in self.cache or key in self._keys:
+            return
+        self._keys.add(key)
+        self._scheduler.submit(key, fn, *args, cancellable=True)
+
+    def cancel(self, keep=None):
+        """
+        Отмена упреждающих расчетов: ожидающие снимаются с очереди,
+        выполняющимся устанавливается флаг отмены (их результаты
+        отбрасываются).
+
+        Параметры:
+        ----------
+        keep : hashable | None
+            Ключ расчета, который не отменяется.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        for key in list(self._keys):
+            if key != keep:
+                self._keys.discard(key)
+                self._scheduler.cancel(key)
+
+    def is_busy(self, key):
+        """
+        Выполняется (или ожидает) ли упреждающий расчет с ключом.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ - параметры построения.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : bool
+            Флаг наличия расчета.
+        """
+        return key in self._keys
+
+    def _on_finished(self, key, result):
+        """
+        Сохранение результата упреждающего расчета в кэш.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ - параметры построения.
+        result : object
+            Результат.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._keys.discard(key)
+        self.cache.put(key, result)
+        self.finished.emit(key, result)
+
+    def _on_failed(self, key, error):
+        """
+        Обработка ошибки упреждающего расчета.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ - параметры построения.
+        error : Exception
+            Исключение, возникшее при расчете.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._keys.discard(key)
+        logger.debug('Упреждающий расчет не выполнен: %s: %s', type(error).__name__, error)
+        self.failed.emit(key, error)
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
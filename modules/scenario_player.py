@@ -0,0 +1,374 @@
+"""
+Модуль воспроизведения сценариев движения маяков.
+
+Кадры сценария рассчитываются в фоне (modules.scheduler.ZoneJobScheduler,
+ключ расчета - номер кадра) с опережением воспроизведения не более чем на
+lookahead кадров и не более, чем помещается в кэш кадров
+(modules.trajectory.FrameCache). Кадры выводятся по таймеру с постоянной
+частотой; если очередной кадр еще не рассчитан, воспроизведение ждет его
+(буферизация). При перемотке расчеты кадров вне нового окна опережения
+отменяются.
+
+Классы:
+    ScenarioPlayer
+"""
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+
+from modules.scheduler import ZoneJobScheduler
+from modules.trajectory import FrameCache, frame_nbytes
+
+
+class ScenarioPlayer(QObject):
+    """
+    Проигрыватель сценария движения маяков.
+
+    Атрибуты:
+    ---------
+    frame_changed : pyqtSignal(int, float, object)
+        Выведен кадр: номер, момент времени [с], кадр.
+    playing_changed : pyqtSignal(bool)
+        Воспроизведение запущено/остановлено.
+    failed : pyqtSignal(object)
+        Ошибка расчета кадра: исключение.
+    trajectory : modules.trajectory.Trajectory | None
+        Траектория сценария.
+    times : numpy.ndarray | None
+        Моменты кадров [с].
+    index : int
+        Номер текущего кадра.
+    cache : modules.trajectory.FrameCache
+        Кэш кадров.
+
+    Методы:
+    -------
+    load(trajectory, frame_fn, *frame_args) -> None
+        Загрузка сценария.
+    unload() -> None
+        Выгрузка сценария.
+    frames_count() -> int
+        Количество кадров.
+    is_playing() -> bool
+        Идет ли воспроизведение.
+    play() -> None
+        Запуск воспроизведения.
+    pause() -> None
+        Остановка воспроизведения.
+    seek(index) -> None
+        Переход к кадру.
+    frame(index) -> tuple
+        Кадр (из кэша или рассчитанный в текущем потоке).
+    """
+    frame_changed = pyqtSignal(int, float, object)
+    playing_changed = pyqtSignal(bool)
+    failed = pyqtSignal(object)
+
+    def __init__(self, parent=None, fps=25, cache_bytes=256 * 2**20, lookahead=50, max_threads=None):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        parent : PyQt5.QtCore.QObject | None
+            Родительский объект.
+        fps : float
+            Частота кадров [1/с].
+        cache_bytes : int
+            Наибольший объем кэша кадров [байт].
+        lookahead : int
+            Наибольшее опережение расчета кадров [кадров].
+        max_threads : int | None
+            Количество потоков расчета кадров. None - по числу ядер.
+        """
+        super().__init__(parent)
+        self.fps = fps
+        self.lookahead = lookahead
+        self.cache = FrameCache(cache_bytes)
+        self.trajectory = None
+        self.times = None
+        self.index = 0
+        self._frame_fn = None
+        self._frame_args = ()
+        self._pending = set()       # номера рассчитываемых кадров
+        self._frame_bytes = 0       # объем последнего рассчитанного кадра
+        self._show_pending = False  # текущий кадр выводится, как только будет рассчитан
+
+        self._scheduler = ZoneJobScheduler(self, max_threads)
+        self._scheduler.finished.connect(self._on_frame_finished)
+        self._scheduler.failed.connect(self._on_frame_failed)
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(round(1000 / fps))
+        self._timer.timeout.connect(self._on_tick)
+
+    def load(self, trajectory, frame_fn, *frame_args):
+        """
+        Загрузка сценария: сброс кэша и запуск расчета первых кадров.
+
+        Параметры:
+        ----------
+        trajectory : modules.trajectory.Trajectory
+            Траектория маяков.
+        frame_fn : callable(A, B, *frame_args) -> tuple
+            Расчет кадра по координатам маяков. Выполняется в другом
+            потоке и не должен обращаться к элементам ГПИ.
+        *frame_args
+            Остальные аргументы расчета кадра.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.unload()
+        self.trajectory = trajectory
+        self.times = trajectory.frame_times(self.fps)
+        self._frame_fn = frame_fn
+        self._frame_args = frame_args
+        self.seek(0)
+
+    def unload(self):
+        """
+        Выгрузка сценария: остановка воспроизведения, отмена расчетов и
+        очистка кэша.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.pause()
+        for index in list(self._pending):
+            self._scheduler.cancel(index)
+        self._pending.clear()
+        self.cache.clear()
+        self.trajectory = None
+        self.times = None
+        self.index = 0
+        self._show_pending = False
+
+    def frames_count(self):
+        """
+        Количество кадров сценария.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Количество кадров (0 без сценария).
+        """
+        return 0 if self.times is None else len(self.times)
+
+    def is_playing(self):
+        """
+        Идет ли воспроизведение.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : bool
+            Флаг воспроизведения.
+        """
+        return self._timer.isActive()
+
+    def play(self):
+        """
+        Запуск воспроизведения (с начала, если текущий кадр - последний).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if not self.frames_count() or self.is_playing():
+            return
+        if self.index == self.frames_count() - 1:
+            self.seek(0)
+        self._timer.start()
+        self.playing_changed.emit(True)
+
+    def pause(self):
+        """
+        Остановка воспроизведения (расчет кадров продолжается; еще не
+        рассчитанный текущий кадр будет выведен после расчета).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self.is_playing():
+            self._timer.stop()
+            self.playing_changed.emit(False)
+
+    def seek(self, index):
+        """
+        Переход к кадру: вывод кадра, если он рассчитан, и перенос окна
+        опережения расчета.
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if not self.frames_count():
+            return
+        self.index = min(max(int(index), 0), self.frames_count() - 1)
+        self._show_pending = not self._show(self.index)
+        self._schedule()
+
+    def frame(self, index):
+        """
+        Кадр из кэша или, если его там нет, рассчитанный в текущем потоке
+        (например, для экспорта).
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : tuple
+            Кадр.
+        """
+        frame = self.cache.get(index)
+        if frame is None:
+            frame = self._frame_fn(*self.trajectory.position(self.times[index]), *self._frame_args)
+        return frame
+
+    def _show(self, index):
+        """
+        Вывод кадра, если он есть в кэше.
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : bool
+            Выведен ли кадр.
+        """
+        frame = self.cache.get(index)
+        if frame is None:
+            return False
+        self.frame_changed.emit(index, float(self.times[index]), frame)
+        return True
+
+    def _schedule(self):
+        """
+        Постановка в очередь расчета кадров окна опережения, которых нет
+        в кэше, в пределах объема кэша; отмена расчетов вне окна.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        window = range(self.index, min(self.index + self.lookahead + 1, self.frames_count()))
+        for index in list(self._pending):
+            if index not in window:
+                self._scheduler.cancel(index)
+                self._pending.discard(index)
+
+        # объем кадров окна - рассчитанных и ожидаемых
+        planned = sum(frame_nbytes(self.cache.get(index)) for index in window if index in self.cache)
+        planned += len(self._pending) * self._frame_bytes
+        for index in window:
+            if index in self.cache or index in self._pending:
+                continue
+            if self._pending and planned + self._frame_bytes > self.cache.max_bytes:
+                break
+            position = self.trajectory.position(self.times[index])
+            self._scheduler.submit(index, self._frame_fn, *position, *self._frame_args)
+            self._pending.add(index)
+            planned += self._frame_bytes
+
+    def _on_tick(self):
+        """
+        Переход к следующему кадру по таймеру (если текущий кадр уже
+        выведен); в конце сценария воспроизведение останавливается.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self._show_pending:
+            return
+        if self.index >= self.frames_count() - 1:
+            self.pause()
+            return
+        self.seek(self.index + 1)
+
+    def _on_frame_finished(self, index, frame):
+        """
+        Сохранение рассчитанного кадра в кэш и, если это текущий еще не
+        выведенный кадр, вывод (в том числе на паузе).
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+        frame : tuple
+            Кадр.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._pending.discard(index)
+        self._frame_bytes = frame_nbytes(frame)
+        self.cache.put(index, frame)
+        if index == self.index and self._show_pending:
+            self._show_pending = not self._show(index)
+        self._schedule()
+
+    def _on_frame_failed(self, index, error):
+        """
+        Обработка ошибки расчета кадра: остановка воспроизведения.
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+        error : Exception
+            Исключение, возникшее при расчете.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._pending.discard(index)
+        self.pause()
+        self.failed.emit(error)
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
@@ -0,0 +1,312 @@
+"""
+Модуль планировщика фоновых расчетов для вкладок ГПИ.
+Каждая вкладка может иметь свой расчет; расчеты выполняются параллельно
+в пуле потоков, расчет видимой вкладки имеет больший приоритет.
+Результаты передаются в главный поток через сигналы Qt. Отмена
+выполняющегося расчета - кооперативная: расчету, принимающему флаг отмены
+(threading.Event), он устанавливается при отмене или вытеснении.
+
+Классы:
+    ZoneJobScheduler
+"""
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+PRIORITY_VISIBLE = 1    # приоритет расчета видимой вкладки
+PRIORITY_HIDDEN = 0     # приоритет расчетов остальных вкладок
+
+
+class _JobSignals(QObject):
+    """
+    Сигналы расчета (QRunnable не может иметь собственных сигналов).
+
+    Атрибуты:
+    ---------
+    finished : pyqtSignal(object, int, object)
+        Расчет завершен: ключ, номер расчета, результат.
+    failed : pyqtSignal(object, int, object)
+        Расчет завершен с ошибкой: ключ, номер расчета, исключение.
+
+    Методы:
+    -------
+    None
+    """
+    finished = pyqtSignal(object, int, object)
+    failed = pyqtSignal(object, int, object)
+
+
+class _ZoneJob(QRunnable):
+    """
+    Расчет, выполняемый в пуле потоков.
+
+    Атрибуты:
+    ---------
+    key : hashable
+        Ключ расчета (например, номер вкладки).
+    job_id : int
+        Номер расчета.
+    cancel_event : threading.Event
+        Флаг отмены расчета.
+
+    Методы:
+    -------
+    run()
+        Выполнение расчета и отправка результата сигналом.
+    """
+
+    def __init__(self, key, job_id, signals, fn, args, cancellable=False):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ расчета.
+        job_id : int
+            Номер расчета.
+        signals : _JobSignals
+            Сигналы для передачи результата.
+        fn : callable
+            Функция расчета. Не должна обращаться к элементам ГПИ.
+        args : tuple
+            Аргументы функции расчета.
+        cancellable : bool
+            Флаг передачи функции расчета флага отмены (именованный
+            аргумент cancel).
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.key = key
+        self.job_id = job_id
+        self.cancel_event = threading.Event()
+        self._signals = signals
+        self._fn = fn
+        self._args = args
+        self._kwargs = {'cancel': self.cancel_event} if cancellable else {}
+
+    def run(self):
+        """
+        Выполнение расчета и отправка результата сигналом.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        try:
+            result = self._fn(*self._args, **self._kwargs)
+        except Exception as e:
+            self._signals.failed.emit(self.key, self.job_id, e)
+        else:
+            self._signals.finished.emit(self.key, self.job_id, result)
+
+
+class ZoneJobScheduler(QObject):
+    """
+    Планировщик фоновых расчетов. Для каждого ключа (вкладки) хранится не
+    более одного актуального расчета: новый расчет вытесняет ожидающий, а
+    результат вытесненного выполняющегося расчета отбрасывается (отменяемому
+    расчету к тому же устанавливается флаг отмены).
+
+    Атрибуты:
+    ---------
+    finished : pyqtSignal(object, object)
+        Актуальный расчет завершен: ключ, результат.
+    failed : pyqtSignal(object, object)
+        Актуальный расчет завершен с ошибкой: ключ, исключение.
+
+    Методы:
+    -------
+    submit(key, fn, *args, cancellable=False) -> None
+        Постановка расчета в очередь.
+    cancel(key) -> None
+        Отмена расчета.
+    is_busy(key) -> bool
+        Есть ли у ключа актуальный расчет.
+    set_visible(key) -> None
+        Смена видимой вкладки (приоритетного ключа).
+    """
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, object)
+
+    def __init__(self, parent=None, max_threads=None):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        parent : PyQt5.QtCore.QObject | None
+            Родительский объект.
+        max_threads : int | None
+            Наибольшее число потоков пула. None - по числу ядер процессора.
+        """
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        if max_threads is not None:
+            self._pool.setMaxThreadCount(max_threads)
+        self._signals = _JobSignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._ids = itertools.count()
+        self._jobs = {}     # актуальные расчеты по ключам
+        self._alive = {}    # все запущенные расчеты по номерам (до завершения)
+        self._visible = None
+
+    def _priority(self, key):
+        """
+        Приоритет расчета для ключа.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ расчета.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Приоритет.
+        """
+        return PRIORITY_VISIBLE if key == self._visible else PRIORITY_HIDDEN
+
+    def submit(self, key, fn, *args, cancellable=False):
+        """
+        Постановка расчета в очередь. Предыдущий расчет с тем же ключом
+        отменяется.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ расчета (например, номер вкладки).
+        fn : callable
+            Функция расчета. Выполняется в другом потоке и не должна
+            обращаться к элементам ГПИ.
+        *args
+            Аргументы функции расчета.
+        cancellable : bool
+            Флаг отменяемого расчета: функции передается именованный
+            аргумент cancel (threading.Event), который она проверяет по ходу
+            расчета и прерывает его при установке.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self.cancel(key)
+        job = _ZoneJob(key, next(self._ids), self._signals, fn, args, cancellable)
+        self._jobs[key] = job
+        self._alive[job.job_id] = job
+        self._pool.start(job, self._priority(key))
+
+    def cancel(self, key):
+        """
+        Отмена расчета. Ожидающий расчет убирается из очереди, выполняющемуся
+        устанавливается флаг отмены, а его результат (или ошибка прерывания)
+        будет отброшен.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ расчета.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return
+        job.cancel_event.set()
+        if self._pool.tryTake(job):
+            del self._alive[job.job_id]
+
+    def is_busy(self, key):
+        """
+        Есть ли у ключа актуальный (ожидающий или выполняющийся) расчет.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ расчета.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : bool
+            Флаг наличия расчета.
+        """
+        return key in self._jobs
+
+    def set_visible(self, key):
+        """
+        Смена видимой вкладки. Ожидающие в очереди расчеты переставляются
+        в соответствии с новыми приоритетами.
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ видимой вкладки.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._visible = key
+        for job in list(self._jobs.values()):
+            if self._pool.tryTake(job):
+                self._pool.start(job, self._priority(job.key))
+
+    def _on_finished(self, key, job_id, result):
+        """
+        Обработка завершения расчета (в главном потоке).
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ расчета.
+        job_id : int
+            Номер расчета.
+        result : object
+            Результат расчета.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._alive.pop(job_id, None)
+        job = self._jobs.get(key)
+        if job is not None and job.job_id == job_id:
+            del self._jobs[key]
+            self.finished.emit(key, result)
+
+    def _on_failed(self, key, job_id, error):
+        """
+        Обработка ошибки расчета (в главном потоке).
+
+        Параметры:
+        ----------
+        key : hashable
+            Ключ расчета.
+        job_id : int
+            Номер расчета.
+        error : Exception
+            Исключение, возникшее при расчете.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._alive.pop(job_id, None)
+        job = self._jobs.get(key)
+        if job is not None and job.job_id == job_id:
+            del self._jobs[key]
+            self.failed.emit(key, error)
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
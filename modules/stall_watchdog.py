@@ -0,0 +1,171 @@
+"""
+Модуль обнаружения зависаний главного потока (цикла событий Qt).
+
+В главном потоке по таймеру отмечается "пульс" цикла событий. Отдельный
+поток-наблюдатель проверяет время последнего пульса; если цикл событий не
+выполнялся дольше порога (STALL_THRESHOLD_MS в config.py), наблюдатель
+сохраняет стек Python главного потока в этот момент. Когда цикл событий
+возобновляется, в журнал (logging, уровень WARNING) записываются
+длительность зависания и сохраненный стек.
+
+Стек снимается, только если главный поток отпускает GIL (например, при
+вызовах Qt и большинства операций numpy); при долгих вызовах, не
+отпускающих GIL, в журнал попадает только длительность.
+
+Классы:
+    StallWatchdog
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+logger = logging.getLogger(__name__)
+
+MIN_BEAT_MS = 10    # наименьший период пульса [мс]
+
+
+class StallWatchdog(QObject):
+    """
+    Наблюдатель зависаний главного потока.
+
+    Атрибуты:
+    ---------
+    threshold : float
+        Порог зависания [с].
+    stalls_count : int
+        Количество обнаруженных зависаний.
+
+    Методы:
+    -------
+    start() -> None
+        Запуск наблюдения (вызывается из главного потока).
+    stop() -> None
+        Остановка наблюдения.
+    """
+
+    def __init__(self, threshold_ms, parent=None):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        threshold_ms : float
+            Порог зависания [мс].
+        parent : PyQt5.QtCore.QObject | None
+            Родительский объект.
+        """
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.stalls_count = 0
+        self._beat_interval = max(MIN_BEAT_MS, threshold_ms / 4) / 1000
+        self._last_beat = time.monotonic()
+        self._stack = None              # стек главного потока при текущем зависании
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._main_ident = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(round(self._beat_interval * 1000))
+        self._timer.timeout.connect(self._beat)
+
+    def start(self):
+        """
+        Запуск наблюдения: таймера пульса и потока-наблюдателя.
+        Вызывается из главного потока.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self._thread is not None:
+            return
+        self._main_ident = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._timer.start()
+        self._thread = threading.Thread(target=self._watch, name='stall-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Остановка наблюдения.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self._thread is None:
+            return
+        self._timer.stop()
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _beat(self):
+        """
+        Пульс цикла событий (главный поток): если перед ним было
+        зависание, запись его в журнал.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        now = time.monotonic()
+        with self._lock:
+            stall = now - self._last_beat - self._beat_interval
+            self._last_beat = now
+            stack, self._stack = self._stack, None
+        if stall <= self.threshold:
+            return
+        self.stalls_count += 1
+        logger.warning('Главный поток не отвечал %.0f мс. Стек при обнаружении:\n%s',
+                       stall * 1000, stack or '(не снят)')
+
+    def _watch(self):
+        """
+        Цикл потока-наблюдателя: снятие стека главного потока при
+        отсутствии пульса дольше порога (один раз за зависание).
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        while not self._stop.wait(self._beat_interval):
+            with self._lock:
+                stalled = time.monotonic() - self._last_beat - self._beat_interval > self.threshold
+                if not stalled or self._stack is not None:
+                    continue
+            frame = sys._current_frames().get(self._main_ident)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+            del frame
+            with self._lock:
+                # пульс мог успеть прийти, пока снимался стек
+                if time.monotonic() - self._last_beat - self._beat_interval > self.threshold:
+                    self._stack = stack
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
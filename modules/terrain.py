@@ -0,0 +1,377 @@
+"""
+Модуль учета рельефа: прямая видимость маяков по растру высот.
+
+Растр высот - двумерная сетка heights[строка, столбец] в файле .npy или в
+двоичном файле без заголовка; файл не загружается, а отображается в память
+(numpy.memmap). Описание растра берется из файла <путь>.json (для .npy -
+необязательного):
+    {"shape": [строк, столбцов], "dtype": "float32",
+     "origin": [x0, y0], "cell": размер_ячейки}
+Центр ячейки (строка i, столбец j) находится в точке
+(x0 + j * cell, y0 + i * cell).
+
+Маяк виден из центра ячейки растра, если угол места приемника (высота
+рельефа + TERRAIN_TARGET_HEIGHT) от антенны маяка (высота рельефа +
+TERRAIN_BEACON_HEIGHT) не меньше наибольшего угла места рельефа между
+ними. Углы места рассчитываются проходом по кольцам ячеек от маяка
+наружу (приближение алгоритма XDraw), векторизованно по сторонам колец;
+растр читается только в пределах прохода. Видимость хранится в кэше по
+положению маяка квадратными фрагментами растра (TERRAIN_TILE x
+TERRAIN_TILE ячеек), проход выполняется только для недостающих
+фрагментов. Точки вне растра считаются видимыми, рельеф вне растра не
+загораживает видимость, высота рельефа под маяком вне растра - 0.
+
+Классы:
+    TerrainRaster
+
+Функции:
+    load_terrain(path, beacon_height=TERRAIN_BEACON_HEIGHT, target_height=TERRAIN_TARGET_HEIGHT) -> TerrainRaster
+    visibility_mask(terrain, stations, X, Y) -> numpy.ndarray
+    mask_zone(zone, terrain, stations) -> ZoneResult
+"""
+import json
+import os.path
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from modules.zone_calc import ZoneResult
+
+
+TERRAIN_TILE = 128              # размер фрагмента растра [ячеек]
+TERRAIN_CACHE_TILES = 512       # количество фрагментов видимости в кэше
+TERRAIN_BEACON_HEIGHT = 10.0    # высота антенны маяка над рельефом
+TERRAIN_TARGET_HEIGHT = 2.0     # высота приемника над рельефом
+_NO_TERRAIN = -1e30             # высота и угол места там, где рельефа нет
+
+
+class TerrainRaster:
+    """
+    Растр высот, отображаемый в память, с кэшем видимости маяков.
+
+    Атрибуты:
+    ---------
+    heights : numpy.ndarray[rows, cols]
+        Высоты рельефа (numpy.memmap, только для чтения).
+    origin : float[2]
+        Координаты центра ячейки (0, 0).
+    cell : float
+        Размер ячейки.
+    beacon_height, target_height : float
+        Высоты антенны маяка и приемника над рельефом.
+
+    Методы:
+    -------
+    height_at(X, Y) -> numpy.ndarray
+        Высоты рельефа в точках.
+    visible_from(station, X, Y) -> numpy.ndarray
+        Видимость маяка из точек.
+    cache_nbytes() -> int
+        Объем кэша видимости.
+    """
+
+    def __init__(self, heights, origin=(0.0, 0.0), cell=1.0,
+                 beacon_height=TERRAIN_BEACON_HEIGHT, target_height=TERRAIN_TARGET_HEIGHT):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        heights : numpy.ndarray[rows, cols]
+            Высоты рельефа.
+        origin : float[2]
+            Координаты центра ячейки (0, 0).
+        cell : float
+            Размер ячейки.
+        beacon_height, target_height : float
+            Высоты антенны маяка и приемника над рельефом.
+        """
+        if heights.ndim != 2:
+            raise ValueError('Растр высот должен быть двумерным')
+        if cell <= 0:
+            raise ValueError('Размер ячейки растра должен быть положительным')
+        self.heights = heights
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.cell = float(cell)
+        self.beacon_height = float(beacon_height)
+        self.target_height = float(target_height)
+        self._cache = OrderedDict()     # (маяк, фрагмент) -> видимость фрагмента
+        self._lock = threading.Lock()
+
+    def _cell_index(self, X, Y):
+        """
+        Номера строк и столбцов ячеек растра, ближайших к точкам.
+
+        Параметры:
+        ----------
+        X, Y : numpy.ndarray
+            Координаты точек.
+
+        Возвращаемое значение:
+        ----------------------
+        rows, cols : numpy.ndarray of int
+            Номера строк и столбцов.
+        inside : numpy.ndarray of bool
+            Маска точек внутри растра.
+        """
+        cols = np.rint((X - self.origin[0]) / self.cell).astype(np.intp)
+        rows = np.rint((Y - self.origin[1]) / self.cell).astype(np.intp)
+        n_rows, n_cols = self.heights.shape
+        inside = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+        return rows, cols, inside
+
+    def height_at(self, X, Y, outside=0.0):
+        """
+        Высоты рельефа в точках (по ближайшей ячейке растра).
+
+        Параметры:
+        ----------
+        X, Y : numpy.ndarray
+            Координаты точек.
+        outside : float
+            Высота для точек вне растра.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.ndarray
+            Высоты рельефа.
+        """
+        rows, cols, inside = self._cell_index(np.asarray(X, dtype=float), np.asarray(Y, dtype=float))
+        result = np.full(rows.shape, outside, dtype=float)
+        result[inside] = self.heights[rows[inside], cols[inside]]
+        return result
+
+    def _sweep(self, station, radius):
+        """
+        Видимость маяка из центров ячеек растра в квадрате радиуса radius
+        (в ячейках) вокруг ячейки маяка. Квадрат проходится кольцами от
+        маяка; для каждой стороны кольца наибольший угол места рельефа
+        между маяком и ячейкой интерполируется по той же стороне
+        предыдущего кольца (приближение алгоритма XDraw). Проходятся только
+        части колец в пределах растра, поэтому время прохода не зависит от
+        удаления маяка от растра.
+
+        Параметры:
+        ----------
+        station : float[2]
+            Координаты маяка.
+        radius : int
+            Радиус квадрата [ячеек].
+
+        Возвращаемое значение:
+        ----------------------
+        row_0, col_0 : int
+            Номера первых строки и столбца квадрата (в пределах растра).
+        visible : numpy.ndarray of bool
+            Видимость маяка в ячейках квадрата (в пределах растра).
+        """
+        n_rows, n_cols = self.heights.shape
+        col_b = (station[0] - self.origin[0]) / self.cell
+        row_b = (station[1] - self.origin[1]) / self.cell
+        col_c, row_c = int(round(col_b)), int(round(row_b))
+        z_beacon = float(self.height_at(station[0], station[1])) + self.beacon_height
+
+        row_0, col_0 = max(row_c - radius, 0), max(col_c - radius, 0)
+        visible = np.ones((max(0, min(row_c + radius + 1, n_rows) - row_0),
+                           max(0, min(col_c + radius + 1, n_cols) - col_0)), dtype=bool)
+        # проходятся только кольца, пересекающие растр: ближе k_min и дальше
+        # k_max ячеек растра нет, вне растра рельеф не загораживает видимость
+        k_min = max(1, -row_c, row_c - n_rows + 1, -col_c, col_c - n_cols + 1)
+        k_max = min(radius, max(row_c, n_rows - 1 - row_c, col_c, n_cols - 1 - col_c))
+        # на сторонах предыдущего кольца (справа, слева, сверху, снизу) в
+        # пределах растра: смещения вдоль стороны и наибольшие углы места
+        # (тангенсы); None - сторона вне растра
+        horizons = [None] * 4
+        for k in range(k_min, k_max + 1):
+            sides = ((col_c + k, n_cols, row_c, n_rows), (col_c - k, n_cols, row_c, n_rows),
+                     (row_c + k, n_rows, col_c, n_cols), (row_c - k, n_rows, col_c, n_cols))
+            for side, (fixed, n_fixed, center, n_along) in enumerate(sides):
+                if not 0 <= fixed < n_fixed:
+                    horizons[side] = None
+                    continue
+                offsets = np.arange(max(-k, -center), min(k, n_along - 1 - center) + 1)
+                along = center + offsets
+                fixed = np.full(len(offsets), fixed)
+                rows, cols = (along, fixed) if side < 2 else (fixed, along)
+                z = self.heights[rows, cols].astype(float)
+                distance = np.hypot(cols - col_b, rows - row_b) * self.cell
+                slope = (z - z_beacon) / distance
+                if horizons[side] is None:
+                    horizon = np.full(len(offsets), _NO_TERRAIN)
+                else:
+                    # лучи, не проходившие через растр, рельефом не загорожены
+                    horizon = np.interp(offsets * ((k - 1) / k), *horizons[side],
+                                        left=_NO_TERRAIN, right=_NO_TERRAIN)
+                visible[rows - row_0, cols - col_0] = (
+                    (z + self.target_height - z_beacon) / distance >= horizon)
+                horizons[side] = offsets, np.maximum(horizon, slope)
+        return row_0, col_0, visible
+
+    def visible_from(self, station, X, Y):
+        """
+        Видимость маяка из точек. Видимость хранится в кэше фрагментами
+        растра; для недостающих фрагментов выполняется проход от маяка до
+        самого дальнего из них.
+
+        Параметры:
+        ----------
+        station : float[2]
+            Координаты маяка.
+        X, Y : numpy.ndarray
+            Координаты точек.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.ndarray of bool
+            Видимость маяка (форма как у X).
+        """
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        rows, cols, inside = self._cell_index(X, Y)
+        visible = np.ones(X.shape, dtype=bool)
+        rows, cols = rows[inside], cols[inside]
+        n_rows, n_cols = self.heights.shape
+        tiles_per_row = (n_cols - 1) // TERRAIN_TILE + 1
+        tile_ids = (rows // TERRAIN_TILE) * tiles_per_row + cols // TERRAIN_TILE
+        station_key = (float(station[0]), float(station[1]), self.beacon_height, self.target_height)
+
+        needed = np.unique(tile_ids)
+        with self._lock:
+            tiles = {tile_id: self._cache.get((station_key, tile_id)) for tile_id in needed}
+            for tile_id in needed:
+                if tiles[tile_id] is not None:
+                    self._cache.move_to_end((station_key, tile_id))
+        missing = [tile_id for tile_id, tile in tiles.items() if tile is None]
+
+        if missing:
+            # радиус прохода - до дальнего угла недостающих фрагментов
+            row_c, col_c, _ = self._cell_index(np.float64(station[0]), np.float64(station[1]))
+            missing = np.array(missing)
+            tile_rows, tile_cols = np.divmod(missing, tiles_per_row)
+            radius = int(max(np.abs(tile_rows * TERRAIN_TILE - row_c).max(),
+                             np.abs(np.minimum((tile_rows + 1) * TERRAIN_TILE, n_rows) - 1 - row_c).max(),
+                             np.abs(tile_cols * TERRAIN_TILE - col_c).max(),
+                             np.abs(np.minimum((tile_cols + 1) * TERRAIN_TILE, n_cols) - 1 - col_c).max()))
+            row_0, col_0, swept = self._sweep(station, radius)
+            for tile_id, tile_row, tile_col in zip(missing, tile_rows, tile_cols):
+                r_0, c_0 = tile_row * TERRAIN_TILE - row_0, tile_col * TERRAIN_TILE - col_0
+                tiles[tile_id] = swept[r_0:r_0 + TERRAIN_TILE, c_0:c_0 + TERRAIN_TILE].copy()
+            with self._lock:
+                for tile_id in missing:
+                    self._cache[(station_key, tile_id)] = tiles[tile_id]
+                while len(self._cache) > TERRAIN_CACHE_TILES:
+                    self._cache.popitem(last=False)
+
+        # фрагменты (краевые - дополненные) собираются в один массив
+        stack = np.ones((len(needed), TERRAIN_TILE, TERRAIN_TILE), dtype=bool)
+        for i, tile_id in enumerate(needed):
+            tile = tiles[tile_id]
+            stack[i, :tile.shape[0], :tile.shape[1]] = tile
+        visible[inside] = stack[np.searchsorted(needed, tile_ids),
+                                rows % TERRAIN_TILE, cols % TERRAIN_TILE]
+        return visible
+
+    def cache_nbytes(self):
+        """
+        Объем кэша видимости.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Объем фрагментов видимости в кэше [байт].
+        """
+        with self._lock:
+            return sum(tile.nbytes for tile in self._cache.values())
+
+
+def load_terrain(path, beacon_height=TERRAIN_BEACON_HEIGHT, target_height=TERRAIN_TARGET_HEIGHT):
+    """
+    Открытие растра высот (.npy или двоичный файл с описанием в
+    <путь>.json) с отображением в память.
+
+    Параметры:
+    ----------
+    path : str
+        Путь к файлу растра.
+    beacon_height, target_height : float
+        Высоты антенны маяка и приемника над рельефом.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : TerrainRaster
+        Растр высот.
+    """
+    meta = {}
+    if os.path.exists(path + '.json'):
+        with open(path + '.json', encoding='utf-8') as file:
+            meta = json.load(file)
+
+    if path.lower().endswith('.npy'):
+        heights = np.load(path, mmap_mode='r')
+    else:
+        try:
+            shape = tuple(int(size) for size in meta['shape'])
+            dtype = np.dtype(meta.get('dtype', 'float32'))
+        except (KeyError, TypeError) as error:
+            raise ValueError(f'Для двоичного растра нужно описание {path}.json '
+                             f'с размером "shape"') from error
+        heights = np.memmap(path, dtype=dtype, mode='r', shape=shape)
+    return TerrainRaster(heights, meta.get('origin', (0.0, 0.0)), meta.get('cell', 1.0),
+                         beacon_height, target_height)
+
+
+def visibility_mask(terrain, stations, X, Y):
+    """
+    Маска точек, из которых видны все маяки.
+
+    Параметры:
+    ----------
+    terrain : TerrainRaster
+        Растр высот.
+    stations : list[float[2]]
+        Координаты маяков.
+    X, Y : numpy.ndarray
+        Координаты точек.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : numpy.ndarray of bool
+        Маска точек (форма как у X).
+    """
+    mask = np.ones(np.shape(X), dtype=bool)
+    for station in stations:
+        mask &= terrain.visible_from(station, X, Y)
+    return mask
+
+
+def mask_zone(zone, terrain, stations):
+    """
+    Исключение из подходящей области точек, из которых не видны все маяки.
+    Контур строится по сетке (уточнение границы не переносится).
+
+    Параметры:
+    ----------
+    zone : ZoneResult
+        Результат расчета.
+    terrain : TerrainRaster
+        Растр высот.
+    stations : list[float[2]]
+        Координаты маяков.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneResult
+        Результат расчета с учетом видимости маяков.
+    """
+    good = zone.good & visibility_mask(terrain, stations, zone.grid.X, zone.grid.Y)
+    return ZoneResult(zone.grid, zone.metric, good, zone.threshold, zone.calc_metric)
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
@@ -0,0 +1,296 @@
+"""
+Модуль траекторий маяков для сценариев движения.
+
+Траектория задает координаты маяков A и B во времени; между опорными
+точками координаты интерполируются линейно, до первой и после последней
+точки не меняются. Траектория читается из файла:
+- CSV с заголовком t,x1,y1,x2,y2 (время [с], координаты A и B);
+- JSON с опорными точками:
+    {"keyframes": [{"t": 0, "A": [x, y], "B": [x, y]}, ...]}
+  (пример - res/trajectory_example.json).
+
+Кадры сценария (данные графика для моментов времени) хранятся в кэше
+FrameCache с ограничением по объему памяти.
+
+Классы:
+    Trajectory
+    FrameCache
+
+Функции:
+    load_trajectory(path) -> Trajectory
+    frame_nbytes(frame) -> int
+"""
+import csv
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+
+class Trajectory:
+    """
+    Траектория маяков A и B.
+
+    Атрибуты:
+    ---------
+    times : numpy.ndarray[N]
+        Моменты опорных точек [с] (по возрастанию).
+    A, B : numpy.ndarray[N, 2]
+        Координаты маяков в опорных точках.
+
+    Методы:
+    -------
+    duration() -> float
+        Длительность траектории.
+    position(t) -> (float[2], float[2])
+        Координаты маяков в момент t.
+    frame_times(fps) -> numpy.ndarray
+        Моменты кадров при заданной частоте.
+    """
+
+    def __init__(self, times, A, B):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        times : float[N]
+            Моменты опорных точек [с].
+        A, B : float[N][2]
+            Координаты маяков в опорных точках.
+        """
+        times = np.asarray(times, dtype=float)
+        A = np.asarray(A, dtype=float).reshape(-1, 2)
+        B = np.asarray(B, dtype=float).reshape(-1, 2)
+        if not len(times) or len(A) != len(times) or len(B) != len(times):
+            raise ValueError('Траектория должна содержать опорные точки с координатами A и B')
+        order = np.argsort(times, kind='stable')
+        if np.any(np.diff(times[order]) == 0):
+            raise ValueError('Моменты опорных точек траектории повторяются')
+        self.times = times[order]
+        self.A = A[order]
+        self.B = B[order]
+
+    @classmethod
+    def from_keyframes(cls, keyframes):
+        """
+        Создание траектории по опорным точкам.
+
+        Параметры:
+        ----------
+        keyframes : list[dict]
+            Опорные точки с ключами 't', 'A' и 'B'.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : Trajectory
+            Траектория.
+        """
+        try:
+            return cls([frame['t'] for frame in keyframes], [frame['A'] for frame in keyframes],
+                       [frame['B'] for frame in keyframes])
+        except (KeyError, TypeError) as error:
+            raise ValueError('Опорная точка траектории должна содержать "t", "A" и "B"') from error
+
+    def duration(self):
+        """
+        Длительность траектории.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : float
+            Длительность [с].
+        """
+        return float(self.times[-1] - self.times[0])
+
+    def position(self, t):
+        """
+        Координаты маяков в момент t (линейная интерполяция).
+
+        Параметры:
+        ----------
+        t : float
+            Момент времени [с].
+
+        Возвращаемое значение:
+        ----------------------
+        A, B : float[2]
+            Координаты маяков.
+        """
+        return ([float(np.interp(t, self.times, self.A[:, i])) for i in range(2)],
+                [float(np.interp(t, self.times, self.B[:, i])) for i in range(2)])
+
+    def frame_times(self, fps):
+        """
+        Моменты кадров от начала до конца траектории (последний кадр - не
+        позже конца).
+
+        Параметры:
+        ----------
+        fps : float
+            Частота кадров [1/с].
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.ndarray
+            Моменты кадров [с].
+        """
+        count = int(np.floor(self.duration() * fps + 1e-9)) + 1
+        return self.times[0] + np.arange(count) / fps
+
+
+def load_trajectory(path):
+    """
+    Чтение траектории из файла CSV (t,x1,y1,x2,y2) или JSON (опорные точки).
+
+    Параметры:
+    ----------
+    path : str
+        Путь к файлу.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : Trajectory
+        Траектория.
+    """
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as file:
+            return Trajectory.from_keyframes(json.load(file)['keyframes'])
+
+    with open(path, encoding='utf-8', newline='') as file:
+        rows = list(csv.DictReader(file))
+    try:
+        values = np.array([[float(row[key]) for key in ('t', 'x1', 'y1', 'x2', 'y2')]
+                           for row in rows]).reshape(-1, 5)
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError('CSV траектории должен содержать столбцы t,x1,y1,x2,y2') from error
+    return Trajectory(values[:, 0], values[:, 1:3], values[:, 3:5])
+
+
+def frame_nbytes(frame):
+    """
+    Объем массивов кадра.
+
+    Параметры:
+    ----------
+    frame : tuple
+        Кадр: наборы массивов (точки области, точки контура, маяки).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : int
+        Объем [байт].
+    """
+    return sum(np.asarray(array).nbytes for arrays in frame for array in arrays)
+
+
+class FrameCache:
+    """
+    Кэш кадров сценария с ограничением по объему (вытесняются давно
+    использованные кадры).
+
+    Атрибуты:
+    ---------
+    max_bytes : int
+        Наибольший объем кэша [байт].
+    nbytes : int
+        Текущий объем кэша [байт].
+
+    Методы:
+    -------
+    get(index) -> tuple | None
+        Кадр по номеру.
+    put(index, frame) -> None
+        Добавление кадра.
+    clear() -> None
+        Очистка кэша.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        max_bytes : int
+            Наибольший объем кэша [байт].
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._frames = OrderedDict()    # номер кадра -> (кадр, объем)
+
+    def __contains__(self, index):
+        return index in self._frames
+
+    def __len__(self):
+        return len(self._frames)
+
+    def get(self, index):
+        """
+        Кадр по номеру (отмечается как использованный).
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : tuple | None
+            Кадр или None, если его нет в кэше.
+        """
+        item = self._frames.get(index)
+        if item is None:
+            return None
+        self._frames.move_to_end(index)
+        return item[0]
+
+    def put(self, index, frame):
+        """
+        Добавление кадра с вытеснением давно использованных кадров.
+        Кадр больше всего кэша не сохраняется.
+
+        Параметры:
+        ----------
+        index : int
+            Номер кадра.
+        frame : tuple
+            Кадр.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        size = frame_nbytes(frame)
+        if index in self._frames:
+            self.nbytes -= self._frames.pop(index)[1]
+        if size > self.max_bytes:
+            return
+        while self.nbytes + size > self.max_bytes:
+            self.nbytes -= self._frames.popitem(last=False)[1][1]
+        self._frames[index] = (frame, size)
+        self.nbytes += size
+
+    def clear(self):
+        """
+        Очистка кэша.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._frames.clear()
+        self.nbytes = 0
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
@@ -0,0 +1,2384 @@
+"""
+Модуль расчета рабочих зон радионавигационных систем.
+Не зависит от ГПИ: получает параметры метода и возвращает результат расчета
+с подходящими точками и контуром подходящей области.
+
+Точки берутся на лучах из начала координат (по умолчанию RAYS_COUNT лучей
+с шагом по углу 0.1 градуса), на каждом луче - P точек с шагом r. Число
+лучей может быть подобрано под размер пикселя графика (auto_rays_count). Координаты точек
+(полярная сетка) рассчитываются один раз для набора (число лучей, P, r) и
+используются всеми методами только для чтения. Формулы методов вычисляются
+сразу для всей сетки (numpy).
+
+Если маяки расположены зеркально-симметрично относительно оси через начало
+координат, рассчитывается только половина лучей, а остальные получаются
+отражением.
+
+Граница подходящей области на сетке известна с точностью до шага r. Для
+более точного контура пересечения границы на каждом луче уточняются
+бисекцией между соседними точками сетки (режим уточнения контура).
+
+Для произвольного числа станций зона рассчитывается по геометрическому
+фактору (GDOP), который вычисляется сразу для всех точек и станций через
+стопки матриц направлений N x 2. Метод GDOP зарегистрирован в реестре
+(номер GDOP_METHOD) и рассчитывается общим конвейером методов.
+
+Методы хранятся в реестре METHODS (ZoneMethod): метод задает только
+векторизованный критерий, правило порога, схему параметров (MethodParam:
+имя, значение по умолчанию, границы) и допустимое число станций, а сетка,
+симметрия, контур, уточнение границы, расчет блоками и кэш сеток общие.
+Станции передаются списком, параметры - словарем по именам; они
+проверяются по схеме метода. Новый метод добавляется вызовом
+register_method и сразу доступен в calc_zone, calc_zone_all_methods,
+calc_zone_chunked, сервисе и отчетах.
+
+Для сравнения методов несколько методов могут быть рассчитаны за один
+проход: векторы на маяки и угол между ними вычисляются один раз.
+
+Промежуточные величины формул (векторы на маяки, их модули, углы)
+вычисляются на месте в рабочих массивах ZoneWorkspace; сохраняемые между
+расчетами рабочие массивы (например, вкладки ГПИ) позволяют повторять
+расчет на той же сетке почти без выделения памяти.
+
+Расчет может быть отменен из другого потока флагом cancel (threading.Event):
+тогда сетка рассчитывается блоками лучей, флаг проверяется между блоками, и
+при его установке расчет прерывается исключением CalcCancelled.
+
+Для сеток, не помещающихся в память, расчет ведется блоками лучей с записью
+критерия и маски в файл, отображаемый в память; точки для графика и
+статистика затем читаются из файла также блоками. Если файл не задан,
+каждый расчет создает свой временный файл, который удаляется вместе с
+результатом (когда на результат не остается ссылок).
+
+Расчет может вестись в двойной (float64) или одинарной (float32) точности.
+Одинарная точность вдвое уменьшает объем данных; ее допустимость
+проверяется сравнением с двойной на наборе контрольных расположений маяков:
+точки, у которых меняется "подходящесть", подсчитываются (compare_precision),
+и при доле таких точек не более PRECISION_TOL выбирается float32
+(resolve_precision('auto')). Проверка выполняется при первом запросе 'auto'
+(один раз за время работы), ее результаты записываются в журнал.
+
+Классы:
+    CalcCancelled
+    PolarGrid
+    ZoneResult
+    ChunkedZoneResult
+    MethodParam
+    ZoneMethod
+    ZoneWorkspace
+
+Функции:
+    get_polar_grid(rays_count, P, r, precision='float64') -> PolarGrid
+    grid_cache_nbytes() -> int
+    auto_rays_count(P, r, pixel_size) -> int
+    register_method(method) -> ZoneMethod
+    get_method(key) -> ZoneMethod
+    calc_zone(method, stations, params, P, r, use_symmetry=True, boundary_tol=None, rays_count=RAYS_COUNT, precision='float64', workspace=None, cancel=None) -> ZoneResult
+    calc_zone_method_1(X1, Y1, X2, Y2, sigma_r_allow, sigma_t, P, r, use_symmetry=True, boundary_tol=None, rays_count=RAYS_COUNT, precision='float64') -> ZoneResult
+    calc_zone_method_2(A, B, sigma_d, sigma_r, P, r, use_symmetry=True, boundary_tol=None, rays_count=RAYS_COUNT, precision='float64') -> ZoneResult
+    calc_zone_method_3(A, B, sigma_d, sigma_theta, P, r, use_symmetry=True, boundary_tol=None, rays_count=RAYS_COUNT, precision='float64') -> ZoneResult
+    calc_zone_all_methods(stations, params, P, r, use_symmetry=True, boundary_tol=None, rays_count=RAYS_COUNT, precision='float64', methods=(1, 2, 3), workspace=None, cancel=None) -> list[ZoneResult]
+    calc_zone_chunked(method, stations, params, P, r, path=None, rays_count=RAYS_COUNT, block_rays=None, precision='float64', cancel=None, point_mask=None) -> ChunkedZoneResult
+    calc_gdop(X, Y, stations, kind='range') -> numpy.ndarray
+    calc_zone_gdop(stations, sigma, sigma_allow, P, r, kind='range', use_symmetry=True, boundary_tol=None, rays_count=RAYS_COUNT, precision='float64') -> ZoneResult
+    find_mirror_axis(points, tol=MIRROR_TOL) -> int | None
+    compare_precision(result, reference) -> dict
+    calibrate_precision(rays_count=CALIBRATION_RAYS_COUNT, P=CALIBRATION_P) -> list[dict]
+    resolve_precision(precision, tol=PRECISION_TOL) -> str
+"""
+import logging
+import math
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+RAYS_COUNT = 3600                       # количество лучей
+ANGLE_STEP = 2 * math.pi / RAYS_COUNT   # шаг по углу между лучами (0.1 градуса)
+MIN_RAYS_COUNT = 360                    # наименьшее число лучей при автоматическом подборе
+MAX_RAYS_COUNT = 36000                  # наибольшее число лучей при автоматическом подборе
+MIRROR_TOL = 1e-6                       # допуск проверки симметрии по координатам
+GRID_CACHE_SIZE = 8                     # количество хранимых полярных сеток
+GDOP_KINDS = ('range', 'range_difference', 'bearing')  # виды измерений для GDOP
+GDOP_METHOD = 4                         # номер метода GDOP в реестре METHODS
+GDOP_BLOCK_SIZE = 2**21                 # число элементов (станции x точки) в блоке расчета GDOP
+CHUNK_SIZE = 2**20                      # число точек сетки в блоке расчета с записью в файл (и отменяемого)
+PLOT_MAX_POINTS = 2_000_000             # наибольшее число подходящих точек для графика из файла
+PRECISIONS = ('float32', 'float64')     # точности расчета
+PRECISION_TOL = 1e-4                    # допустимая доля точек, меняющих "подходящесть" во float32
+CALIBRATION_RAYS_COUNT = 720            # количество лучей сетки для проверки точности
+CALIBRATION_P = 400                     # количество точек на луче сетки для проверки точности
+
+# контрольные расположения маяков для проверки точности: метод, станции, параметры
+CALIBRATION_CASES = (
+    (1, [[-10, 5], [10, 5]], {'sigma_r_allow': 3, 'sigma_t': 1}),
+    (1, [[-4, 9], [13, -2]], {'sigma_r_allow': 6, 'sigma_t': 1}),
+    (2, [[-10, 0], [10, 0]], {'sigma_d': 5, 'sigma_r': 1}),
+    (2, [[-3, 7], [12, -4]], {'sigma_d': 2, 'sigma_r': 1}),
+    (3, [[-10, 0], [10, 0]], {'sigma_d': 5, 'sigma_theta': 1}),
+    (3, [[-3, 7], [12, -4]], {'sigma_d': 5, 'sigma_theta': 1}),
+)
+
+
+class CalcCancelled(Exception):
+    """
+    Расчет отменен установкой флага cancel.
+    """
+
+
+def _check_cancel(cancel):
+    """
+    Прерывание расчета, если установлен флаг отмены.
+
+    Параметры:
+    ----------
+    cancel : threading.Event | None
+        Флаг отмены расчета.
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    if cancel is not None and cancel.is_set():
+        raise CalcCancelled('Расчет отменен')
+
+
+class PolarGrid:
+    """
+    Полярная сетка точек расчета. Все массивы доступны только для чтения
+    и могут совместно использоваться разными методами и расчетами.
+
+    Атрибуты:
+    ---------
+    rays_count : int
+        Количество лучей.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    angle_step : float
+        Шаг по углу между лучами [рад].
+    dtype : numpy.dtype
+        Тип чисел массивов сетки (float32 или float64).
+    cos, sin : numpy.ndarray[rays_count]
+        Косинусы и синусы углов лучей.
+    radii : numpy.ndarray[P]
+        Расстояния точек луча от начала координат.
+    X, Y : numpy.ndarray[rays_count, P]
+        Координаты точек сетки. Строка - луч, столбец - номер точки на луче.
+
+    Методы:
+    -------
+    None
+    """
+
+    def __init__(self, rays_count, P, r, dtype=np.float64):
+        """
+        Инициализация экземляра класса.
+        Рассчитывает тригонометрические таблицы и координаты точек сетки.
+        Таблицы рассчитываются в двойной точности и затем приводятся к dtype.
+
+        Параметры:
+        ----------
+        rays_count : int
+            Количество лучей.
+        P : int
+            Количество точек на луче.
+        r : float
+            Шаг между точками на луче.
+        dtype : numpy.dtype
+            Тип чисел массивов сетки.
+        """
+        self.rays_count = rays_count
+        self.P = P
+        self.r = r
+        self.angle_step = 2 * math.pi / rays_count
+        self.dtype = np.dtype(dtype)
+
+        angles = np.arange(rays_count) * self.angle_step
+        self.cos = np.cos(angles).astype(self.dtype)
+        self.sin = np.sin(angles).astype(self.dtype)
+        self.radii = (np.arange(1, P + 1) * r).astype(self.dtype)
+        self.X = np.multiply.outer(self.cos, self.radii)
+        self.Y = np.multiply.outer(self.sin, self.radii)
+        for arr in (self.cos, self.sin, self.radii, self.X, self.Y):
+            arr.setflags(write=False)
+
+
+def _check_precision(precision):
+    """
+    Проверка названия точности расчета.
+
+    Параметры:
+    ----------
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : numpy.dtype
+        Тип чисел расчета.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f'Неизвестная точность расчета: {precision}')
+    return np.dtype(precision)
+
+
+_GRIDS = weakref.WeakSet()     # сетки в памяти (для учета объема кэша)
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def get_polar_grid(rays_count, P, r, precision='float64'):
+    """
+    Получение полярной сетки. Сетка рассчитывается один раз для каждого
+    набора параметров (включая точность) и далее берется из кэша.
+
+    Параметры:
+    ----------
+    rays_count : int
+        Количество лучей.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : PolarGrid
+        Полярная сетка (только для чтения).
+    """
+    grid = PolarGrid(int(rays_count), int(P), float(r), _check_precision(precision))
+    _GRIDS.add(grid)
+    return grid
+
+
+def grid_cache_nbytes():
+    """
+    Объем массивов полярных сеток, находящихся в памяти (в кэше
+    get_polar_grid или в используемых результатах расчета).
+
+    Параметры:
+    ----------
+    None
+
+    Возвращаемое значение:
+    ----------------------
+    _ : int
+        Объем массивов [байт].
+    """
+    return sum(arr.nbytes for grid in list(_GRIDS)
+               for arr in (grid.cos, grid.sin, grid.radii, grid.X, grid.Y))
+
+
+class ZoneWorkspace:
+    """
+    Рабочие массивы расчета критериев, сохраняемые между расчетами
+    (например, для вкладки ГПИ при повторных построениях). Формулы методов
+    вычисляются в этих массивах на месте (out=), поэтому повторный расчет
+    на той же сетке почти не выделяет память: новыми остаются только
+    массивы результата (критерий и маска).
+
+    Одновременно рабочими массивами пользуется только один расчет (use);
+    другой расчет в это время получает временные массивы.
+
+    Методы:
+    -------
+    use() -> ZoneWorkspace
+        Захват рабочих массивов на время расчета (менеджер контекста).
+    array(name, shape, dtype) -> numpy.ndarray
+        Рабочий массив.
+    nbytes() -> int
+        Объем рабочих массивов.
+    clear() -> None
+        Освобождение рабочих массивов.
+    """
+
+    def __init__(self):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        None
+        """
+        self._arrays = {}               # имя -> одномерный массив
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def use(self):
+        """
+        Захват рабочих массивов на время расчета. Если они заняты другим
+        расчетом, выдаются временные рабочие массивы.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : ZoneWorkspace
+            Рабочие массивы расчета.
+        """
+        if not self._lock.acquire(blocking=False):
+            yield ZoneWorkspace()
+            return
+        try:
+            yield self
+        finally:
+            self._lock.release()
+
+    def array(self, name, shape, dtype):
+        """
+        Рабочий массив (содержимое не задано). Массив выделяется заново,
+        если сохраненный меньше нужного, более чем вдвое больше или другого
+        типа.
+
+        Параметры:
+        ----------
+        name : str
+            Имя массива.
+        shape : tuple[int]
+            Размер массива.
+        dtype : numpy.dtype
+            Тип чисел.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.ndarray
+            Массив.
+        """
+        dtype = np.dtype(dtype)
+        size = math.prod(shape)
+        buf = self._arrays.get(name)
+        if buf is None or buf.dtype != dtype or not size <= buf.size <= 2 * size:
+            buf = self._arrays[name] = np.empty(size, dtype)
+        return buf[:size].reshape(shape)
+
+    def nbytes(self):
+        """
+        Объем рабочих массивов.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : int
+            Объем [байт].
+        """
+        return sum(buf.nbytes for buf in list(self._arrays.values()))
+
+    def clear(self):
+        """
+        Освобождение рабочих массивов.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._arrays = {}
+
+
+def auto_rays_count(P, r, pixel_size):
+    """
+    Подбор числа лучей так, чтобы расстояние между соседними лучами на
+    внешнем кольце сетки (радиус P * r) было равно размеру пикселя графика.
+    Результат округляется вверх до кратного 4 (оси координат попадают на
+    лучи) и ограничивается диапазоном [MIN_RAYS_COUNT, MAX_RAYS_COUNT].
+
+    Параметры:
+    ----------
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    pixel_size : float
+        Размер пикселя графика в единицах координат.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : int
+        Количество лучей.
+    """
+    if pixel_size <= 0:
+        return MAX_RAYS_COUNT
+    rays_count = math.ceil(2 * math.pi * P * abs(r) / pixel_size / 4) * 4
+    return min(MAX_RAYS_COUNT, max(MIN_RAYS_COUNT, rays_count))
+
+
+class ZoneResult:
+    """
+    Результат расчета рабочей зоны на полярной сетке.
+
+    Атрибуты:
+    ---------
+    grid : PolarGrid
+        Сетка, на которой произведен расчет.
+    metric : numpy.ndarray[rays_count, P]
+        Значение критерия метода (Kr или sin(alpha)) в точках сетки.
+    good : numpy.ndarray[rays_count, P] of bool
+        Маска подходящих точек.
+    outline : numpy.ndarray[rays_count, P] of bool
+        Маска точек контура - подходящих точек, у которых на том же луче
+        есть неподходящая соседняя точка.
+    threshold : float
+        Пороговое значение критерия.
+    calc_metric : callable(X, Y, radii) -> tuple
+        Расчет критерия метода в произвольных точках.
+    boundary_rays : numpy.ndarray of int | None
+        Номера лучей уточненных точек границы (после refine_boundary).
+    boundary_radii : numpy.ndarray | None
+        Расстояния уточненных точек границы от начала координат.
+
+    Методы:
+    -------
+    zone_points() -> tuple
+        Координаты подходящих точек, не входящих в контур.
+    outline_points() -> tuple
+        Координаты точек контура.
+    refine_boundary(tol) -> None
+        Уточнение положения границы на каждом луче.
+    stats() -> dict
+        Статистика подходящей области.
+    metric_at(x, y) -> (float, bool) | None
+        Значение критерия в ближайшей к точке узле сетки.
+    """
+
+    def __init__(self, grid, metric, good, threshold, calc_metric):
+        """
+        Инициализация экземляра класса.
+        Определяет точки контура по маске подходящих точек.
+
+        Параметры:
+        ----------
+        grid : PolarGrid
+            Сетка расчета.
+        metric : numpy.ndarray[rays_count, P]
+            Значение критерия метода.
+        good : numpy.ndarray[rays_count, P] of bool
+            Маска подходящих точек.
+        threshold : float
+            Пороговое значение критерия.
+        calc_metric : callable(X, Y, radii) -> tuple
+            Расчет критерия метода в произвольных точках.
+        """
+        self.grid = grid
+        self.metric = metric
+        self.good = good
+        self.threshold = threshold
+        self.calc_metric = calc_metric
+        self.boundary_rays = None
+        self.boundary_radii = None
+
+        self.outline = _calc_outline(good)
+
+    def zone_points(self):
+        """
+        Координаты подходящих точек, не входящих в контур. Если граница
+        уточнена, контур строится по уточненным точкам, и возвращаются
+        все подходящие точки сетки.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        X, Y : numpy.ndarray
+            Координаты точек.
+        """
+        if self.boundary_radii is not None:
+            return self.grid.X[self.good], self.grid.Y[self.good]
+        mask = self.good & ~self.outline
+        return self.grid.X[mask], self.grid.Y[mask]
+
+    def outline_points(self):
+        """
+        Координаты точек контура подходящей области: уточненные точки
+        границы, если граница уточнена, иначе точки контура на сетке.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        X, Y : numpy.ndarray
+            Координаты точек.
+        """
+        if self.boundary_radii is not None:
+            return (self.grid.cos[self.boundary_rays] * self.boundary_radii,
+                    self.grid.sin[self.boundary_rays] * self.boundary_radii)
+        return self.grid.X[self.outline], self.grid.Y[self.outline]
+
+    def refine_boundary(self, tol):
+        """
+        Уточнение положения границы подходящей области на каждом луче.
+        Пересечения границы ищутся между соседними точками сетки с разной
+        "подходящестью" и уточняются бисекцией сразу для всех лучей.
+        Стоимость - порядка (число пересечений) * log2(r / tol) расчетов
+        критерия.
+
+        Параметры:
+        ----------
+        tol : float
+            Требуемая точность положения границы по расстоянию.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        grid = self.grid
+        rays, idx = np.nonzero(self.good[:, 1:] != self.good[:, :-1])
+        lo = grid.radii[idx]
+        hi = grid.radii[idx + 1]
+        good_lo = self.good[rays, idx]
+        cos, sin = grid.cos[rays], grid.sin[rays]
+
+        iterations = max(0, math.ceil(math.log2(abs(grid.r) / tol))) if tol > 0 else 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(iterations):
+                mid = (lo + hi) / 2
+                _, good_mid, _ = self.calc_metric(cos * mid, sin * mid, np.abs(mid))
+                same = good_mid == good_lo
+                lo = np.where(same, mid, lo)
+                hi = np.where(same, hi, mid)
+
+        self.boundary_rays = rays
+        self.boundary_radii = (lo + hi) / 2
+
+    def stats(self):
+        """
+        Статистика подходящей области.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : dict
+            Словарь со значениями 'points', 'outline_points', 'area', 'max_range'.
+        """
+        stats = _calc_zone_stats(self.good, self.outline, self.grid.radii, self.grid.angle_step)
+        stats['max_range'] = float(stats['max_range'])
+        return stats
+
+    def metric_at(self, x, y):
+        """
+        Значение критерия и "подходящесть" в ближайшем к точке узле сетки.
+        Узел находится по пеленгу и дальности точки за O(1), без расчета
+        критерия.
+
+        Параметры:
+        ----------
+        x, y : float
+            Координаты точки.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : (float, bool) | None
+            Значение критерия и флаг подходящей точки; None, если точка
+            вне сетки.
+        """
+        index = _polar_index(x, y, self.grid.rays_count, self.grid.P, self.grid.r)
+        if index is None:
+            return None
+        return float(self.metric[index]), bool(self.good[index])
+
+
+class ChunkedZoneResult:
+    """
+    Результат расчета рабочей зоны, хранящийся в файле .npy (структурный
+    массив с полями 'metric' и 'good' размером [rays_count, P]). Данные
+    читаются блоками лучей через отображение файла в память, поэтому объем
+    занимаемой памяти не зависит от размера сетки.
+
+    Атрибуты:
+    ---------
+    path : str
+        Путь к файлу с результатом.
+    owns_file : bool
+        Принадлежит ли файл результату (временный файл удаляется, когда
+        на результат не остается ссылок, или вызовом release).
+    rays_count : int
+        Количество лучей.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    threshold : float
+        Пороговое значение критерия.
+    block_rays : int
+        Количество лучей в блоке чтения.
+    dtype : numpy.dtype
+        Тип чисел координат точек блоков.
+
+    Методы:
+    -------
+    iter_blocks() -> iterator
+        Перебор блоков лучей из файла.
+    zone_points(max_points=PLOT_MAX_POINTS) -> tuple
+        Координаты подходящих точек, не входящих в контур (с прореживанием).
+    outline_points() -> tuple
+        Координаты точек контура.
+    stats() -> dict
+        Статистика подходящей области.
+    metric_at(x, y) -> (float, bool) | None
+        Значение критерия в ближайшей к точке узле сетки.
+    release() -> None
+        Удаление принадлежащего результату файла.
+    """
+
+    DTYPE = np.dtype([('metric', np.float32), ('good', np.bool_)])
+
+    def __init__(self, path, rays_count, P, r, threshold, offset, block_rays, dtype=np.float64,
+                 owns_file=False):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        path : str
+            Путь к файлу с результатом.
+        rays_count : int
+            Количество лучей.
+        P : int
+            Количество точек на луче.
+        r : float
+            Шаг между точками на луче.
+        threshold : float
+            Пороговое значение критерия.
+        offset : int
+            Смещение данных от начала файла (размер заголовка .npy).
+        block_rays : int
+            Количество лучей в блоке чтения.
+        dtype : numpy.dtype
+            Тип чисел координат точек блоков.
+        owns_file : bool
+            Принадлежит ли файл результату (удаляется вместе с ним).
+        """
+        self.path = path
+        self.owns_file = owns_file
+        self._finalizer = weakref.finalize(self, _remove_file, path) if owns_file else None
+        self.rays_count = rays_count
+        self.P = P
+        self.r = r
+        self.threshold = threshold
+        self.block_rays = block_rays
+        self.dtype = np.dtype(dtype)
+        self._offset = offset
+        self._angle_step = 2 * math.pi / rays_count
+        self._radii = (np.arange(1, P + 1) * r).astype(self.dtype)
+
+    def _map_block(self, start, stop, mode):
+        """
+        Отображение в память блока лучей [start, stop) файла.
+
+        Параметры:
+        ----------
+        start, stop : int
+            Номера первого и следующего за последним лучей блока.
+        mode : str
+            Режим отображения ('r' или 'r+').
+
+        Возвращаемое значение:
+        ----------------------
+        _ : numpy.memmap[stop - start, P]
+            Блок структурного массива.
+        """
+        return np.memmap(self.path, dtype=self.DTYPE, mode=mode,
+                         offset=self._offset + start * self.P * self.DTYPE.itemsize,
+                         shape=(stop - start, self.P))
+
+    def _block_coords(self, start, stop):
+        """
+        Координаты точек сетки для блока лучей.
+
+        Параметры:
+        ----------
+        start, stop : int
+            Номера первого и следующего за последним лучей блока.
+
+        Возвращаемое значение:
+        ----------------------
+        X, Y : numpy.ndarray[stop - start, P]
+            Координаты точек.
+        """
+        angles = np.arange(start, stop) * self._angle_step
+        cos = np.cos(angles).astype(self.dtype)
+        sin = np.sin(angles).astype(self.dtype)
+        return np.multiply.outer(cos, self._radii), np.multiply.outer(sin, self._radii)
+
+    def iter_blocks(self):
+        """
+        Перебор блоков лучей из файла.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : iterator[(int, int, numpy.ndarray, numpy.ndarray)]
+            Номера первого и следующего за последним лучей блока, маска
+            подходящих точек и маска точек контура блока.
+        """
+        for start in range(0, self.rays_count, self.block_rays):
+            stop = min(start + self.block_rays, self.rays_count)
+            block = self._map_block(start, stop, 'r')
+            good = np.array(block['good'])
+            del block
+            yield start, stop, good, _calc_outline(good)
+
+    def zone_points(self, max_points=PLOT_MAX_POINTS):
+        """
+        Координаты подходящих точек, не входящих в контур. Если точек больше
+        max_points, берется равномерная выборка (каждая k-я точка).
+
+        Параметры:
+        ----------
+        max_points : int
+            Наибольшее количество возвращаемых точек.
+
+        Возвращаемое значение:
+        ----------------------
+        X, Y : numpy.ndarray
+            Координаты точек.
+        """
+        stats = self.stats()
+        step = max(1, math.ceil((stats['points'] - stats['outline_points']) / max_points))
+        xs, ys = [], []
+        for start, stop, good, outline in self.iter_blocks():
+            X, Y = self._block_coords(start, stop)
+            idx = np.flatnonzero(good & ~outline)[::step]
+            xs.append(X.ravel()[idx])
+            ys.append(Y.ravel()[idx])
+        return np.concatenate(xs), np.concatenate(ys)
+
+    def outline_points(self):
+        """
+        Координаты точек контура подходящей области.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        X, Y : numpy.ndarray
+            Координаты точек.
+        """
+        xs, ys = [], []
+        for start, stop, good, outline in self.iter_blocks():
+            X, Y = self._block_coords(start, stop)
+            xs.append(X[outline])
+            ys.append(Y[outline])
+        return np.concatenate(xs), np.concatenate(ys)
+
+    def stats(self):
+        """
+        Статистика подходящей области, рассчитанная по файлу.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : dict
+            Словарь со значениями 'points', 'outline_points', 'area', 'max_range'.
+        """
+        if getattr(self, '_stats', None) is None:
+            total = {'points': 0, 'outline_points': 0, 'area': 0.0, 'max_range': 0.0}
+            for _, _, good, outline in self.iter_blocks():
+                block = _calc_zone_stats(good, outline, self._radii, self._angle_step)
+                for key in ('points', 'outline_points', 'area'):
+                    total[key] += block[key]
+                total['max_range'] = max(total['max_range'], float(block['max_range']))
+            self._stats = total
+        return dict(self._stats)
+
+    def metric_at(self, x, y):
+        """
+        Значение критерия и "подходящесть" в ближайшем к точке узле сетки.
+        Из файла читается только один луч.
+
+        Параметры:
+        ----------
+        x, y : float
+            Координаты точки.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : (float, bool) | None
+            Значение критерия и флаг подходящей точки; None, если точка
+            вне сетки.
+        """
+        index = _polar_index(x, y, self.rays_count, self.P, self.r)
+        if index is None:
+            return None
+        ray, idx = index
+        block = self._map_block(ray, ray + 1, 'r')
+        value = block[0, idx]
+        del block
+        return float(value['metric']), bool(value['good'])
+
+    def release(self):
+        """
+        Удаление принадлежащего результату файла (после этого данные
+        результата недоступны). Для файла, не принадлежащего результату,
+        ничего не делает.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+
+def _remove_file(path):
+    """
+    Удаление файла результата (ошибки, например, уже удаленного файла,
+    пропускаются).
+
+    Параметры:
+    ----------
+    path : str
+        Путь к файлу.
+
+    Возвращаемое значение:
+    ----------------------
+    None
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _polar_index(x, y, rays_count, P, r):
+    """
+    Номер луча и номер точки на луче ближайшего к точке узла полярной сетки.
+
+    Параметры:
+    ----------
+    x, y : float
+        Координаты точки.
+    rays_count : int
+        Количество лучей.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче (при r < 0 точки луча лежат в обратном
+        направлении).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : (int, int) | None
+        Номер луча и номер точки; None, если точка вне сетки (или шаг
+        сетки нулевой).
+    """
+    if r == 0 or not math.isfinite(x) or not math.isfinite(y):
+        return None
+    if r < 0:
+        x, y = -x, -y
+    idx = round(math.hypot(x, y) / abs(r)) - 1
+    if not 0 <= idx < P:
+        return None
+    ray = round(math.atan2(y, x) * rays_count / (2 * math.pi)) % rays_count
+    return ray, idx
+
+
+def _calc_outline(good):
+    """
+    Определение точек контура: подходящих точек, у которых на том же луче
+    есть неподходящая соседняя точка.
+
+    Параметры:
+    ----------
+    good : numpy.ndarray[rays, P] of bool
+        Маска подходящих точек.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : numpy.ndarray[rays, P] of bool
+        Маска точек контура.
+    """
+    edge = np.zeros_like(good)
+    edge[:, 1:] |= ~good[:, :-1]
+    edge[:, :-1] |= ~good[:, 1:]
+    return good & edge
+
+
+def _calc_zone_stats(good, outline, radii, angle_step):
+    """
+    Расчет статистики подходящей области. Каждая точка сетки представляет
+    элемент кольцевого сектора площадью rho * |r| * angle_step.
+
+    Параметры:
+    ----------
+    good, outline : numpy.ndarray[rays, P] of bool
+        Маски подходящих точек и точек контура.
+    radii : numpy.ndarray[P]
+        Расстояния точек луча от начала координат.
+    angle_step : float
+        Шаг по углу между лучами [рад].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict
+        Количество подходящих точек ('points') и точек контура
+        ('outline_points'), площадь ('area') и наибольшая дальность
+        подходящей точки ('max_range').
+    """
+    abs_radii = np.abs(radii)
+    step = abs_radii[0] if len(abs_radii) else 0
+    per_sample = good.sum(axis=0)
+    reached = np.flatnonzero(per_sample)
+    return {'points': int(per_sample.sum()),
+            'outline_points': int(outline.sum()),
+            'area': float(per_sample @ abs_radii * step * angle_step),
+            'max_range': abs_radii[reached[-1]] if len(reached) else 0.0}
+
+
+def _calc_vector_magnitude(v):
+    """
+    Расчет модуля двумерного вектора.
+
+    Параметры:
+    ----------
+    v : float[2]
+        Двумерный вектор.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : float
+        Модуль вектора.
+    """
+    return math.sqrt(v[0]**2 + v[1]**2)
+
+
+def find_mirror_axis(points, tol=MIRROR_TOL, rays_count=RAYS_COUNT):
+    """
+    Поиск оси зеркальной симметрии набора точек, проходящей через начало
+    координат и совместимой с сеткой лучей.
+
+    Ось задается удвоенным номером луча k: угол оси равен k * angle_step / 2,
+    при отражении луч m переходит в луч (k - m) mod rays_count.
+
+    Параметры:
+    ----------
+    points : list[float[2]]
+        Точки (маяки), которые должны переходить друг в друга при отражении.
+    tol : float
+        Допуск совпадения координат.
+    rays_count : int
+        Количество лучей сетки.
+
+    Возвращаемое значение:
+    ----------------------
+    k : int | None
+        Удвоенный номер луча оси симметрии или None, если ось не найдена.
+    """
+    angle_step = 2 * math.pi / rays_count
+
+    # кандидаты - оси через каждую точку и биссектрисы для пар точек
+    # с равными расстояниями до начала координат
+    candidates = []
+    for i, p in enumerate(points):
+        if _calc_vector_magnitude(p) > tol:
+            candidates.append(math.atan2(p[1], p[0]))
+        for q in points[i + 1:]:
+            if abs(_calc_vector_magnitude(p) - _calc_vector_magnitude(q)) <= tol:
+                candidates.append((math.atan2(p[1], p[0]) + math.atan2(q[1], q[0])) / 2)
+    if not candidates:
+        candidates.append(0)
+
+    radius = max([_calc_vector_magnitude(p) for p in points] + [0])
+    for phi in candidates:
+        # ось должна совпадать с лучом сетки или проходить ровно между лучами
+        k = round(2 * phi / angle_step)
+        if abs(2 * phi - k * angle_step) / 2 * radius > tol:
+            continue
+        phi = k * angle_step / 2
+        if all(any(_calc_vector_magnitude([q[0] - m[0], q[1] - m[1]]) <= tol for q in points)
+               for m in (_mirror_point(p, phi) for p in points)):
+            return k % (2 * rays_count)
+    return None
+
+
+def _mirror_point(p, phi):
+    """
+    Отражение точки относительно оси через начало координат.
+
+    Параметры:
+    ----------
+    p : float[2]
+        Точка.
+    phi : float
+        Угол оси [рад].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : float[2]
+        Отраженная точка.
+    """
+    cos_2phi, sin_2phi = math.cos(2 * phi), math.sin(2 * phi)
+    return [cos_2phi * p[0] + sin_2phi * p[1], sin_2phi * p[0] - cos_2phi * p[1]]
+
+
+def _calc_fused_blocks(calc_fused, X, Y, radii, work, outs, cancel):
+    """
+    Расчет критериев блоками лучей с проверкой флага отмены между блоками.
+    Критерии и маски блоков записываются в массивы outs.
+
+    Параметры:
+    ----------
+    calc_fused : callable(X, Y, radii, work, outs) -> list[tuple]
+        Расчет критериев (как в _calc_zones).
+    X, Y : numpy.ndarray[rays, P]
+        Координаты точек.
+    radii : numpy.ndarray[P]
+        Расстояния точек луча от начала координат.
+    work : ZoneWorkspace
+        Рабочие массивы.
+    outs : list[(numpy.ndarray[rays, P], numpy.ndarray[rays, P])]
+        Массивы (критерий, маска) для результатов.
+    cancel : threading.Event
+        Флаг отмены расчета.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : list[tuple]
+        Тройки (критерий, маска подходящих точек, порог) в порядке outs.
+    """
+    block_rays = max(1, CHUNK_SIZE // X.shape[1])
+    thresholds = [None] * len(outs)
+    for start in range(0, len(X), block_rays):
+        _check_cancel(cancel)
+        stop = min(start + block_rays, len(X))
+        block_outs = [(metric[start:stop], good[start:stop]) for metric, good in outs]
+        fused = calc_fused(X[start:stop], Y[start:stop], radii, work, block_outs)
+        for i, ((metric, good), (block_metric, block_good, threshold)) in enumerate(zip(block_outs, fused)):
+            # критерий может вернуть свои массивы, а не записать в outs
+            if block_metric is not metric:
+                metric[...] = block_metric
+            if block_good is not good:
+                good[...] = block_good
+            thresholds[i] = threshold
+    return [(metric, good, threshold) for (metric, good), threshold in zip(outs, thresholds)]
+
+
+def _calc_zones(stations, P, r, calc_fused, calc_metrics, use_symmetry, boundary_tol, rays_count,
+                precision, workspace=None, cancel=None):
+    """
+    Расчет подходящих областей и их контуров для одного или нескольких
+    критериев за один проход по сетке с учетом возможной симметрии.
+
+    Если расположение маяков симметрично относительно оси через начало
+    координат, критерии рассчитываются только на лучах с одной стороны оси
+    (включая лучи на самой оси), а для остальных лучей копируются с
+    отраженных.
+
+    Промежуточные величины рассчитываются в рабочих массивах workspace;
+    без симметрии критерии и маски записываются сразу в массивы результата.
+
+    Параметры:
+    ----------
+    stations : list[float[2]]
+        Маяки, относительно перестановки которых критерии симметричны.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    calc_fused : callable(X, Y, radii, work, outs) -> list[tuple]
+        Расчет для заданных точек (radii - расстояния точек от начала
+        координат) списка троек (критерий, маска подходящих точек, порог);
+        work - рабочие массивы, outs - пары массивов (критерий, маска) для
+        результатов (могут не использоваться).
+    calc_metrics : list[callable(X, Y, radii) -> tuple]
+        Расчет каждого критерия по отдельности - для уточнения границы.
+    use_symmetry : bool
+        Флаг использования симметрии.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+    workspace : ZoneWorkspace | None
+        Рабочие массивы. None - временные.
+    cancel : threading.Event | None
+        Флаг отмены расчета: если задан, сетка рассчитывается блоками
+        лучей, между которыми он проверяется. None - расчет без отмены.
+
+    Возвращаемое значение:
+    ----------------------
+    results : list[ZoneResult]
+        Результаты расчета в порядке calc_metrics.
+    """
+    def calc(X, Y, radii, work, outs):
+        if cancel is None:
+            return calc_fused(X, Y, radii, work, outs)
+        return _calc_fused_blocks(calc_fused, X, Y, radii, work, outs, cancel)
+
+    grid = get_polar_grid(rays_count, P, r, precision)
+    k = find_mirror_axis(stations, rays_count=grid.rays_count) if use_symmetry else None
+
+    radii = np.abs(grid.radii)
+    n = grid.rays_count
+    if workspace is None:
+        workspace = ZoneWorkspace()
+    with workspace.use() as work, np.errstate(divide='ignore', invalid='ignore'):
+        if k is None:
+            outs = [(np.empty((n, grid.P), grid.dtype), np.empty((n, grid.P), bool))
+                    for _ in calc_metrics]
+            fused = calc(grid.X, grid.Y, radii, work, outs)
+        else:
+            # d = 2 * (угол луча - угол оси) / angle_step; d = 0 и d = rays_count - лучи на оси
+            d = (2 * np.arange(n) - k) % (2 * n)
+            half = np.flatnonzero(d <= n)
+            mirrored = np.flatnonzero((d > 0) & (d < n))
+
+            shape = (len(half), grid.P)
+            X = np.take(grid.X, half, axis=0, out=work.array('X_half', shape, grid.dtype))
+            Y = np.take(grid.Y, half, axis=0, out=work.array('Y_half', shape, grid.dtype))
+            outs = [(work.array(f'metric_{i}', shape, grid.dtype),
+                     work.array(f'good_{i}', shape, bool)) for i in range(len(calc_metrics))]
+            fused = []
+            for half_metric, half_good, threshold in calc(X, Y, radii, work, outs):
+                metric = np.empty((n, grid.P), dtype=half_metric.dtype)
+                good = np.empty((n, grid.P), dtype=bool)
+                metric[half] = half_metric
+                good[half] = half_good
+                metric[(k - mirrored) % n] = metric[mirrored]
+                good[(k - mirrored) % n] = good[mirrored]
+                fused.append((metric, good, threshold))
+
+    results = []
+    for (metric, good, threshold), calc_metric in zip(fused, calc_metrics):
+        result = ZoneResult(grid, metric, good, threshold, calc_metric)
+        if boundary_tol is not None:
+            _check_cancel(cancel)
+            result.refine_boundary(boundary_tol)
+        results.append(result)
+    return results
+
+
+def _calc_zone(stations, P, r, calc_metric, use_symmetry, boundary_tol, rays_count, precision,
+               workspace=None, cancel=None):
+    """
+    Расчет подходящей области и ее контура для одного критерия.
+
+    Параметры:
+    ----------
+    stations : list[float[2]]
+        Маяки, относительно перестановки которых критерий симметричен.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    calc_metric : callable(X, Y, radii, work=None, out=None) -> (numpy.ndarray, numpy.ndarray, float)
+        Расчет критерия метода, маски подходящих точек и порога для заданных
+        точек (radii - расстояния точек от начала координат); work -
+        рабочие массивы, out - массивы (критерий, маска) для результата.
+    use_symmetry : bool
+        Флаг использования симметрии.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+    workspace : ZoneWorkspace | None
+        Рабочие массивы. None - временные.
+    cancel : threading.Event | None
+        Флаг отмены расчета (None - без отмены).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneResult
+        Результат расчета.
+    """
+    def calc_fused(X, Y, radii, work, outs):
+        return [calc_metric(X, Y, radii, work=work, out=outs[0])]
+
+    return _calc_zones(stations, P, r, calc_fused, [calc_metric], use_symmetry, boundary_tol,
+                       rays_count, precision, workspace, cancel)[0]
+
+
+def _calc_beacon_vectors(A, B, X, Y, work):
+    """
+    Расчет общих для методов величин: векторов из точек на маяки, их
+    модулей и косинуса угла между ними (в рабочих массивах work).
+
+    Параметры:
+    ----------
+    A, B : float[2]
+        Координаты маяков.
+    X, Y : numpy.ndarray
+        Координаты точек.
+    work : ZoneWorkspace
+        Рабочие массивы.
+
+    Возвращаемое значение:
+    ----------------------
+    vectors : dict
+        Словарь с ключами 'MAx', 'MAy', 'MBx', 'MBy', 'rA', 'rB', 'COS_alpha'.
+    """
+    shape = np.broadcast_shapes(np.shape(X), np.shape(Y))
+    dtype = np.result_type(A[0], A[1], B[0], B[1], X, Y)
+    vectors = {name: work.array(name, shape, dtype)
+               for name in ('MAx', 'MAy', 'MBx', 'MBy', 'rA', 'rB', 'COS_alpha')}
+    MAx = np.subtract(A[0], X, out=vectors['MAx'])
+    MAy = np.subtract(A[1], Y, out=vectors['MAy'])
+    MBx = np.subtract(B[0], X, out=vectors['MBx'])
+    MBy = np.subtract(B[1], Y, out=vectors['MBy'])
+    rA = np.hypot(MAx, MAy, out=vectors['rA'])
+    rB = np.hypot(MBx, MBy, out=vectors['rB'])
+
+    # COS_alpha = (MAx * MBx + MAy * MBy) / (rA * rB)
+    tmp = work.array('tmp', shape, dtype)
+    COS_alpha = np.multiply(MAx, MBx, out=vectors['COS_alpha'])
+    COS_alpha += np.multiply(MAy, MBy, out=tmp)
+    COS_alpha /= np.multiply(rA, rB, out=tmp)
+    return vectors
+
+
+class MethodParam:
+    """
+    Параметр метода в схеме параметров ZoneMethod.params: имя, описание,
+    значение по умолчанию и допустимые значения.
+
+    Атрибуты:
+    ---------
+    name : str
+        Имя параметра (ключ в словаре параметров).
+    description : str
+        Описание параметра.
+    default : float | str | None
+        Значение по умолчанию. None - параметр обязателен.
+    minimum, maximum : float | None
+        Границы допустимых значений числового параметра (None - без
+        границы).
+    exclusive_minimum : bool
+        Флаг исключения нижней границы (значение должно быть больше
+        minimum).
+    choices : tuple[str] | None
+        Допустимые значения нечислового параметра. None - параметр числовой.
+
+    Методы:
+    -------
+    check(value) -> float | str
+        Проверка и приведение значения параметра.
+    """
+
+    def __init__(self, name, description, default=None, minimum=None, maximum=None,
+                 exclusive_minimum=False, choices=None):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        name : str
+            Имя параметра.
+        description : str
+            Описание параметра.
+        default : float | str | None
+            Значение по умолчанию. None - параметр обязателен.
+        minimum, maximum : float | None
+            Границы допустимых значений числового параметра.
+        exclusive_minimum : bool
+            Флаг исключения нижней границы.
+        choices : tuple[str] | None
+            Допустимые значения нечислового параметра.
+        """
+        self.name = name
+        self.description = description
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.exclusive_minimum = exclusive_minimum
+        self.choices = None if choices is None else tuple(choices)
+
+    def check(self, value):
+        """
+        Проверка и приведение значения параметра: нечисловой параметр
+        должен быть одним из choices, числовой - конечным числом в границах.
+
+        Параметры:
+        ----------
+        value : float | str
+            Значение параметра.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : float | str
+            Значение параметра (числовое - float).
+        """
+        if self.choices is not None:
+            if value not in self.choices:
+                raise ValueError(f'{self.name}: ожидается одно из значений {", ".join(self.choices)}')
+            return value
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{self.name}: ожидается число') from None
+        if not math.isfinite(value):
+            raise ValueError(f'{self.name}: ожидается конечное число')
+        if self.minimum is not None:
+            if self.exclusive_minimum and not value > self.minimum:
+                raise ValueError(f'{self.name} должно быть больше {self.minimum:g}')
+            if not value >= self.minimum:
+                raise ValueError(f'{self.name} должно быть не меньше {self.minimum:g}')
+        if self.maximum is not None and not value <= self.maximum:
+            raise ValueError(f'{self.name} должно быть не больше {self.maximum:g}')
+        return value
+
+
+class ZoneMethod:
+    """
+    Метод расчета рабочей зоны в реестре методов (METHODS). Метод задает
+    только критерий, правило порога, схему параметров и допустимое число
+    станций; сетка, симметрия, контур, уточнение границы, расчет блоками и
+    кэш сеток - общие для всех методов (calc_zone, calc_zone_all_methods,
+    calc_zone_chunked), проверка параметров - по схеме (make_params,
+    check_stations).
+
+    Атрибуты:
+    ---------
+    key : int
+        Номер метода.
+    name : str
+        Название метода.
+    metric_name : str
+        Название критерия.
+    params : tuple[MethodParam]
+        Схема параметров метода.
+    metric : callable(X, Y, radii, stations, params, vectors, work, out) -> numpy.ndarray
+        Векторизованный расчет критерия в точках (stations - станции,
+        params - словарь параметров, vectors - величины
+        _calc_beacon_vectors или None, work - ZoneWorkspace для
+        промежуточных массивов, out - массив для критерия; критерий может
+        быть и новым массивом).
+    threshold : callable(stations, **params) -> float
+        Расчет порога критерия по станциям и параметрам метода.
+    compare : str
+        Условие "подходящести" точки: критерий '<', '<=', '>=' или '>'
+        порога.
+    stations_count : (int, int | None)
+        Наименьшее и наибольшее (None - без ограничения) число станций.
+    master : bool
+        Флаг ведущей станции в начале координат (не входит в stations).
+    beacon_vectors : bool
+        Флаг использования общих величин _calc_beacon_vectors (только для
+        методов с двумя станциями A, B).
+
+    Методы:
+    -------
+    make_params(*values, **params) -> dict
+        Параметры метода по схеме.
+    check_stations(stations) -> list[float[2]]
+        Проверка станций метода.
+    stations(beacons) -> list[float[2]]
+        Станции метода с ведущей станцией.
+    make_metric(stations, **params) -> callable
+        Функция расчета критерия, маски подходящих точек и порога.
+    """
+
+    def __init__(self, key, name, metric_name, params, metric, threshold, compare,
+                 stations_count=(2, 2), master=False, beacon_vectors=True):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        key : int
+            Номер метода.
+        name : str
+            Название метода.
+        metric_name : str
+            Название критерия.
+        params : tuple[MethodParam]
+            Схема параметров метода.
+        metric : callable(X, Y, radii, stations, params, vectors, work, out) -> numpy.ndarray
+            Векторизованный расчет критерия.
+        threshold : callable(stations, **params) -> float
+            Расчет порога критерия.
+        compare : str
+            Условие "подходящести": '<', '<=', '>=' или '>'.
+        stations_count : (int, int | None)
+            Наименьшее и наибольшее число станций.
+        master : bool
+            Флаг ведущей станции в начале координат.
+        beacon_vectors : bool
+            Флаг использования общих величин _calc_beacon_vectors.
+        """
+        if compare not in _COMPARE:
+            raise ValueError(f'Неизвестное условие сравнения: {compare}')
+        names = [param.name for param in params]
+        if len(set(names)) != len(names):
+            raise ValueError('Имена параметров метода должны быть различными')
+        if beacon_vectors and tuple(stations_count) != (2, 2):
+            raise ValueError('Общие величины _calc_beacon_vectors - только для двух станций')
+        self.key = key
+        self.name = name
+        self.metric_name = metric_name
+        self.params = tuple(params)
+        self.metric = metric
+        self.threshold = threshold
+        self.compare = compare
+        self.stations_count = tuple(stations_count)
+        self.master = master
+        self.beacon_vectors = beacon_vectors
+
+    def make_params(self, *values, **params):
+        """
+        Параметры метода по схеме: позиционные значения - в порядке params,
+        отсутствующие - по умолчанию. Значения проверяются (MethodParam.check).
+
+        Параметры:
+        ----------
+        *values : float | str
+            Значения параметров в порядке схемы.
+        **params : float | str
+            Значения параметров по именам.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : dict
+            Параметры метода (имя -> значение) в порядке схемы.
+        """
+        if len(values) > len(self.params):
+            raise ValueError(f'{self.name}: слишком много параметров')
+        unknown = set(params) - {param.name for param in self.params}
+        if unknown:
+            raise ValueError(f'{self.name}: неизвестные параметры {", ".join(sorted(unknown))}')
+        result = {}
+        for i, param in enumerate(self.params):
+            if i < len(values):
+                if param.name in params:
+                    raise ValueError(f'{self.name}: параметр {param.name} задан дважды')
+                value = values[i]
+            elif param.name in params:
+                value = params[param.name]
+            elif param.default is not None:
+                value = param.default
+            else:
+                raise ValueError(f'{self.name}: не задан параметр {param.name}')
+            result[param.name] = param.check(value)
+        return result
+
+    def check_stations(self, stations):
+        """
+        Проверка станций метода: число станций - в пределах stations_count,
+        координаты - конечные числа, станции не совпадают.
+
+        Параметры:
+        ----------
+        stations : list[float[2]]
+            Координаты станций (без ведущей).
+
+        Возвращаемое значение:
+        ----------------------
+        _ : list[float[2]]
+            Координаты станций (списки [x, y] из float).
+        """
+        stations = [[float(x), float(y)] for x, y in stations]
+        low, high = self.stations_count
+        if len(stations) < low or (high is not None and len(stations) > high):
+            count = str(low) if low == high else f'от {low}' + (f' до {high}' if high else '')
+            raise ValueError(f'{self.name}: ожидается станций {count}, задано {len(stations)}')
+        if not all(math.isfinite(coord) for station in stations for coord in station):
+            raise ValueError('Координаты станций должны быть конечными числами')
+        if len({tuple(station) for station in stations}) != len(stations):
+            raise ValueError('Станции (маяки) не должны совпадать')
+        return stations
+
+    def stations(self, beacons):
+        """
+        Станции метода: маяки и, если есть, ведущая станция.
+
+        Параметры:
+        ----------
+        beacons : list[float[2]]
+            Координаты маяков.
+
+        Возвращаемое значение:
+        ----------------------
+        _ : list[float[2]]
+            Координаты станций.
+        """
+        beacons = [list(beacon) for beacon in beacons]
+        return [[0, 0]] + beacons if self.master else beacons
+
+    def make_metric(self, stations, **params):
+        """
+        Создание функции расчета критерия для расположения станций и
+        параметров метода (проверяются по схеме).
+
+        Параметры:
+        ----------
+        stations : list[float[2]]
+            Координаты станций (без ведущей).
+        **params : float | str
+            Параметры метода по именам (отсутствующие - по умолчанию).
+
+        Возвращаемое значение:
+        ----------------------
+        calc_metric : callable(X, Y, radii, vectors=None, work=None, out=None) -> tuple
+            Функция расчета критерия, маски подходящих точек и порога.
+            vectors - заранее рассчитанные величины _calc_beacon_vectors,
+            work - рабочие массивы (None - временные), out - массивы
+            критерия и маски для результата (None - новые).
+        """
+        stations = self.check_stations(stations)
+        params = self.make_params(**params)
+        threshold = self.threshold(stations, **params)
+        compare = _COMPARE[self.compare]
+        metric_fn = self.metric
+        beacon_vectors = self.beacon_vectors
+
+        def calc_metric(X, Y, radii, vectors=None, work=None, out=None):
+            if work is None:
+                work = ZoneWorkspace()
+            if vectors is None and beacon_vectors:
+                vectors = _calc_beacon_vectors(*stations, X, Y, work)
+            if out is None:
+                shape = np.broadcast_shapes(np.shape(X), np.shape(Y))
+                out = np.empty(shape, np.result_type(X, Y)), np.empty(shape, bool)
+            metric = metric_fn(X, Y, radii, stations, params, vectors, work, out[0])
+            return metric, compare(metric, threshold, out=out[1]), threshold
+
+        return calc_metric
+
+
+_COMPARE = {'<': np.less, '<=': np.less_equal, '>=': np.greater_equal, '>': np.greater}
+
+METHODS = {}    # реестр методов: номер -> ZoneMethod
+
+
+def register_method(method):
+    """
+    Добавление метода в реестр.
+
+    Параметры:
+    ----------
+    method : ZoneMethod
+        Метод.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneMethod
+        Тот же метод.
+    """
+    if method.key in METHODS:
+        raise ValueError(f'Метод {method.key} уже зарегистрирован')
+    METHODS[method.key] = method
+    return method
+
+
+def get_method(key):
+    """
+    Метод из реестра по номеру.
+
+    Параметры:
+    ----------
+    key : int
+        Номер метода.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneMethod
+        Метод.
+    """
+    try:
+        return METHODS[key]
+    except (KeyError, TypeError):
+        raise ValueError(f'Неизвестный метод: {key}') from None
+
+
+def _metric_method_1(X, Y, radii, stations, params, vectors, work, out):
+    """
+    Критерий Kr метода 1 (разностно-дальномерный). Ведущая станция
+    расположена в начале координат.
+
+    Параметры:
+    ----------
+    X, Y : numpy.ndarray
+        Координаты точек.
+    radii : numpy.ndarray
+        Расстояния точек от начала координат.
+    stations : list[float[2]]
+        Координаты маяков A, B.
+    params : dict
+        Параметры метода.
+    vectors : dict
+        Величины _calc_beacon_vectors.
+    work : ZoneWorkspace
+        Рабочие массивы.
+    out : numpy.ndarray
+        Массив для критерия.
+
+    Возвращаемое значение:
+    ----------------------
+    Kr : numpy.ndarray
+        Критерий в точках (out).
+    """
+    t1, t2, t3, t4 = (work.array(name, out.shape, out.dtype) for name in ('t1', 't2', 't3', 't4'))
+
+    # psi - углы между векторами на ведущую станцию (-M, модуль - radii) и на маяки:
+    # cos(psi) = -(X * MAx + Y * MAy) / (radii * rA)
+    for psi, tmp, Mx, My, rM in ((t1, t2, 'MAx', 'MAy', 'rA'), (t3, t4, 'MBx', 'MBy', 'rB')):
+        np.multiply(X, vectors[Mx], out=psi)
+        psi += np.multiply(Y, vectors[My], out=tmp)
+        np.negative(psi, out=psi)
+        psi /= np.multiply(radii, vectors[rM], out=tmp)
+        np.arccos(np.clip(psi, -1, 1, out=psi), out=psi)
+    psi1, psi2 = t1, t3
+
+    # Kr = (s1^2 + s2^2)^1/2 / (2 * sin((psi1 + psi2) / 2) * s1 * s2), s = sin(psi / 2)
+    s1 = np.sin(np.divide(psi1, 2, out=t2), out=t2)
+    s2 = np.sin(np.divide(psi2, 2, out=t4), out=t4)
+    den = np.add(psi1, psi2, out=t1)
+    den /= 2
+    np.sin(den, out=den)
+    den *= 2
+    den *= s1
+    den *= s2
+    Kr = np.square(s1, out=out)
+    Kr += np.square(s2, out=t3)
+    np.sqrt(Kr, out=Kr)
+    Kr /= den
+    return Kr
+
+
+def _calc_sin_alpha(COS_alpha, out):
+    """
+    Синус угла между векторами на маяки по косинусу: (1 - cos^2)^1/2.
+
+    Параметры:
+    ----------
+    COS_alpha : numpy.ndarray
+        Косинус угла.
+    out : numpy.ndarray
+        Массив для результата.
+
+    Возвращаемое значение:
+    ----------------------
+    SIN_alpha : numpy.ndarray
+        Синус угла (out).
+    """
+    SIN_alpha = np.square(COS_alpha, out=out)
+    np.subtract(1, SIN_alpha, out=SIN_alpha)
+    np.maximum(0, SIN_alpha, out=SIN_alpha)
+    return np.sqrt(SIN_alpha, out=SIN_alpha)
+
+
+def _metric_method_2(X, Y, radii, stations, params, vectors, work, out):
+    """
+    Критерий sin(alpha) метода 2 (дальномерный).
+
+    Параметры:
+    ----------
+    X, Y : numpy.ndarray
+        Координаты точек.
+    radii : numpy.ndarray
+        Расстояния точек от начала координат.
+    stations : list[float[2]]
+        Координаты маяков A, B.
+    params : dict
+        Параметры метода.
+    vectors : dict
+        Величины _calc_beacon_vectors.
+    work : ZoneWorkspace
+        Рабочие массивы.
+    out : numpy.ndarray
+        Массив для критерия.
+
+    Возвращаемое значение:
+    ----------------------
+    SIN_alpha : numpy.ndarray
+        Критерий в точках (out).
+    """
+    return _calc_sin_alpha(vectors['COS_alpha'], out)
+
+
+def _metric_method_3(X, Y, radii, stations, params, vectors, work, out):
+    """
+    Критерий Kr метода 3 (угломерный).
+
+    Параметры:
+    ----------
+    X, Y : numpy.ndarray
+        Координаты точек.
+    radii : numpy.ndarray
+        Расстояния точек от начала координат.
+    stations : list[float[2]]
+        Координаты маяков A, B.
+    params : dict
+        Параметры метода.
+    vectors : dict
+        Величины _calc_beacon_vectors.
+    work : ZoneWorkspace
+        Рабочие массивы.
+    out : numpy.ndarray
+        Массив для критерия.
+
+    Возвращаемое значение:
+    ----------------------
+    Kr : numpy.ndarray
+        Критерий в точках (out).
+    """
+    A, B = stations
+    d_AB = math.sqrt((A[0]-B[0])**2 + (A[1]-B[1])**2) # расстояние между A и B
+    t1, t2 = (work.array(name, out.shape, out.dtype) for name in ('t1', 't2'))
+
+    # Kr = 0.017 / sin(alpha) * ((rA / d_AB)^2 + (rB / d_AB)^2)^1/2
+    Kr = np.square(np.divide(vectors['rA'], d_AB, out=out), out=out)
+    Kr += np.square(np.divide(vectors['rB'], d_AB, out=t2), out=t2)
+    np.sqrt(Kr, out=Kr)
+    Kr *= np.divide(0.017, _calc_sin_alpha(vectors['COS_alpha'], t1), out=t1)
+    return Kr
+
+
+def _threshold_method_1(stations, sigma_r_allow, sigma_t):
+    """
+    Порог критерия метода 1: Kr < sigma_r_allow / sigma_t.
+    """
+    return sigma_r_allow / sigma_t
+
+
+def _threshold_method_2(stations, sigma_d, sigma_r):
+    """
+    Порог критерия метода 2: sin(alpha) >= 2^1/2 * sigma_r / sigma_d.
+    """
+    return math.sqrt(2) * sigma_r/sigma_d
+
+
+def _threshold_method_3(stations, sigma_d, sigma_theta):
+    """
+    Порог критерия метода 3: Kr <= sigma_d / (d_AB * sigma_theta).
+    """
+    A, B = stations
+    d_AB = math.sqrt((A[0]-B[0])**2 + (A[1]-B[1])**2) # расстояние между A и B
+    return sigma_d/(d_AB*sigma_theta)
+
+
+def _metric_gdop(X, Y, radii, stations, params, vectors, work, out):
+    """
+    Критерий GDOP для произвольного числа станций (calc_gdop).
+
+    Параметры:
+    ----------
+    X, Y : numpy.ndarray
+        Координаты точек.
+    radii : numpy.ndarray
+        Расстояния точек от начала координат.
+    stations : list[float[2]]
+        Координаты станций.
+    params : dict
+        Параметры метода.
+    vectors : None
+        Не используется.
+    work : ZoneWorkspace
+        Рабочие массивы.
+    out : numpy.ndarray
+        Массив для критерия.
+
+    Возвращаемое значение:
+    ----------------------
+    out : numpy.ndarray
+        Критерий в точках.
+    """
+    out[...] = calc_gdop(X, Y, stations, params['kind'])
+    return out
+
+
+def _threshold_gdop(stations, sigma, sigma_allow, kind):
+    """
+    Порог критерия метода GDOP: GDOP <= sigma_allow / sigma (для угломерных
+    измерений sigma переводится из градусов в радианы).
+    """
+    if kind == 'range_difference' and len(stations) < 3:
+        raise ValueError('Для разностно-дальномерных измерений нужно не менее 3 станций')
+    if kind == 'bearing':
+        sigma = math.radians(sigma)
+    return sigma_allow / sigma
+
+
+# СКО входят в пороги методов делителями - должны быть положительными
+register_method(ZoneMethod(1, 'Метод 1 (разностно-дальномерный)', 'Kr',
+                           (MethodParam('sigma_r_allow', 'допустимая радиальная ошибка',
+                                        minimum=0, exclusive_minimum=True),
+                            MethodParam('sigma_t', 'значение радиальной ошибки',
+                                        minimum=0, exclusive_minimum=True)),
+                           _metric_method_1, _threshold_method_1, '<', master=True))
+register_method(ZoneMethod(2, 'Метод 2 (дальномерный)', 'sin(α)',
+                           (MethodParam('sigma_d', 'допустимая радиальная ошибка',
+                                        minimum=0, exclusive_minimum=True),
+                            MethodParam('sigma_r', 'значение радиальной ошибки',
+                                        minimum=0, exclusive_minimum=True)),
+                           _metric_method_2, _threshold_method_2, '>='))
+register_method(ZoneMethod(3, 'Метод 3 (угломерный)', 'Kr',
+                           (MethodParam('sigma_d', 'допустимая радиальная ошибка',
+                                        minimum=0, exclusive_minimum=True),
+                            MethodParam('sigma_theta', 'значение угловой ошибки',
+                                        minimum=0, exclusive_minimum=True)),
+                           _metric_method_3, _threshold_method_3, '<='))
+register_method(ZoneMethod(GDOP_METHOD, 'Метод GDOP (произвольное число станций)', 'GDOP',
+                           (MethodParam('sigma', 'СКО измерений (для угломерных - в градусах)',
+                                        minimum=0, exclusive_minimum=True),
+                            MethodParam('sigma_allow', 'допустимая радиальная ошибка',
+                                        minimum=0, exclusive_minimum=True),
+                            MethodParam('kind', 'вид измерений', default='range',
+                                        choices=GDOP_KINDS)),
+                           _metric_gdop, _threshold_gdop, '<=', stations_count=(2, None),
+                           beacon_vectors=False))
+
+
+def calc_zone(method, stations, params, P, r, use_symmetry=True, boundary_tol=None,
+              rays_count=RAYS_COUNT, precision='float64', workspace=None, cancel=None):
+    """
+    Расчет подходящей области и ее контура по методу из реестра.
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (ключ METHODS).
+    stations : list[float[2]]
+        Координаты станций (для методов 1-3 - маяки A, B).
+    params : dict
+        Параметры метода по именам (ZoneMethod.params; отсутствующие - по
+        умолчанию).
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    use_symmetry : bool
+        Флаг использования симметрии расположения маяков.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+    workspace : ZoneWorkspace | None
+        Рабочие массивы, сохраняемые между расчетами. None - временные.
+    cancel : threading.Event | None
+        Флаг отмены расчета из другого потока (расчет прерывается
+        исключением CalcCancelled). None - без отмены.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneResult
+        Результат расчета.
+    """
+    zone_method = get_method(method)
+    stations = zone_method.check_stations(stations)
+    calc_metric = zone_method.make_metric(stations, **params)
+    return _calc_zone(zone_method.stations(stations), P, r, calc_metric, use_symmetry,
+                      boundary_tol, rays_count, precision, workspace, cancel)
+
+
+def calc_zone_method_1(X1, Y1, X2, Y2, sigma_r_allow, sigma_t, P, r, use_symmetry=True, boundary_tol=None,
+                       rays_count=RAYS_COUNT, precision='float64'):
+    """
+    Расчет подходящей области и ее контура по методу 1 (разностно-дальномерный).
+    Ведущая станция расположена в начале координат.
+
+    Параметры:
+    ----------
+    X1, Y1, X2, Y2 : float
+        Координаты маяков.
+    sigma_r_allow : float
+        Допустимая радиальная ошибка.
+    sigma_t : float
+        Значение радиальной ошибки.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    use_symmetry : bool
+        Флаг использования симметрии расположения маяков.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneResult
+        Результат расчета.
+    """
+    return calc_zone(1, [[X1, Y1], [X2, Y2]], {'sigma_r_allow': sigma_r_allow, 'sigma_t': sigma_t},
+                     P, r, use_symmetry, boundary_tol, rays_count, precision)
+
+
+def calc_zone_method_2(A, B, sigma_d, sigma_r, P, r, use_symmetry=True, boundary_tol=None,
+                       rays_count=RAYS_COUNT, precision='float64'):
+    """
+    Расчет подходящей области и ее контура по методу 2 (дальномерный).
+
+    Параметры:
+    ----------
+    A, B : float[2]
+        Координаты маяков.
+    sigma_d : float
+        Допустимая радиальная ошибка.
+    sigma_r : float
+        Значение радиальной ошибки.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    use_symmetry : bool
+        Флаг использования симметрии расположения маяков.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneResult
+        Результат расчета.
+    """
+    return calc_zone(2, [A, B], {'sigma_d': sigma_d, 'sigma_r': sigma_r}, P, r, use_symmetry,
+                     boundary_tol, rays_count, precision)
+
+
+def calc_zone_method_3(A, B, sigma_d, sigma_theta, P, r, use_symmetry=True, boundary_tol=None,
+                       rays_count=RAYS_COUNT, precision='float64'):
+    """
+    Расчет подходящей области и ее контура по методу 3 (угломерный).
+
+    Параметры:
+    ----------
+    A, B : float[2]
+        Координаты маяков.
+    sigma_d : float
+        Допустимая радиальная ошибка.
+    sigma_theta : float
+        Значение угловой ошибки.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    use_symmetry : bool
+        Флаг использования симметрии расположения маяков.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneResult
+        Результат расчета.
+    """
+    return calc_zone(3, [A, B], {'sigma_d': sigma_d, 'sigma_theta': sigma_theta}, P, r,
+                     use_symmetry, boundary_tol, rays_count, precision)
+
+
+def calc_zone_all_methods(stations, params, P, r, use_symmetry=True, boundary_tol=None,
+                          rays_count=RAYS_COUNT, precision='float64', methods=(1, 2, 3),
+                          workspace=None, cancel=None):
+    """
+    Расчет подходящих областей и их контуров сразу по нескольким методам для
+    одного расположения станций. Для методов с общими величинами
+    (ZoneMethod.beacon_vectors) векторы на маяки, их модули и угол между
+    ними рассчитываются один раз и используются всеми этими методами.
+
+    Параметры:
+    ----------
+    stations : list[float[2]]
+        Координаты станций (для методов 1-3 - маяки A, B; для метода 1
+        ведущая станция - в начале координат).
+    params : list[dict]
+        Параметры методов methods по именам (ZoneMethod.params), для
+        методов 1-3: sigma_r_allow и sigma_t, sigma_d и sigma_r, sigma_d и
+        sigma_theta.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    use_symmetry : bool
+        Флаг использования симметрии расположения маяков.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+    methods : list[int]
+        Номера методов (ключи METHODS).
+    workspace : ZoneWorkspace | None
+        Рабочие массивы, сохраняемые между расчетами. None - временные.
+    cancel : threading.Event | None
+        Флаг отмены расчета, проверяется между блоками лучей (None - без
+        отмены).
+
+    Возвращаемое значение:
+    ----------------------
+    results : list[ZoneResult]
+        Результаты расчета по методам methods.
+    """
+    zone_methods = [get_method(method) for method in methods]
+    if len(params) != len(zone_methods):
+        raise ValueError('Параметры должны быть заданы для каждого метода')
+    for zone_method in zone_methods:
+        stations = zone_method.check_stations(stations)
+    calc_metrics = [zone_method.make_metric(stations, **method_params)
+                    for zone_method, method_params in zip(zone_methods, params)]
+    beacon_vectors = any(zone_method.beacon_vectors for zone_method in zone_methods)
+
+    def calc_fused(X, Y, radii, work, outs):
+        vectors = _calc_beacon_vectors(*stations, X, Y, work) if beacon_vectors else None
+        return [calc_metric(X, Y, radii, vectors if zone_method.beacon_vectors else None, work, out)
+                for zone_method, calc_metric, out in zip(zone_methods, calc_metrics, outs)]
+
+    # симметрия должна переводить друг в друга станции всех методов (включая ведущие)
+    all_stations = [station for zone_method in zone_methods
+                    for station in zone_method.stations(stations)]
+    return _calc_zones(all_stations, P, r, calc_fused, calc_metrics, use_symmetry, boundary_tol,
+                       rays_count, precision, workspace, cancel)
+
+
+def calc_gdop(X, Y, stations, kind='range'):
+    """
+    Расчет геометрического фактора (GDOP) в заданных точках для произвольного
+    числа станций.
+
+    Для каждой точки строится матрица направлений H (N x 2): единичные векторы
+    на станции для дальномерных и разностно-дальномерных измерений или
+    градиенты пеленгов для угломерных. GDOP = sqrt(trace((H^T W H)^-1)), где
+    для разностно-дальномерных измерений W учитывает корреляцию разностей
+    с опорной станцией (результат не зависит от выбора опорной станции).
+    Расчет ведется блоками точек сразу для всех станций.
+
+    Параметры:
+    ----------
+    X, Y : numpy.ndarray
+        Координаты точек (произвольной формы).
+    stations : list[float[2]]
+        Координаты станций.
+    kind : str
+        Вид измерений: 'range', 'range_difference' или 'bearing'.
+
+    Возвращаемое значение:
+    ----------------------
+    gdop : numpy.ndarray
+        Геометрический фактор в точках (форма как у X, тип - как у X, но не
+        ниже float32). Для угломерных измерений - в единицах расстояния на
+        радиан.
+    """
+    if kind not in GDOP_KINDS:
+        raise ValueError(f'Неизвестный вид измерений: {kind}')
+    dtype = np.result_type(X, np.float32)
+    S = np.asarray(stations, dtype=dtype).reshape(-1, 2)
+    if len(S) < (3 if kind == 'range_difference' else 2):
+        raise ValueError('Недостаточно станций для расчета GDOP')
+
+    x = np.ravel(X)
+    y = np.ravel(Y)
+    gdop = np.empty(x.size, dtype=dtype)
+    step = max(1, GDOP_BLOCK_SIZE // len(S))
+    for start in range(0, x.size, step):
+        block = slice(start, start + step)
+
+        # векторы от точек на станции, стопка (N, точки)
+        dx = S[:, 0, None] - x[None, block]
+        dy = S[:, 1, None] - y[None, block]
+        d = np.hypot(dx, dy)
+        if kind == 'bearing':
+            d2 = d**2
+            H = np.stack((dy / d2, -dx / d2), axis=-1)
+        else:
+            H = np.stack((dx / d, dy / d), axis=-1)
+
+        # матрицы H^T W H (точки, 2, 2)
+        G = np.einsum('npi,npj->pij', H, H)
+        if kind == 'range_difference':
+            h_sum = H.sum(axis=0)
+            G -= np.einsum('pi,pj->pij', h_sum, h_sum) / len(S)
+
+        det = G[:, 0, 0] * G[:, 1, 1] - G[:, 0, 1]**2
+        gdop[block] = np.sqrt((G[:, 0, 0] + G[:, 1, 1]) / det)
+
+    return gdop.reshape(np.shape(X))
+
+
+def calc_zone_gdop(stations, sigma, sigma_allow, P, r, kind='range',
+                   use_symmetry=True, boundary_tol=None, rays_count=RAYS_COUNT, precision='float64'):
+    """
+    Расчет подходящей области и ее контура по геометрическому фактору для
+    произвольного числа станций (метод GDOP_METHOD реестра). Точка
+    подходит, если sigma * GDOP не превышает допустимую ошибку.
+
+    Параметры:
+    ----------
+    stations : list[float[2]]
+        Координаты станций.
+    sigma : float
+        СКО измерений (для угломерных - в градусах).
+    sigma_allow : float
+        Допустимая радиальная ошибка.
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    kind : str
+        Вид измерений: 'range', 'range_difference' или 'bearing'.
+    use_symmetry : bool
+        Флаг использования симметрии расположения станций.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ZoneResult
+        Результат расчета.
+    """
+    return calc_zone(GDOP_METHOD, stations, {'sigma': sigma, 'sigma_allow': sigma_allow, 'kind': kind},
+                     P, r, use_symmetry, boundary_tol, rays_count, precision)
+
+
+def calc_zone_chunked(method, stations, params, P, r, path=None,
+                      rays_count=RAYS_COUNT, block_rays=None, precision='float64', cancel=None,
+                      point_mask=None):
+    """
+    Расчет подходящей области по одному из методов блоками лучей с записью
+    критерия и маски подходящих точек в файл .npy. В памяти одновременно
+    находится только один блок, поэтому пиковый объем памяти не зависит от
+    размера сетки.
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (ключ METHODS).
+    stations : list[float[2]]
+        Координаты станций (для методов 1-3 - маяки A, B).
+    params : dict
+        Параметры метода по именам (ZoneMethod.params).
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    path : str | None
+        Путь к файлу результата (перезаписывается). None - создается
+        временный файл, принадлежащий результату: он удаляется, когда на
+        результат не остается ссылок (или при ошибке расчета).
+    rays_count : int
+        Количество лучей.
+    block_rays : int | None
+        Количество лучей в блоке. None - по CHUNK_SIZE.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+    cancel : threading.Event | None
+        Флаг отмены расчета, проверяется между блоками (None - без отмены).
+    point_mask : callable(X, Y) -> numpy.ndarray of bool | None
+        Дополнительное условие для подходящих точек, применяемое к каждому
+        блоку (например, видимость маяков по рельефу). None - без условия.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : ChunkedZoneResult
+        Результат расчета, хранящийся в файле.
+    """
+    rays_count, P = int(rays_count), int(P)
+    # проверка до создания файла: при пустой сетке блоков нет и порог не рассчитывается
+    if rays_count < 1 or P < 1:
+        raise ValueError('Количество лучей и точек на луче должно быть не меньше 1')
+    if block_rays is not None and int(block_rays) < 1:
+        raise ValueError('Количество лучей в блоке должно быть не меньше 1')
+    calc_metric = get_method(method).make_metric(stations, **params)
+    dtype = _check_precision(precision)
+    if block_rays is None:
+        block_rays = max(1, CHUNK_SIZE // P)
+
+    owns_file = path is None
+    if owns_file:
+        fd, path = tempfile.mkstemp(suffix='.npy')
+        os.close(fd)
+
+    try:
+        # создание файла с заголовком .npy; данные записываются поблочно
+        header = np.lib.format.open_memmap(path, mode='w+', dtype=ChunkedZoneResult.DTYPE,
+                                           shape=(rays_count, P))
+        offset = header.offset
+        del header
+
+        result = ChunkedZoneResult(path, rays_count, P, float(r), None, offset, block_rays, dtype,
+                                   owns_file=owns_file)
+        radii = np.abs(result._radii)
+        work = ZoneWorkspace()      # рабочие массивы - общие для всех блоков
+        for start in range(0, rays_count, block_rays):
+            _check_cancel(cancel)
+            stop = min(start + block_rays, rays_count)
+            X, Y = result._block_coords(start, stop)
+            out = work.array('metric', X.shape, dtype), work.array('good', X.shape, bool)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                metric, good, threshold = calc_metric(X, Y, radii, work=work, out=out)
+            if point_mask is not None:
+                good &= point_mask(X, Y)
+            block = result._map_block(start, stop, 'r+')
+            block['metric'] = metric
+            block['good'] = good
+            block.flush()
+            del block
+    except BaseException:
+        if owns_file:
+            _remove_file(path)
+        raise
+    result.threshold = threshold
+    return result
+
+
+def compare_precision(result, reference):
+    """
+    Сравнение результата расчета с эталонным (обычно - float32 с float64
+    на той же сетке): поиск точек, у которых различается "подходящесть".
+
+    Параметры:
+    ----------
+    result, reference : ZoneResult
+        Сравниваемый и эталонный результаты расчета на сетках одного размера.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict
+        Количество точек с различной "подходящестью" ('flipped'), их доля
+        от всех точек сетки ('fraction') и координаты ('X', 'Y').
+    """
+    flipped = result.good != reference.good
+    count = int(flipped.sum())
+    return {'flipped': count,
+            'fraction': count / flipped.size if flipped.size else 0.0,
+            'X': reference.grid.X[flipped],
+            'Y': reference.grid.Y[flipped]}
+
+
+_CALIBRATION_LOCK = threading.Lock()     # одна проверка точности при одновременных запросах
+
+
+@lru_cache(maxsize=1)
+def calibrate_precision(rays_count=CALIBRATION_RAYS_COUNT, P=CALIBRATION_P):
+    """
+    Проверка одинарной точности на контрольных расположениях маяков
+    (CALIBRATION_CASES): каждый случай рассчитывается во float32 и float64
+    и сравнивается. Результаты записываются в журнал (уровень INFO) и
+    кэшируются.
+
+    Параметры:
+    ----------
+    rays_count : int
+        Количество лучей сетки.
+    P : int
+        Количество точек на луче. Шаг сетки подбирается так, чтобы сетка
+        покрывала маяки с трехкратным запасом.
+
+    Возвращаемое значение:
+    ----------------------
+    reports : list[dict]
+        Результаты compare_precision по контрольным случаям (без координат
+        точек) с добавленными ключами 'method', 'stations', 'params'.
+    """
+    reports = []
+    for method, stations, params in CALIBRATION_CASES:
+        r = 3 * max(_calc_vector_magnitude(station) for station in stations) / P
+        zones = [calc_zone(method, stations, params, P, r, use_symmetry=False,
+                           rays_count=rays_count, precision=precision)
+                 for precision in ('float32', 'float64')]
+        report = compare_precision(*zones)
+        del report['X'], report['Y']
+        report.update(method=method, stations=stations, params=params)
+        reports.append(report)
+        logger.info('Проверка float32: метод %s, станции %s, параметры %s: '
+                    '"подходящесть" меняют %d точек (доля %.2e)',
+                    method, stations, params, report['flipped'], report['fraction'])
+    return reports
+
+
+@lru_cache(maxsize=None)
+def _resolve_auto_precision(tol):
+    """
+    Выбор точности для 'auto' по результатам calibrate_precision (выбор
+    записывается в журнал и кэшируется).
+
+    Параметры:
+    ----------
+    tol : float
+        Допустимая доля точек с различной "подходящестью".
+
+    Возвращаемое значение:
+    ----------------------
+    _ : str
+        Точность расчета: 'float32' или 'float64'.
+    """
+    worst = max(report['fraction'] for report in calibrate_precision())
+    precision = 'float32' if worst <= tol else 'float64'
+    logger.info('Точность расчета "auto": %s (наибольшая доля точек с иной "подходящестью" '
+                '%.2e, допуск %.2e)', precision, worst, tol)
+    return precision
+
+
+def resolve_precision(precision, tol=PRECISION_TOL):
+    """
+    Определение точности расчета. Для 'auto' выбирается float32, если на
+    контрольных расположениях маяков доля точек с различной "подходящестью"
+    не превышает tol, иначе float64. Проверка выполняется при первом
+    запросе 'auto' (около 0.25 с), поэтому ее лучше вызывать в фоновом
+    потоке; одновременные запросы ожидают одну проверку.
+
+    Параметры:
+    ----------
+    precision : str
+        Точность расчета: 'auto', 'float32' или 'float64'.
+    tol : float
+        Допустимая доля точек с различной "подходящестью".
+
+    Возвращаемое значение:
+    ----------------------
+    _ : str
+        Точность расчета: 'float32' или 'float64'.
+    """
+    if precision != 'auto':
+        _check_precision(precision)
+        return precision
+    with _CALIBRATION_LOCK:
+        return _resolve_auto_precision(tol)
+
+if __name__ == "__main__":
+    print(__doc__)
+    input('Введите Enter, чтобы выйти.')
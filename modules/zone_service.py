@@ -0,0 +1,511 @@
+"""
+Модуль локального HTTP-сервиса расчета рабочих зон.
+Дает другим программам (веб-странице планирования, скриптам) результаты
+расчета методов 1-3 без запуска ГПИ. Запросы и ответы - в формате JSON.
+
+Запросы:
+    POST /zone/method_1, /zone/method_2, /zone/method_3 (и /zone/method_N для
+    других методов реестра zone_calc.METHODS)
+        Расчет подходящей области. Тело запроса - объект с ключами:
+        'A', 'B' - координаты маяков [x, y] или 'stations' - список
+        координат станций (для методов с произвольным числом станций);
+        параметры метода по схеме ZoneMethod.params: 'sigma_r_allow' и
+        'sigma_t' (метод 1), 'sigma_d' и 'sigma_r' (метод 2), 'sigma_d' и
+        'sigma_theta' (метод 3), 'sigma', 'sigma_allow' и 'kind' (метод 4,
+        GDOP), для других методов реестра - свои (необязательные - со
+        значениями по умолчанию);
+        'P', 'r' - количество точек на луче и шаг между ними;
+        необязательные 'rays_count', 'precision', 'boundary_tol',
+        'max_points' (наибольшее число точек области в ответе).
+        Ответ: 'stats', 'threshold', 'outline' и 'zone' (координаты 'x', 'y'),
+        'cached', 'time_ms'.
+    GET /metrics
+        Статистика времени обработки запросов по путям.
+    GET /health
+        Проверка работы сервиса.
+
+Расчеты выполняются в пуле потоков ограниченного размера, результаты
+хранятся в общем кэше (одинаковые одновременные запросы ожидают один
+расчет). Сервис слушает только локальный адрес.
+Запуск из корня проекта: python -m modules.zone_service
+
+Классы:
+    ZoneService
+
+Функции:
+    make_server(host=SERVICE_HOST, port=SERVICE_PORT, workers=None) -> ThreadingHTTPServer
+    request_zone(method, params, host=SERVICE_HOST, port=SERVICE_PORT, timeout=60) -> dict
+    request_metrics(host=SERVICE_HOST, port=SERVICE_PORT, timeout=10) -> dict
+"""
+import json
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.zone_calc import METHODS, RAYS_COUNT, calc_zone, get_method, resolve_precision
+
+
+SERVICE_HOST = '127.0.0.1'          # адрес сервиса (только локальный)
+SERVICE_PORT = 8765                 # порт сервиса
+SERVICE_CACHE_SIZE = 32             # количество хранимых результатов расчета
+SERVICE_MAX_SAMPLES = 20_000_000    # наибольший размер сетки (лучи x точки) в запросе
+SERVICE_MAX_POINTS = 200_000        # число точек области в ответе по умолчанию
+
+
+def _parse_point(value, name):
+    """
+    Разбор координат точки из запроса.
+
+    Параметры:
+    ----------
+    value : list
+        Значение из запроса.
+    name : str
+        Название параметра (для сообщения об ошибке).
+
+    Возвращаемое значение:
+    ----------------------
+    _ : list[float]
+        Координаты [x, y].
+    """
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f'{name}: ожидаются координаты [x, y]')
+    point = [float(value[0]), float(value[1])]
+    if not all(math.isfinite(coord) for coord in point):
+        raise ValueError(f'{name}: координаты должны быть конечными числами')
+    return point
+
+
+def _parse_zone_request(method, params):
+    """
+    Разбор и проверка параметров запроса расчета: станции и параметры
+    метода - по схеме метода (ZoneMethod.check_stations, make_params),
+    сетка - не более SERVICE_MAX_SAMPLES точек, точность уточнения
+    границы - положительная.
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (ключ METHODS).
+    params : dict
+        Тело запроса.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : tuple
+        Параметры расчета (method, stations, params, P, r, rays_count,
+        precision, boundary_tol, max_points), станции и параметры метода -
+        кортежами; служат и ключом кэша.
+    """
+    if not isinstance(params, dict):
+        raise ValueError('Тело запроса должно быть объектом JSON')
+    zone_method = get_method(method)
+    if 'stations' in params:
+        if not isinstance(params['stations'], (list, tuple)):
+            raise ValueError('stations: ожидается список координат [x, y]')
+        stations = [_parse_point(point, f'stations[{i}]')
+                    for i, point in enumerate(params['stations'])]
+    else:
+        stations = [_parse_point(params.get('A'), 'A'), _parse_point(params.get('B'), 'B')]
+    stations = zone_method.check_stations(stations)
+    method_params = zone_method.make_params(**{param.name: params[param.name]
+                                               for param in zone_method.params
+                                               if param.name in params})
+    P = int(params['P'])
+    r = float(params['r'])
+    rays_count = int(params.get('rays_count', RAYS_COUNT))
+    if P <= 0 or rays_count <= 0 or r == 0 or not math.isfinite(r):
+        raise ValueError('P, rays_count и r должны быть ненулевыми, P и rays_count - положительными')
+    if P * rays_count > SERVICE_MAX_SAMPLES:
+        raise ValueError(f'Слишком большая сетка: более {SERVICE_MAX_SAMPLES} точек')
+    precision = resolve_precision(params.get('precision', 'float64'))
+    boundary_tol = params.get('boundary_tol')
+    if boundary_tol is not None:
+        boundary_tol = float(boundary_tol)
+        # бисекция границы ведется до точности boundary_tol
+        if not (math.isfinite(boundary_tol) and boundary_tol > 0):
+            raise ValueError('boundary_tol должно быть положительным числом')
+    max_points = int(params.get('max_points', SERVICE_MAX_POINTS))
+    return (method, tuple(map(tuple, stations)), tuple(method_params.items()), P, r, rays_count,
+            precision, boundary_tol, max_points)
+
+
+def _calc_zone_payload(method, stations, params, P, r, rays_count, precision,
+                       boundary_tol, max_points):
+    """
+    Расчет подходящей области и подготовка данных ответа. Точки области
+    прореживаются до max_points (каждая k-я точка).
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (ключ METHODS).
+    stations : tuple[float[2]]
+        Координаты станций.
+    params : tuple[(str, float | str)]
+        Параметры метода (имя, значение).
+    P : int
+        Количество точек на луче.
+    r : float
+        Шаг между точками на луче.
+    rays_count : int
+        Количество лучей.
+    precision : str
+        Точность расчета: 'float32' или 'float64'.
+    boundary_tol : float | None
+        Точность уточнения границы. None - граница не уточняется.
+    max_points : int
+        Наибольшее количество точек области в ответе.
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict
+        Данные ответа (без времени обработки).
+    """
+    zone = calc_zone(method, [list(station) for station in stations], dict(params), P, r,
+                     boundary_tol=boundary_tol, rays_count=rays_count, precision=precision)
+
+    X, Y = zone.zone_points()
+    step = max(1, math.ceil(len(X) / max_points)) if max_points > 0 else len(X) + 1
+    Xout, Yout = zone.outline_points()
+    return {'method': method,
+            'stats': zone.stats(),
+            'threshold': float(zone.threshold),
+            'outline': {'x': Xout.tolist(), 'y': Yout.tolist()},
+            'zone': {'x': X[::step].tolist(), 'y': Y[::step].tolist(), 'step': step}}
+
+
+class ZoneService:
+    """
+    Сервис расчета: пул потоков для расчетов, общий кэш результатов и
+    статистика времени обработки запросов. Не зависит от HTTP и может
+    использоваться напрямую.
+
+    Атрибуты:
+    ---------
+    cache_size : int
+        Количество хранимых результатов расчета.
+
+    Методы:
+    -------
+    calc_zone(method, params) -> (dict, bool)
+        Расчет (или получение из кэша) подходящей области.
+    record(path, elapsed, ok, cached=False) -> None
+        Учет времени обработки запроса.
+    metrics() -> dict
+        Статистика времени обработки запросов.
+    shutdown() -> None
+        Остановка пула потоков.
+    """
+
+    def __init__(self, workers=None, cache_size=SERVICE_CACHE_SIZE):
+        """
+        Инициализация экземляра класса.
+
+        Параметры:
+        ----------
+        workers : int | None
+            Количество потоков расчета. None - по умолчанию ThreadPoolExecutor.
+        cache_size : int
+            Количество хранимых результатов расчета.
+        """
+        self.cache_size = cache_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='zone')
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()     # ключ -> Future с данными ответа
+        self._metrics = {}
+
+    def calc_zone(self, method, params):
+        """
+        Расчет подходящей области по методу. Результаты хранятся в кэше;
+        одинаковые одновременные запросы ожидают один расчет.
+
+        Параметры:
+        ----------
+        method : int
+            Номер метода (ключ METHODS).
+        params : dict
+            Тело запроса.
+
+        Возвращаемое значение:
+        ----------------------
+        payload : dict
+            Данные ответа.
+        cached : bool
+            Флаг получения результата из кэша.
+        """
+        key = _parse_zone_request(method, params)
+        with self._lock:
+            future = self._cache.get(key)
+            cached = future is not None
+            if cached:
+                self._cache.move_to_end(key)
+            else:
+                future = self._executor.submit(_calc_zone_payload, *key)
+                self._cache[key] = future
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        try:
+            return future.result(), cached
+        except Exception:
+            # ошибочный результат в кэше не хранится
+            with self._lock:
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+            raise
+
+    def record(self, path, elapsed, ok, cached=False):
+        """
+        Учет времени обработки запроса.
+
+        Параметры:
+        ----------
+        path : str
+            Путь запроса.
+        elapsed : float
+            Время обработки [с].
+        ok : bool
+            Флаг успешной обработки.
+        cached : bool
+            Флаг получения результата из кэша.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        ms = elapsed * 1000
+        with self._lock:
+            m = self._metrics.setdefault(path, {'count': 0, 'errors': 0, 'cache_hits': 0,
+                                                'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0})
+            m['count'] += 1
+            m['errors'] += not ok
+            m['cache_hits'] += cached
+            m['total_ms'] += ms
+            m['max_ms'] = max(m['max_ms'], ms)
+            m['last_ms'] = ms
+
+    def metrics(self):
+        """
+        Статистика времени обработки запросов по путям.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        _ : dict
+            Для каждого пути: количество запросов, ошибок и попаданий в кэш,
+            суммарное, среднее, наибольшее и последнее время [мс]; а также
+            количество результатов в кэше ('cache_entries').
+        """
+        with self._lock:
+            paths = {path: dict(m, mean_ms=m['total_ms'] / m['count'])
+                     for path, m in self._metrics.items()}
+            return {'paths': paths, 'cache_entries': len(self._cache)}
+
+    def shutdown(self):
+        """
+        Остановка пула потоков.
+
+        Параметры:
+        ----------
+        None
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        self._executor.shutdown(wait=False)
+
+
+class _ZoneRequestHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик HTTP-запросов сервиса. Сервис берется из self.server.service.
+    """
+
+    def _send_json(self, status, data):
+        """
+        Отправка ответа в формате JSON.
+
+        Параметры:
+        ----------
+        status : int
+            Код ответа HTTP.
+        data : dict
+            Данные ответа.
+
+        Возвращаемое значение:
+        ----------------------
+        None
+        """
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        """
+        Обработка запросов GET: /metrics и /health.
+        """
+        start = time.perf_counter()
+        if self.path == '/metrics':
+            self._send_json(200, self.server.service.metrics())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': f'Неизвестный путь: {self.path}'})
+            return
+        self.server.service.record(self.path, time.perf_counter() - start, True)
+
+    def do_POST(self):
+        """
+        Обработка запросов POST: /zone/method_N для методов реестра METHODS.
+        """
+        start = time.perf_counter()
+        methods = {f'/zone/method_{method}': method for method in METHODS}
+        if self.path not in methods:
+            self._send_json(404, {'error': f'Неизвестный путь: {self.path}'})
+            return
+
+        cached = False
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            params = json.loads(self.rfile.read(length) or b'{}')
+            payload, cached = self.server.service.calc_zone(methods[self.path], params)
+        except (ValueError, KeyError, TypeError) as e:
+            status, data = 400, {'error': f'{type(e).__name__}: {e}'}
+        except Exception as e:
+            status, data = 500, {'error': f'{type(e).__name__}: {e}'}
+        else:
+            status, data = 200, dict(payload, cached=cached)
+
+        elapsed = time.perf_counter() - start
+        if status == 200:
+            data['time_ms'] = elapsed * 1000
+        self._send_json(status, data)
+        self.server.service.record(self.path, elapsed, status == 200, cached)
+
+    def log_message(self, format, *args):
+        """
+        Журнал запросов отключен (статистика - в /metrics).
+        """
+
+
+def make_server(host=SERVICE_HOST, port=SERVICE_PORT, workers=None):
+    """
+    Создание HTTP-сервера сервиса расчета. Соединения обрабатываются в
+    отдельных потоках, расчеты - в общем пуле потоков сервиса.
+
+    Параметры:
+    ----------
+    host : str
+        Адрес сервера.
+    port : int
+        Порт сервера (0 - любой свободный).
+    workers : int | None
+        Количество потоков расчета.
+
+    Возвращаемое значение:
+    ----------------------
+    server : http.server.ThreadingHTTPServer
+        Сервер; сервис расчета доступен как server.service. Запуск -
+        server.serve_forever(), остановка - server.shutdown().
+    """
+    server = ThreadingHTTPServer((host, port), _ZoneRequestHandler)
+    server.daemon_threads = True
+    server.service = ZoneService(workers)
+    return server
+
+
+def _request_json(url, data, timeout):
+    """
+    Отправка запроса сервису и разбор ответа.
+
+    Параметры:
+    ----------
+    url : str
+        Адрес запроса.
+    data : dict | None
+        Тело запроса POST. None - запрос GET.
+    timeout : float
+        Время ожидания ответа [с].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict
+        Данные ответа.
+    """
+    body = None if data is None else json.dumps(data).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(json.loads(e.read()).get('error', str(e))) from None
+
+
+def request_zone(method, params, host=SERVICE_HOST, port=SERVICE_PORT, timeout=60):
+    """
+    Запрос расчета подходящей области у сервиса.
+
+    Параметры:
+    ----------
+    method : int
+        Номер метода (ключ METHODS).
+    params : dict
+        Параметры расчета (см. описание модуля).
+    host : str
+        Адрес сервиса.
+    port : int
+        Порт сервиса.
+    timeout : float
+        Время ожидания ответа [с].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict
+        Данные ответа.
+    """
+    return _request_json(f'http://{host}:{port}/zone/method_{method}', params, timeout)
+
+
+def request_metrics(host=SERVICE_HOST, port=SERVICE_PORT, timeout=10):
+    """
+    Запрос статистики времени обработки запросов у сервиса.
+
+    Параметры:
+    ----------
+    host : str
+        Адрес сервиса.
+    port : int
+        Порт сервиса.
+    timeout : float
+        Время ожидания ответа [с].
+
+    Возвращаемое значение:
+    ----------------------
+    _ : dict
+        Статистика (см. ZoneService.metrics).
+    """
+    return _request_json(f'http://{host}:{port}/metrics', None, timeout)
+
+
+if __name__ == "__main__":
+    print(__doc__)
+    server = make_server()
+    print(f'Сервис запущен: http://{SERVICE_HOST}:{SERVICE_PORT}. Для остановки - Ctrl+C.')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
@@ -0,0 +1,88 @@
+"""
+Проверка индекса точек контура (modules.outline_index).
+
+Ближайшие точки контура, расстояния и направления OutlineIndex
+сравниваются с полным перебором на случайных контурах (окружность,
+облако, отрезок, скопления с пустыми областями), для запросов внутри и
+далеко вне контура, а также для пустого контура, контура из одной точки и
+из совпадающих точек.
+
+Запуск из корня проекта: python -m pytest -q
+"""
+import math
+
+import numpy as np
+import pytest
+
+from modules.outline_index import OutlineIndex
+
+
+def _outline(kind, rng):
+    if kind == 'circle':
+        angles = np.sort(rng.uniform(0, 2 * math.pi, 700))
+        radii = 20 + rng.normal(0, 0.3, angles.size)
+        return radii * np.cos(angles) + 3, radii * np.sin(angles) - 5
+    if kind == 'cloud':
+        return rng.uniform(-50, 50, (2, 500))
+    if kind == 'segment':
+        t = rng.uniform(0, 1, 300)
+        return -30 + 60 * t, 10 + 0.5 * t
+    # скопления точек далеко друг от друга - пустые кольца ячеек
+    centers = rng.uniform(-400, 400, (5, 2))
+    points = centers[rng.integers(0, 5, 400)] + rng.normal(0, 2, (400, 2))
+    return points[:, 0], points[:, 1]
+
+
+def _queries(rng):
+    near = rng.uniform(-60, 60, (2, 40, 25))
+    far = rng.uniform(-5000, 5000, (2, 200))
+    return (np.concatenate((near[0].ravel(), far[0], [1e6])),
+            np.concatenate((near[1].ravel(), far[1], [-1e6])))
+
+
+def _assert_brute_force(index, X, Y, qx, qy):
+    distances, bearings, indices = index.nearest_many(qx, qy)
+    d = np.hypot(X[None, :] - qx.ravel()[:, None], Y[None, :] - qy.ravel()[:, None])
+    expected = d.min(axis=1).reshape(qx.shape)
+    assert np.allclose(distances, expected, rtol=1e-12, atol=1e-9)
+    # при равных расстояниях годится любая из ближайших точек
+    assert np.allclose(np.hypot(X[indices] - qx, Y[indices] - qy), expected, rtol=1e-12, atol=1e-9)
+    assert np.allclose(bearings, np.degrees(np.arctan2(Y[indices] - qy, X[indices] - qx)))
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('kind', ['circle', 'cloud', 'segment', 'clusters'])
+def test_nearest_many_matches_brute_force(kind, seed):
+    rng = np.random.default_rng(seed)
+    X, Y = _outline(kind, rng)
+    qx, qy = _queries(rng)
+    _assert_brute_force(OutlineIndex(X, Y), X, Y, qx, qy)
+
+
+def test_nearest_keeps_query_shape():
+    rng = np.random.default_rng(7)
+    X, Y = _outline('circle', rng)
+    qx, qy = rng.uniform(-30, 30, (2, 6, 9))
+    index = OutlineIndex(X, Y)
+    distances, bearings, indices = index.nearest_many(qx, qy)
+    assert distances.shape == bearings.shape == indices.shape == qx.shape
+    _assert_brute_force(index, X, Y, qx, qy)
+    distance, bearing, i = index.nearest(qx[2, 3], qy[2, 3])
+    assert (distance, bearing, i) == (distances[2, 3], bearings[2, 3], indices[2, 3])
+
+
+def test_empty_outline():
+    index = OutlineIndex([], [])
+    distances, bearings, indices = index.nearest_many(np.zeros((3, 2)), np.ones((3, 2)))
+    assert np.isinf(distances).all() and np.isnan(bearings).all() and (indices == -1).all()
+    distance, bearing, i = index.nearest(5.0, -2.0)
+    assert math.isinf(distance) and math.isnan(bearing) and i == -1
+
+
+@pytest.mark.parametrize('X, Y', [([4.0], [-3.0]), ([4.0] * 5, [-3.0] * 5)])
+def test_single_point_outline(X, Y):
+    index = OutlineIndex(X, Y)
+    rng = np.random.default_rng(1)
+    qx, qy = rng.uniform(-1000, 1000, (2, 100))
+    _assert_brute_force(index, np.array(X), np.array(Y), qx, qy)
+    assert index.nearest(4.0, 7.0)[:2] == (10.0, -90.0)
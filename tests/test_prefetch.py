@@ -0,0 +1,155 @@
+"""
+Проверка упреждающего расчета (modules.prefetch).
+
+Проверяются значения на шаг больше и меньше текущего у краев диапазона
+полей ввода (step_values), вытеснение давно использованных результатов из
+BuildCache, отмена расчета флагом cancel между блоками лучей (calc_zone) и
+передача флага отмены упреждающему расчету Prefetcher.
+
+Запуск из корня проекта: python -m pytest -q
+"""
+import os
+import threading
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtWidgets import QApplication, QDoubleSpinBox, QSpinBox
+
+import modules.zone_calc as zone_calc
+from modules.prefetch import BuildCache, Prefetcher, step_values
+from modules.zone_calc import METHODS, CalcCancelled, MethodParam, ZoneMethod, calc_zone, register_method
+
+
+WAIT_TIMEOUT = 10   # наибольшее время ожидания фонового расчета [с]
+CANCEL = threading.Event()  # флаг отмены расчетов проверочного метода
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _spinbox(cls, minimum, maximum, step, value, decimals=None):
+    spinbox = cls()
+    if decimals is not None:
+        spinbox.setDecimals(decimals)
+    spinbox.setRange(minimum, maximum)
+    spinbox.setSingleStep(step)
+    spinbox.setValue(value)
+    return spinbox
+
+
+@pytest.mark.parametrize('args, expected', [
+    ((0, 10, 3, 5), [8, 2]),
+    ((0, 10, 3, 0), [3]),           # на минимуме - только вверх
+    ((0, 10, 3, 10), [7]),          # на максимуме - только вниз
+    ((0, 10, 3, 9), [6]),           # шаг вверх выходит за максимум
+    ((0, 10, 20, 5), []),           # шаг больше диапазона
+    ((4, 4, 1, 4), []),             # минимум равен максимуму
+])
+def test_step_values_int(app, args, expected):
+    assert step_values(_spinbox(QSpinBox, *args)) == expected
+
+
+@pytest.mark.parametrize('args, expected', [
+    ((0.0, 1.0, 0.1, 0.3, 2), [0.4, 0.2]),     # округление до знаков поля
+    ((0.0, 1.0, 0.1, 0.0, 2), [0.1]),
+    ((0.0, 1.0, 0.1, 1.0, 2), [0.9]),
+    ((0.0, 1.0, 0.001, 0.5, 2), []),           # шаг меньше точности поля
+])
+def test_step_values_double(app, args, expected):
+    assert step_values(_spinbox(QDoubleSpinBox, *args)) == expected
+
+
+def test_build_cache_lru():
+    cache = BuildCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1      # 'a' использован позже 'b'
+    cache.put('c', 3)
+    assert 'b' not in cache and cache.get('a') == 1 and cache.get('c') == 3
+    cache.put('a', 4)               # повторное добавление обновляет и отмечает
+    cache.put('d', 5)
+    assert len(cache) == 2 and cache.get('c') is None
+    assert cache.get('a') == 4 and cache.get('d') == 5
+    cache.clear()
+    assert len(cache) == 0 and cache.get('a') is None
+
+
+@pytest.fixture
+def counting_method():
+    # метод с подсчетом блоков: блок номер cancel_after устанавливает флаг отмены
+    calls = []
+
+    def metric(X, Y, radii, stations, params, vectors, work, out):
+        calls.append(X.shape[0])
+        if params['cancel_after'] <= len(calls):
+            CANCEL.set()
+        out[...] = np.hypot(X - stations[0][0], Y - stations[0][1])
+        return out
+
+    method = register_method(ZoneMethod(
+        'counting', 'Проверочный метод', 'd',
+        (MethodParam('cancel_after', 'блок, после которого расчет отменяется', minimum=1),),
+        metric, lambda stations, cancel_after: 10.0, '<=',
+        stations_count=(1, 1), beacon_vectors=False))
+    yield calls
+    del METHODS[method.key]
+
+
+@pytest.mark.parametrize('cancel_after', [1, 3])
+def test_cancel_between_ray_blocks(counting_method, monkeypatch, cancel_after):
+    # 60 точек на луче, 10 лучей в блоке: 36 блоков без симметрии
+    monkeypatch.setattr(zone_calc, 'CHUNK_SIZE', 600)
+    CANCEL.clear()
+    with pytest.raises(CalcCancelled):
+        calc_zone('counting', [[1.3, -2.1]], {'cancel_after': cancel_after}, 60, 0.5,
+                  use_symmetry=False, rays_count=360, cancel=CANCEL)
+    assert counting_method == [10] * cancel_after
+
+
+def test_cancel_set_before_start(counting_method):
+    CANCEL.set()
+    with pytest.raises(CalcCancelled):
+        calc_zone('counting', [[1.3, -2.1]], {'cancel_after': 1}, 60, 0.5, rays_count=360,
+                  cancel=CANCEL)
+    assert not counting_method
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not condition() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_prefetcher_sets_cancel(app):
+    prefetcher = Prefetcher(cache_size=2)
+    started, flags = threading.Event(), {}
+
+    def wait_cancel(key, cancel):
+        started.set()
+        flags[key] = cancel.wait(WAIT_TIMEOUT)
+        return key
+
+    prefetcher.submit('slow', wait_cancel, 'slow')
+    assert started.wait(WAIT_TIMEOUT)
+    prefetcher.submit('queued', wait_cancel, 'queued')
+    assert prefetcher.is_busy('slow') and prefetcher.is_busy('queued')
+    prefetcher.cancel()
+    assert not prefetcher.is_busy('slow') and not prefetcher.is_busy('queued')
+    # выполняющийся расчет получил флаг отмены, ожидающий снят с очереди
+    assert _wait_for(lambda: 'slow' in flags) and flags['slow'] is True
+    assert 'queued' not in flags and 'slow' not in prefetcher.cache
+
+    # оставленный расчет не отменяется, его результат попадает в кэш
+    prefetcher.submit('kept', lambda cancel: cancel.is_set())
+    prefetcher.cancel(keep='kept')
+    assert _wait_for(lambda: 'kept' in prefetcher.cache)
+    assert prefetcher.cache.get('kept') is False
+    assert 'queued' not in flags
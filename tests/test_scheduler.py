@@ -0,0 +1,82 @@
+"""
+Проверка планировщика фоновых расчетов (modules.scheduler).
+
+Проверяется кооперативная отмена: отменяемому расчету передается флаг
+cancel, который устанавливается при отмене и при вытеснении расчета новым
+с тем же ключом; результат вытесненного расчета отбрасывается.
+
+Запуск из корня проекта: python -m pytest -q
+"""
+import os
+import threading
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtWidgets import QApplication
+
+from modules.scheduler import ZoneJobScheduler
+
+
+WAIT_TIMEOUT = 10   # наибольшее время ожидания фонового расчета [с]
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not condition() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def scheduler(app):
+    scheduler = ZoneJobScheduler(max_threads=2)
+    results = []
+    scheduler.finished.connect(lambda key, result: results.append((key, result)))
+    scheduler.failed.connect(lambda key, error: results.append((key, error)))
+    scheduler.results = results
+    return scheduler
+
+
+def _wait_cancel(name, started, flags, cancel):
+    started.set()
+    flags[name] = cancel.wait(WAIT_TIMEOUT)
+    return name
+
+
+def test_superseded_job_gets_cancel(scheduler):
+    started, flags = threading.Event(), {}
+    scheduler.submit(0, _wait_cancel, 'old', started, flags, cancellable=True)
+    assert started.wait(WAIT_TIMEOUT)
+    scheduler.submit(0, lambda cancel: cancel.is_set(), cancellable=True)
+    assert _wait_for(lambda: 'old' in flags and scheduler.results)
+    assert flags['old'] is True
+    # результат вытесненного расчета отброшен
+    assert _wait_for(lambda: not scheduler.is_busy(0))
+    QCoreApplication.processEvents()
+    assert scheduler.results == [(0, False)]
+
+
+def test_cancel_sets_flag(scheduler):
+    started, flags = threading.Event(), {}
+    scheduler.submit('all', _wait_cancel, 'job', started, flags, cancellable=True)
+    assert started.wait(WAIT_TIMEOUT)
+    scheduler.cancel('all')
+    assert not scheduler.is_busy('all')
+    assert _wait_for(lambda: 'job' in flags) and flags['job'] is True
+    QCoreApplication.processEvents()
+    assert scheduler.results == []
+
+
+def test_not_cancellable_gets_no_flag(scheduler):
+    scheduler.submit(1, lambda *args, **kwargs: (args, kwargs), 'x')
+    assert _wait_for(lambda: scheduler.results)
+    assert scheduler.results == [(1, (('x',), {}))]
@@ -0,0 +1,89 @@
+"""
+Проверка учета рельефа (modules.terrain).
+
+Видимость маяков проверяется на растрах из нескольких фрагментов кэша:
+на ровном рельефе видны все ячейки, стена через весь растр закрывает
+ячейки за собой и не закрывает ячейки перед собой (в том числе для
+маяков вне растра - проход только по кольцам в пределах растра), а
+повторный запрос видимости берется из кэша фрагментов без нового прохода.
+
+Запуск из корня проекта: python -m pytest -q
+"""
+import numpy as np
+import pytest
+
+from modules.terrain import TERRAIN_TILE, TerrainRaster
+
+
+ROWS, COLS = 200, 300       # размер растра [ячеек] (несколько фрагментов кэша)
+WALL_COL = 150              # столбец стены
+WALL_HEIGHT = 50.0          # высота стены
+
+
+def _cell_centers(terrain):
+    rows, cols = np.mgrid[0:terrain.heights.shape[0], 0:terrain.heights.shape[1]]
+    return (terrain.origin[0] + cols * terrain.cell, terrain.origin[1] + rows * terrain.cell)
+
+
+@pytest.fixture
+def wall():
+    heights = np.zeros((ROWS, COLS), dtype=np.float32)
+    heights[:, WALL_COL] = WALL_HEIGHT
+    return TerrainRaster(heights, origin=(-10.0, 5.0), cell=2.0)
+
+
+def test_raster_spans_tiles():
+    assert ROWS > TERRAIN_TILE and COLS > TERRAIN_TILE
+
+
+# маяки внутри растра, за каждой его стороной и за углом
+@pytest.mark.parametrize('station', [(100.0, 150.0), (-10.0, 5.0), (-500.0, 200.0),
+                                     (1500.0, 120.0), (300.0, -900.0), (-800.0, 2000.0)])
+def test_flat_terrain_all_visible(station):
+    terrain = TerrainRaster(np.full((ROWS, COLS), 7.0), origin=(-10.0, 5.0), cell=2.0)
+    X, Y = _cell_centers(terrain)
+    assert terrain.visible_from(station, X, Y).all()
+
+
+# строка маяка - внутри растра, поэтому любой луч за стену пересекает ее в растре
+@pytest.mark.parametrize('col', [20, 140, -30, -400])
+def test_wall_blocks_only_behind(wall, col):
+    station = (wall.origin[0] + col * wall.cell, wall.origin[1] + 100 * wall.cell)
+    X, Y = _cell_centers(wall)
+    visible = wall.visible_from(station, X, Y)
+    assert visible[:, :WALL_COL + 1].all()
+    assert not visible[:, WALL_COL + 1:].any()
+
+
+@pytest.mark.parametrize('col', [COLS + 40, COLS + 600])
+def test_wall_from_other_side(wall, col):
+    station = (wall.origin[0] + col * wall.cell, wall.origin[1] + 50 * wall.cell)
+    X, Y = _cell_centers(wall)
+    visible = wall.visible_from(station, X, Y)
+    assert visible[:, WALL_COL:].all()
+    assert not visible[:, :WALL_COL].any()
+
+
+def test_points_outside_raster_visible(wall):
+    station = (wall.origin[0] + 20 * wall.cell, wall.origin[1] + 100 * wall.cell)
+    X = np.array([-1000.0, wall.origin[0] + (COLS + 5) * wall.cell, 0.0])
+    Y = np.array([0.0, 300.0, -1000.0])
+    assert wall.visible_from(station, X, Y).all()
+
+
+def test_tile_cache_reused(wall, monkeypatch):
+    station = (wall.origin[0] + 20 * wall.cell, wall.origin[1] + 100 * wall.cell)
+    X, Y = _cell_centers(wall)
+    first = wall.visible_from(station, X, Y)
+    assert wall.cache_nbytes() > 0
+
+    sweeps = []
+    sweep = wall._sweep
+    monkeypatch.setattr(wall, '_sweep', lambda *args: sweeps.append(args) or sweep(*args))
+    assert np.array_equal(wall.visible_from(station, X, Y), first)
+    assert np.array_equal(wall.visible_from(station, X[::3, ::7], Y[::3, ::7]), first[::3, ::7])
+    assert not sweeps
+
+    # другой маяк - новый проход
+    wall.visible_from((station[0], station[1] + wall.cell), X, Y)
+    assert len(sweeps) == 1
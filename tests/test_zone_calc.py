@@ -0,0 +1,307 @@
+"""
+Проверка расчета рабочих зон (modules.zone_calc) по исходным циклам.
+
+Маски подходящих точек методов 1-3 из реестра METHODS сравниваются с
+прямым переносом исходных поточечных циклов расчета (до векторизации) на
+небольшой сетке: при симметричном и несимметричном расположении маяков,
+с рабочими массивами ZoneWorkspace и без них. Точки могут различаться
+только на самой границе (критерий равен порогу с точностью округления).
+GDOP сравнивается с поточечным расчетом inv(H^T H) для 3-8 станций, а
+дальномерный GDOP двух станций - с методом 2. Расчет блоками с записью в
+файл (calc_zone_chunked) сравнивается с расчетом в памяти.
+
+Запуск из корня проекта: python -m pytest -q
+"""
+import math
+
+import numpy as np
+import pytest
+
+from modules.zone_calc import (GDOP_KINDS, GDOP_METHOD, METHODS, MethodParam, ZoneMethod,
+                               ZoneWorkspace, calc_gdop, calc_zone, calc_zone_all_methods,
+                               calc_zone_chunked, find_mirror_axis, get_method, register_method)
+
+
+RAYS_COUNT = 360        # количество лучей сетки проверки
+P = 60                  # количество точек на луче
+R = 0.5                 # шаг между точками на луче
+BOUNDARY_RTOL = 1e-9    # относительная близость критерия к порогу для граничных точек
+
+# расположения маяков (не совпадают с узлами сетки): симметричное и несимметричное
+LAYOUTS = {'symmetric': ([-10.3, 0.2], [10.3, 0.2]),
+           'asymmetric': ([-7.1, 3.3], [9.7, -4.2])}
+SIGMAS = {1: (3, 1), 2: (5, 1), 3: (5, 1)}
+
+
+def _params(method):
+    return get_method(method).make_params(*SIGMAS[method])
+
+
+def _magnitude(v):
+    return math.sqrt(v[0]**2 + v[1]**2)
+
+
+def _dot(v1, v2):
+    return v1[0] * v2[0] + v1[1] * v2[1]
+
+
+def _ray_index(x, y):
+    return round(math.atan2(y, x) / (2 * math.pi / RAYS_COUNT)) % RAYS_COUNT
+
+
+def _baseline_method_1(A, B, sigma_r_allow, sigma_t):
+    """
+    Исходный цикл метода 1 (разностно-дальномерный; ведущая станция в
+    начале координат). Точки исходной сетки - (sin, cos) угла луча.
+    """
+    X1, Y1 = A
+    X2, Y2 = B
+    threshold = sigma_r_allow / sigma_t
+    metric = np.empty((RAYS_COUNT, P))
+    for j in range(1, RAYS_COUNT + 1):
+        angle = j * 2 * math.pi / RAYS_COUNT
+        for i in range(1, P + 1):
+            mx = math.sin(angle) * (i * R)
+            my = math.cos(angle) * (i * R)
+            m0 = [0 - mx, 0 - my]
+            v1 = [X1 - mx, Y1 - my]
+            v2 = [X2 - mx, Y2 - my]
+            dot_m0_v1 = _dot(m0, v1) / (_magnitude(m0) * _magnitude(v1))
+            dot_m0_v2 = _dot(m0, v2) / (_magnitude(m0) * _magnitude(v2))
+            psi1 = math.acos(max(-1, min(1, dot_m0_v1)))
+            psi2 = math.acos(max(-1, min(1, dot_m0_v2)))
+            try:
+                Kr = (math.sqrt(math.sin(psi1 / 2)**2 + math.sin(psi2 / 2)**2)
+                      / (2 * math.sin((psi1 + psi2) / 2) * math.sin(psi1 / 2) * math.sin(psi2 / 2)))
+            except ZeroDivisionError:
+                Kr = threshold + 1
+            metric[_ray_index(mx, my), i - 1] = Kr
+    return metric, metric < threshold, threshold
+
+
+def _baseline_method_2(A, B, sigma_d, sigma_r):
+    """
+    Исходный цикл метода 2 (дальномерный).
+    """
+    sina = math.sqrt(2) * sigma_r / sigma_d
+    metric = np.empty((RAYS_COUNT, P))
+    for j in range(1, RAYS_COUNT + 1):
+        angle = j * 2 * math.pi / RAYS_COUNT
+        for i in range(1, P + 1):
+            M = [math.cos(angle) * (i * R), math.sin(angle) * (i * R)]
+            MB = [B[0] - M[0], B[1] - M[1]]
+            MA = [A[0] - M[0], A[1] - M[1]]
+            COS_alpha = _dot(MA, MB) / (_magnitude(MA) * _magnitude(MB))
+            # в исходном цикле |cos| > 1 из-за округления приводил к ошибке
+            SIN_alpha = math.sqrt(max(0.0, 1 - COS_alpha**2))
+            metric[_ray_index(*M), i - 1] = SIN_alpha
+    return metric, metric >= sina, sina
+
+
+def _baseline_method_3(A, B, sigma_d, sigma_theta):
+    """
+    Исходный цикл метода 3 (угломерный). Точки с sin(alpha) = 0 не
+    подходят.
+    """
+    d_AB = math.sqrt((A[0] - B[0])**2 + (A[1] - B[1])**2)
+    threshold = sigma_d / (d_AB * sigma_theta)
+    metric = np.full((RAYS_COUNT, P), np.inf)
+    for j in range(1, RAYS_COUNT + 1):
+        angle = j * 2 * math.pi / RAYS_COUNT
+        for i in range(1, P + 1):
+            M = [math.cos(angle) * (i * R), math.sin(angle) * (i * R)]
+            MB = [B[0] - M[0], B[1] - M[1]]
+            MA = [A[0] - M[0], A[1] - M[1]]
+            COS_alpha = _dot(MA, MB) / (_magnitude(MA) * _magnitude(MB))
+            SIN_alpha = math.sqrt(max(0.0, 1 - COS_alpha**2))
+            if SIN_alpha != 0:
+                rA = _magnitude(MA)
+                rB = _magnitude(MB)
+                Kr = 0.017 / SIN_alpha * math.sqrt((rA / d_AB)**2 + (rB / d_AB)**2)
+                metric[_ray_index(*M), i - 1] = Kr
+    return metric, metric <= threshold, threshold
+
+
+BASELINES = {1: _baseline_method_1, 2: _baseline_method_2, 3: _baseline_method_3}
+
+
+def _assert_same_zone(good, baseline):
+    """
+    Маски совпадают везде, кроме точек, где исходный критерий равен порогу
+    с точностью округления.
+    """
+    metric, base_good, threshold = baseline
+    assert good.shape == base_good.shape
+    differ = good != base_good
+    assert np.all(np.abs(metric[differ] - threshold) <= BOUNDARY_RTOL * abs(threshold)), \
+        f'различаются {int(differ.sum())} точек не на границе'
+    assert base_good.any() and not base_good.all()
+
+
+@pytest.fixture(scope='module')
+def baselines():
+    return {(method, layout): BASELINES[method](*LAYOUTS[layout], *SIGMAS[method])
+            for method in BASELINES for layout in LAYOUTS}
+
+
+def test_layouts_symmetry():
+    assert find_mirror_axis(LAYOUTS['symmetric'], rays_count=RAYS_COUNT) is not None
+    assert find_mirror_axis(LAYOUTS['asymmetric'], rays_count=RAYS_COUNT) is None
+
+
+@pytest.mark.parametrize('use_workspace', [False, True])
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+@pytest.mark.parametrize('method', list(BASELINES))
+def test_method_matches_baseline(baselines, method, layout, use_workspace):
+    workspace = ZoneWorkspace() if use_workspace else None
+    # повторный расчет проверяет и переиспользование рабочих массивов
+    for _ in range(2 if use_workspace else 1):
+        zone = calc_zone(method, LAYOUTS[layout], _params(method), P, R,
+                         rays_count=RAYS_COUNT, workspace=workspace)
+        _assert_same_zone(zone.good, baselines[method, layout])
+
+
+@pytest.mark.parametrize('use_symmetry', [False, True])
+def test_symmetry_matches_full_grid(use_symmetry):
+    stations = LAYOUTS['symmetric']
+    for method in SIGMAS:
+        full = calc_zone(method, stations, _params(method), P, R, use_symmetry=False,
+                         rays_count=RAYS_COUNT)
+        zone = calc_zone(method, stations, _params(method), P, R, use_symmetry=use_symmetry,
+                         rays_count=RAYS_COUNT, workspace=ZoneWorkspace())
+        assert np.array_equal(zone.good, full.good)
+
+
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+def test_all_methods_matches_baseline(baselines, layout):
+    params = [_params(method) for method in BASELINES]
+    zones = calc_zone_all_methods(LAYOUTS[layout], params, P, R, rays_count=RAYS_COUNT,
+                                  workspace=ZoneWorkspace())
+    for method, zone in zip(BASELINES, zones):
+        _assert_same_zone(zone.good, baselines[method, layout])
+
+
+def test_params_by_schema():
+    method = get_method(3)
+    assert method.make_params(5, sigma_theta=1) == {'sigma_d': 5.0, 'sigma_theta': 1.0}
+    for args, kwargs in (((5,), {}), ((5, 0), {}), ((5, 1), {'sigma_d': 5}),
+                         ((), {'sigma_d': 5, 'sigma_theta': 1, 'sigma_x': 1}),
+                         ((5, float('nan')), {})):
+        with pytest.raises(ValueError):
+            method.make_params(*args, **kwargs)
+
+
+@pytest.mark.parametrize('stations', [[[1, 2]], [[1, 2], [3, 4], [5, 6]], [[1, 2], [1, 2]],
+                                      [[1, 2], [float('inf'), 0]]])
+def test_calc_zone_rejects_stations(stations):
+    with pytest.raises(ValueError):
+        calc_zone(2, stations, {'sigma_d': 5, 'sigma_r': 1}, P, R, rays_count=RAYS_COUNT)
+
+
+def _metric_nearest(X, Y, radii, stations, params, vectors, work, out):
+    # расстояние до ближайшей станции
+    np.hypot(X - stations[0][0], Y - stations[0][1], out=out)
+    for x, y in stations[1:]:
+        np.minimum(out, np.hypot(X - x, Y - y), out=out)
+    return out
+
+
+@pytest.fixture
+def nearest_method():
+    method = register_method(ZoneMethod(
+        'nearest', 'Проверочный метод', 'd',
+        (MethodParam('radius', 'радиус', minimum=0, exclusive_minimum=True),
+         MethodParam('scale', 'множитель', default=1.0, minimum=0, exclusive_minimum=True)),
+        _metric_nearest, lambda stations, radius, scale: radius * scale, '<=',
+        stations_count=(1, None), beacon_vectors=False))
+    yield method
+    del METHODS[method.key]
+
+
+def test_registered_method_uses_pipeline(nearest_method):
+    stations = [[-6.2, 1.1], [6.2, 1.1], [0.4, -8.3]]
+    zone = calc_zone('nearest', stations, {'radius': 4}, P, R, rays_count=RAYS_COUNT)
+    nearest = np.min([np.hypot(zone.grid.X - x, zone.grid.Y - y) for x, y in stations], axis=0)
+    assert np.array_equal(zone.good, nearest <= 4)
+    assert zone.threshold == 4
+    with pytest.raises(ValueError):
+        calc_zone('nearest', stations, {'radius': 4, 'scale': -1}, P, R, rays_count=RAYS_COUNT)
+
+
+def _gdop_reference(x, y, stations, kind):
+    """
+    GDOP в точке прямым обращением матрицы: для разностно-дальномерных
+    измерений - разности с первой станцией и их корреляционная матрица.
+    """
+    H = []
+    for sx, sy in stations:
+        dx, dy = sx - x, sy - y
+        d = math.hypot(dx, dy)
+        H.append([dy / d**2, -dx / d**2] if kind == 'bearing' else [dx / d, dy / d])
+    H = np.array(H)
+    W = np.eye(len(H))
+    if kind == 'range_difference':
+        H = H[1:] - H[0]
+        W = np.linalg.inv(np.eye(len(H)) + np.ones((len(H), len(H))))
+    return math.sqrt(np.trace(np.linalg.inv(H.T @ W @ H)))
+
+
+@pytest.mark.parametrize('kind', GDOP_KINDS)
+@pytest.mark.parametrize('count', range(3, 9))
+def test_gdop_matches_reference(count, kind):
+    rng = np.random.default_rng(count)
+    stations = rng.uniform(-20, 20, (count, 2)).tolist()
+    X, Y = rng.uniform(-30, 30, (2, 7, 11))
+    gdop = calc_gdop(X, Y, stations, kind)
+    reference = [_gdop_reference(x, y, stations, kind) for x, y in zip(X.ravel(), Y.ravel())]
+    assert gdop.shape == X.shape
+    assert np.allclose(gdop.ravel(), reference, rtol=1e-9)
+
+
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+def test_gdop_two_stations_matches_method_2(layout):
+    # GDOP = 2^1/2 / sin(alpha): sigma * GDOP <= sigma_d <=> sin(alpha) >= 2^1/2 * sigma / sigma_d
+    sigma_d, sigma_r = SIGMAS[2]
+    zone = calc_zone(GDOP_METHOD, LAYOUTS[layout], {'sigma': sigma_r, 'sigma_allow': sigma_d},
+                     P, R, rays_count=RAYS_COUNT)
+    method_2 = calc_zone(2, LAYOUTS[layout], _params(2), P, R, rays_count=RAYS_COUNT)
+    # вблизи прямой через станции sin(alpha) = (1 - cos^2)^1/2 теряет точность
+    regular = method_2.metric > 1e-2
+    assert np.allclose(zone.metric[regular], math.sqrt(2) / method_2.metric[regular], rtol=1e-9)
+    _assert_same_zone(zone.good, (method_2.metric, method_2.good, method_2.threshold))
+
+
+def test_gdop_method_params():
+    method = get_method(GDOP_METHOD)
+    assert method.make_params(1, 5) == {'sigma': 1.0, 'sigma_allow': 5.0, 'kind': 'range'}
+    with pytest.raises(ValueError):
+        method.make_params(1, 5, 'doppler')
+    with pytest.raises(ValueError):
+        calc_zone(GDOP_METHOD, LAYOUTS['symmetric'],
+                  {'sigma': 1, 'sigma_allow': 5, 'kind': 'range_difference'}, P, R,
+                  rays_count=RAYS_COUNT)
+
+
+@pytest.mark.parametrize('precision', ['float64', 'float32'])
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+@pytest.mark.parametrize('method', list(SIGMAS))
+def test_chunked_matches_calc_zone(method, layout, precision):
+    # блоки по 7 лучей: последний блок неполный
+    chunked = calc_zone_chunked(method, LAYOUTS[layout], _params(method), P, R,
+                                rays_count=RAYS_COUNT, block_rays=7, precision=precision)
+    zone = calc_zone(method, LAYOUTS[layout], _params(method), P, R, rays_count=RAYS_COUNT,
+                     precision=precision)
+    good = np.load(chunked.path, mmap_mode='r')['good']
+    assert np.array_equal(good, zone.good)
+    assert chunked.threshold == zone.threshold
+    for points, expected in ((chunked.outline_points(), zone.outline_points()),
+                             (chunked.zone_points(), zone.zone_points())):
+        assert np.array_equal(points[0], expected[0]) and np.array_equal(points[1], expected[1])
+    chunked.release()
+
+
+@pytest.mark.parametrize('grid', [{'rays_count': 0}, {'P': 0}, {'P': -5}, {'block_rays': 0}])
+def test_chunked_rejects_empty_grid(grid):
+    kwargs = dict({'P': P, 'rays_count': RAYS_COUNT}, **grid)
+    with pytest.raises(ValueError):
+        calc_zone_chunked(2, LAYOUTS['symmetric'], _params(2), kwargs.pop('P'), R, **kwargs)
@@ -0,0 +1,101 @@
+"""
+Проверка HTTP-сервиса расчета рабочих зон (modules.zone_service).
+
+Сервер запускается на свободном локальном порту в отдельном потоке;
+запросы отправляются функциями клиента request_zone и request_metrics.
+Проверяются успешный расчет каждым методом реестра, попадание повторного
+запроса в кэш со счетчиками /metrics и ответ 400 на ошибочные параметры.
+
+Запуск из корня проекта: python -m pytest -q
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from modules.zone_calc import GDOP_METHOD, METHODS
+from modules.zone_service import SERVICE_HOST, make_server, request_metrics, request_zone
+
+
+GRID = {'P': 40, 'r': 0.5, 'rays_count': 360}     # небольшая сетка запросов
+BEACONS = {'A': [-10, 0], 'B': [10, 0]}
+
+# правильные запросы по методам
+REQUESTS = {1: dict(BEACONS, sigma_r_allow=3, sigma_t=1),
+            2: dict(BEACONS, sigma_d=5, sigma_r=1),
+            3: dict(BEACONS, sigma_d=5, sigma_theta=1),
+            GDOP_METHOD: {'stations': [[-10, 0], [10, 0], [0, 10]], 'sigma': 1,
+                          'sigma_allow': 3, 'kind': 'range_difference'}}
+
+
+@pytest.fixture(scope='module')
+def port():
+    server = make_server(port=0, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    server.service.shutdown()
+
+
+def _post_status(port, method, params):
+    """
+    Код ответа на запрос расчета (request_zone не возвращает код ошибки).
+    """
+    request = urllib.request.Request(f'http://{SERVICE_HOST}:{port}/zone/method_{method}',
+                                     data=json.dumps(params).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_requests_cover_methods():
+    assert set(REQUESTS) == set(METHODS)
+
+
+@pytest.mark.parametrize('method', list(REQUESTS))
+def test_zone_per_method(port, method):
+    payload = request_zone(method, dict(REQUESTS[method], **GRID), port=port)
+    assert payload['cached'] is False
+    assert 0 < payload['stats']['points'] < GRID['P'] * GRID['rays_count']
+    assert 0 < len(payload['zone']['x']) == len(payload['zone']['y']) <= payload['stats']['points']
+    assert payload['outline']['x'] and payload['threshold'] > 0
+
+
+def test_cache_hit_moves_metrics(port):
+    params = dict(REQUESTS[2], **dict(GRID, r=0.25))
+    path = '/zone/method_2'
+    before = request_metrics(port=port)['paths'].get(path, {'count': 0, 'cache_hits': 0})
+    first = request_zone(2, params, port=port)
+    second = request_zone(2, params, port=port)
+    after = request_metrics(port=port)['paths'][path]
+    assert (first['cached'], second['cached']) == (False, True)
+    assert first['stats'] == second['stats']
+    assert after['count'] == before['count'] + 2
+    assert after['cache_hits'] == before['cache_hits'] + 1
+
+
+@pytest.mark.parametrize('method, params', [
+    (2, dict(REQUESTS[2], sigma_d=0)),
+    (2, dict(REQUESTS[2], sigma_r=-1)),
+    (1, dict(REQUESTS[1], sigma_t=float('nan'))),
+    (3, dict(REQUESTS[3], B=BEACONS['A'])),
+    (3, dict(REQUESTS[3], A=[float('inf'), 0])),
+    (2, dict(REQUESTS[2], r=float('inf'))),
+    (2, dict(REQUESTS[2], boundary_tol=0)),
+    (2, dict(REQUESTS[2], boundary_tol=-0.01)),
+    (2, dict(REQUESTS[2], boundary_tol=float('inf'))),
+    (2, {'A': BEACONS['A'], 'sigma_d': 5, 'sigma_r': 1}),
+    (GDOP_METHOD, dict(REQUESTS[GDOP_METHOD], stations=[[-10, 0], [10, 0]])),
+])
+def test_bad_request_400(port, method, params):
+    path = f'/zone/method_{method}'
+    before = request_metrics(port=port)['paths'].get(path, {'errors': 0})
+    assert _post_status(port, method, dict(GRID, **params)) == 400
+    assert request_metrics(port=port)['paths'][path]['errors'] == before['errors'] + 1